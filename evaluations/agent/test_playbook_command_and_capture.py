@@ -1,28 +1,27 @@
 # evaluations/agent/test_playbook_command_and_capture.py
 
 import pytest
-import tempfile
 import os
 import yaml
 import logging
 from pathlib import Path
 
-from ..harness import EvaluationHarness
+from ..harness import EvaluationHarness, load_cassette, model_access_available
 from packages.framework.factory import PluginFactory
 from packages.framework.orchestrator import Orchestrator
 from packages.framework.loaders import ProfileLoader, PlaybookLoader
 from packages.framework.prompt_constructor import PromptConstructor
-from packages.framework.tool_wrapper import tool_wrapper_factory
-from packages.plugin_manager_agent import GeminiAgent
-from packages.plugin_manager_agent.tools import TOOL_LIST
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Skip this entire test module if the API key is not available
+# Model traffic is recorded to, and replayed from, evaluations/cassettes/playbook_command_and_capture.
+CASSETTE = load_cassette("playbook_command_and_capture")
+
+# Skip this entire test module if neither the API key nor a recording is available
 pytestmark = pytest.mark.skipif(
-    not os.getenv("GEMINI_API_KEY"),
-    reason="GEMINI_API_KEY environment variable not set"
+    not model_access_available(CASSETTE),
+    reason="GEMINI_API_KEY environment variable not set and no recorded cassette"
 )
 
 OUTPUT_FILE_NAME = "command_output.txt"
@@ -58,7 +57,8 @@ def test_command_and_capture_playbook_and_validate_output(virtual_plugin_path_wi
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
         prompt_constructor=PromptConstructor(),
-        hitl=False
+        hitl=False,
+        model_call_wrappers=[CASSETTE]
     )
     harness = EvaluationHarness(orchestrator)
 
@@ -104,7 +104,8 @@ def test_command_and_capture_with_error_handling(virtual_plugin_path_with_files:
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
         prompt_constructor=PromptConstructor(),
-        hitl=False
+        hitl=False,
+        model_call_wrappers=[CASSETTE]
     )
     harness = EvaluationHarness(orchestrator)
 
@@ -1,28 +1,27 @@
 # evaluations/test_playbook_copy_file.py
 
 import pytest
-import tempfile
 import os
 import yaml
 import logging
 from pathlib import Path
 
-from ..harness import EvaluationHarness
+from ..harness import EvaluationHarness, load_cassette, model_access_available
 from packages.framework.factory import PluginFactory
 from packages.framework.orchestrator import Orchestrator
 from packages.framework.loaders import ProfileLoader, PlaybookLoader
 from packages.framework.prompt_constructor import PromptConstructor
-from packages.framework.tool_wrapper import tool_wrapper_factory
-from packages.plugin_manager_agent import GeminiAgent
-from packages.plugin_manager_agent.tools import TOOL_LIST
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Skip this entire test module if the API key is not available
+# Model traffic is recorded to, and replayed from, evaluations/cassettes/playbook_copy_file.
+CASSETTE = load_cassette("playbook_copy_file")
+
+# Skip this entire test module if neither the API key nor a recording is available
 pytestmark = pytest.mark.skipif(
-    not os.getenv("GEMINI_API_KEY"),
-    reason="GEMINI_API_KEY environment variable not set"
+    not model_access_available(CASSETTE),
+    reason="GEMINI_API_KEY environment variable not set and no recorded cassette"
 )
 
 SOURCE_FILE_NAME = "source_file.txt"
@@ -43,7 +42,7 @@ def virtual_plugin_path_with_files(tmp_path: Path) -> Path:
     with open(profile_path, 'w') as f:
         yaml.dump(profile_data, f)
 
-    template_dir = Path(__file__).parent.parent / "templates"
+    template_dir = Path(__file__).parent.parent.parent / "templates"
     factory = PluginFactory(template_dir=template_dir)
 
     output_dir = tmp_path / "plugins"
@@ -70,12 +69,13 @@ def test_copy_file_playbook_and_validate_output(virtual_plugin_path_with_files:
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
         prompt_constructor=PromptConstructor(),
-        hitl=False
+        hitl=False,
+        model_call_wrappers=[CASSETTE]
     )
     harness = EvaluationHarness(orchestrator)
 
     # 2. Execute
-    playbook_path = Path(__file__).parent.parent / "playbooks" / "playbook_copy_file.md"
+    playbook_path = Path(__file__).parent.parent.parent / "playbooks" / "playbook_copy_file.md"
 
     final_response = harness.run_and_capture(
         playbook_path=playbook_path,
@@ -6,7 +6,7 @@ import os
 import logging
 from pathlib import Path
 
-from ..harness import EvaluationHarness
+from ..harness import EvaluationHarness, load_cassette, model_access_available
 from packages.framework.factory import PluginFactory
 from packages.framework.orchestrator import Orchestrator
 from packages.framework.loaders import ProfileLoader, PlaybookLoader
@@ -15,10 +15,13 @@ from packages.framework.prompt_constructor import PromptConstructor
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Skip this entire test module if the API key is not available
+# Model traffic is recorded to, and replayed from, evaluations/cassettes/playbook_fix_bug.
+CASSETTE = load_cassette("playbook_fix_bug")
+
+# Skip this entire test module if neither the API key nor a recording is available
 pytestmark = pytest.mark.skipif(
-    not os.getenv("GEMINI_API_KEY"),
-    reason="GEMINI_API_KEY environment variable not set"
+    not model_access_available(CASSETTE),
+    reason="GEMINI_API_KEY environment variable not set and no recorded cassette"
 )
 
 @pytest.fixture
@@ -48,7 +51,7 @@ def virtual_plugin_path(tmp_path: Path) -> Path:
     with open(profile_path, 'w') as f:
         yaml.dump(profile_data, f)
 
-    template_dir = Path(__file__).parent.parent / "templates"
+    template_dir = Path(__file__).parent.parent.parent / "templates"
     factory = PluginFactory(template_dir=template_dir)
 
     output_dir = tmp_path / "plugins"
@@ -66,13 +69,14 @@ def test_fix_bug_playbook_on_virtual_plugin(virtual_plugin_path: Path):
     orchestrator = Orchestrator(
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
-        prompt_constructor=PromptConstructor()
+        prompt_constructor=PromptConstructor(),
+        model_call_wrappers=[CASSETTE]
     )
 
     harness = EvaluationHarness(orchestrator)
 
     # 2. Execute the playbook
-    playbook_path = Path(__file__).parent.parent / "playbooks" / "playbook_fix_bug.md"
+    playbook_path = Path(__file__).parent.parent.parent / "playbooks" / "playbook_fix_bug.md"
 
     harness.run_and_capture(
         playbook_path=playbook_path,
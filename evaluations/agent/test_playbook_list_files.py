@@ -2,26 +2,25 @@
 
 import pytest
 import yaml
-import os
 import logging
 from pathlib import Path
 
-from ..harness import EvaluationHarness
+from ..harness import EvaluationHarness, load_cassette, model_access_available
 from packages.framework.factory import PluginFactory
 from packages.framework.orchestrator import Orchestrator
 from packages.framework.loaders import ProfileLoader, PlaybookLoader
 from packages.framework.prompt_constructor import PromptConstructor
-from packages.framework.tool_wrapper import tool_wrapper_factory
-from packages.plugin_manager_agent import GeminiAgent
-from packages.plugin_manager_agent.tools import TOOL_LIST
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Skip this entire test module if the API key is not available
+# Model traffic is recorded to, and replayed from, evaluations/cassettes/playbook_list_files.
+CASSETTE = load_cassette("playbook_list_files")
+
+# Skip this entire test module if neither the API key nor a recording is available
 pytestmark = pytest.mark.skipif(
-    not os.getenv("GEMINI_API_KEY"),
-    reason="GEMINI_API_KEY environment variable not set"
+    not model_access_available(CASSETTE),
+    reason="GEMINI_API_KEY environment variable not set and no recorded cassette"
 )
 
 DUMMY_FILE_NAME = "dummy_file_for_listing_test.txt"
@@ -37,7 +36,7 @@ def virtual_plugin_path(tmp_path: Path) -> Path:
     with open(profile_path, 'w') as f:
         yaml.dump(profile_data, f)
 
-    template_dir = Path(__file__).parent.parent / "templates"
+    template_dir = Path(__file__).parent.parent.parent / "templates"
     factory = PluginFactory(template_dir=template_dir)
 
     output_dir = tmp_path / "plugins"
@@ -55,20 +54,16 @@ def test_list_files_playbook_and_validate_output(virtual_plugin_path: Path):
     in its final response.
     """
     # 1. Setup
-    api_key = os.getenv("GEMINI_API_KEY")
-    tool_wrapper = tool_wrapper_factory(hitl=False)
-    wrapped_tools = [tool_wrapper(tool) for tool in TOOL_LIST]
-    agent = GeminiAgent(api_key=api_key, working_directory=str(virtual_plugin_path), tools=wrapped_tools)
     orchestrator = Orchestrator(
-        agent=agent,
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
-        prompt_constructor=PromptConstructor()
+        prompt_constructor=PromptConstructor(),
+        model_call_wrappers=[CASSETTE]
     )
     harness = EvaluationHarness(orchestrator)
 
     # 2. Execute
-    playbook_path = Path(__file__).parent.parent / "playbooks" / "playbook_list_files.md"
+    playbook_path = Path(__file__).parent.parent.parent / "playbooks" / "playbook_list_files.md"
 
     final_response = harness.run_and_capture(
         playbook_path=playbook_path,
@@ -1,28 +1,27 @@
 # evaluations/agent/test_playbook_update_description.py
 
 import pytest
-import tempfile
 import os
 import yaml
 import logging
 from pathlib import Path
 
-from ..harness import EvaluationHarness
+from ..harness import EvaluationHarness, load_cassette, model_access_available
 from packages.framework.factory import PluginFactory
 from packages.framework.orchestrator import Orchestrator
 from packages.framework.loaders import ProfileLoader, PlaybookLoader
 from packages.framework.prompt_constructor import PromptConstructor
-from packages.framework.tool_wrapper import tool_wrapper_factory
-from packages.plugin_manager_agent import GeminiAgent
-from packages.plugin_manager_agent.tools import TOOL_LIST
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Skip this entire test module if the API key is not available
+# Model traffic is recorded to, and replayed from, evaluations/cassettes/playbook_update_description.
+CASSETTE = load_cassette("playbook_update_description")
+
+# Skip this entire test module if neither the API key nor a recording is available
 pytestmark = pytest.mark.skipif(
-    not os.getenv("GEMINI_API_KEY"),
-    reason="GEMINI_API_KEY environment variable not set"
+    not model_access_available(CASSETTE),
+    reason="GEMINI_API_KEY environment variable not set and no recorded cassette"
 )
 
 ORIGINAL_DESCRIPTION = "A test plugin for demonstration purposes."
@@ -63,7 +62,8 @@ def test_update_description_playbook_and_validate_output(virtual_plugin_path_wit
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
         prompt_constructor=PromptConstructor(),
-        hitl=False
+        hitl=False,
+        model_call_wrappers=[CASSETTE]
     )
     harness = EvaluationHarness(orchestrator)
 
@@ -135,7 +135,8 @@ def test_update_description_with_edge_case(virtual_plugin_path_with_profile: Pat
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
         prompt_constructor=PromptConstructor(),
-        hitl=False
+        hitl=False,
+        model_call_wrappers=[CASSETTE]
     )
     harness = EvaluationHarness(orchestrator)
 
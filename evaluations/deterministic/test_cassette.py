@@ -0,0 +1,140 @@
+# evaluations/test_cassette.py
+
+import pytest
+import asyncio
+from pathlib import Path
+from unittest.mock import MagicMock, AsyncMock
+from google.genai import types
+
+from packages.plugin_manager_agent import GeminiAgent, Cassette, CassetteMissError
+
+def text_response(text: str) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=[types.Part.from_text(text=text)]))]
+    )
+
+def user_contents(text: str) -> list:
+    return [types.Content(role="user", parts=[types.Part.from_text(text=text)])]
+
+def sample_tool(path: str) -> str:
+    return path
+
+CONFIG = types.GenerateContentConfig(tools=[sample_tool])
+
+class TestCassette:
+    """Tests for recording and replaying model traffic."""
+
+    def test_auto_mode_records_then_replays(self, tmp_path: Path):
+        """Test that the first call is recorded and an identical request is replayed."""
+        call = MagicMock(return_value=text_response("Hello"))
+        wrapped = Cassette(tmp_path, mode="auto").wrap(call)
+
+        first = wrapped(model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG)
+        second = wrapped(model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG)
+
+        assert call.call_count == 1
+        assert first.text == second.text == "Hello"
+        assert len(list(tmp_path.glob("*.json"))) == 1
+
+    def test_different_requests_have_different_recordings(self, tmp_path: Path):
+        """Test that the request hash covers the contents and the model name."""
+        call = MagicMock(return_value=text_response("Hello"))
+        wrapped = Cassette(tmp_path, mode="auto").wrap(call)
+
+        wrapped(model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG)
+        wrapped(model="gemini-2.5-pro", contents=user_contents("Bye"), config=CONFIG)
+        wrapped(model="gemini-2.5-flash", contents=user_contents("Hi"), config=CONFIG)
+
+        assert call.call_count == 3
+        assert len(list(tmp_path.glob("*.json"))) == 3
+
+    def test_replay_mode_never_calls_the_model(self, tmp_path: Path):
+        """Test that replay mode serves recordings and fails on a miss instead of calling out."""
+        Cassette(tmp_path, mode="auto").wrap(MagicMock(return_value=text_response("Recorded")))(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        )
+
+        call = MagicMock()
+        wrapped = Cassette(tmp_path, mode="replay").wrap(call)
+
+        assert wrapped(model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG).text == "Recorded"
+        with pytest.raises(CassetteMissError):
+            wrapped(model="gemini-2.5-pro", contents=user_contents("Unseen"), config=CONFIG)
+        call.assert_not_called()
+
+    def test_record_mode_overwrites_recordings(self, tmp_path: Path):
+        """Test that record mode always calls the model and replaces the stored response."""
+        Cassette(tmp_path, mode="auto").wrap(MagicMock(return_value=text_response("Old")))(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        )
+        Cassette(tmp_path, mode="record").wrap(MagicMock(return_value=text_response("New")))(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        )
+
+        replayed = Cassette(tmp_path, mode="replay").wrap(MagicMock())(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        )
+        assert replayed.text == "New"
+
+    def test_async_wrapper_replays(self, tmp_path: Path):
+        """Test that the async wrapper shares recordings with the sync one."""
+        Cassette(tmp_path, mode="auto").wrap(MagicMock(return_value=text_response("Hello")))(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        )
+        call = AsyncMock()
+        wrapped = Cassette(tmp_path, mode="replay").wrap_async(call)
+
+        response = asyncio.run(wrapped(model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG))
+
+        assert response.text == "Hello"
+        call.assert_not_awaited()
+
+    def test_stream_wrapper_records_chunks(self, tmp_path: Path):
+        """Test that streamed chunks are recorded and replayed in order, separately from unary calls."""
+        call = MagicMock(return_value=iter([text_response("Hel"), text_response("lo")]))
+        chunks = list(Cassette(tmp_path, mode="auto").wrap_stream(call)(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        ))
+        assert [chunk.text for chunk in chunks] == ["Hel", "lo"]
+
+        replay = MagicMock()
+        replayed = list(Cassette(tmp_path, mode="replay").wrap_stream(replay)(
+            model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+        ))
+        assert [chunk.text for chunk in replayed] == ["Hel", "lo"]
+        replay.assert_not_called()
+        with pytest.raises(CassetteMissError):
+            Cassette(tmp_path, mode="replay").wrap(MagicMock())(
+                model="gemini-2.5-pro", contents=user_contents("Hi"), config=CONFIG
+            )
+
+    def test_invalid_mode_raises(self, tmp_path: Path):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            Cassette(tmp_path, mode="rewind")
+
+    def test_agent_function_call_turns_replay_offline(self, tmp_path: Path):
+        """Test that a recorded multi-turn session with tool calls replays without the model."""
+        workspace = tmp_path / "plugin"
+        workspace.mkdir()
+        (workspace / "notes.txt").write_text("hello")
+        cassette_dir = tmp_path / "cassette"
+
+        def read_file(path: str) -> str:
+            return (workspace / path).read_text()
+
+        function_call_turn = types.GenerateContentResponse(candidates=[types.Candidate(content=types.Content(
+            role="model", parts=[types.Part(function_call=types.FunctionCall(name="read_file", args={"path": "notes.txt"}))]
+        ))])
+
+        recording_agent = GeminiAgent(api_key="test_key", working_directory=str(workspace), tools=[read_file],
+                                      model_call_wrappers=[Cassette(cassette_dir, mode="auto")])
+        recording_agent.client = MagicMock()
+        recording_agent.client.models.generate_content.side_effect = [function_call_turn, text_response("It says hello")]
+        assert recording_agent.execute("Read notes.txt") == "It says hello"
+
+        replaying_agent = GeminiAgent(api_key="test_key", working_directory=str(workspace), tools=[read_file],
+                                      model_call_wrappers=[Cassette(cassette_dir, mode="replay")])
+        replaying_agent.client = MagicMock()
+        assert replaying_agent.execute("Read notes.txt") == "It says hello"
+        replaying_agent.client.models.generate_content.assert_not_called()
@@ -0,0 +1,82 @@
+# evaluations/test_content_cache.py
+
+import os
+from pathlib import Path
+
+from packages.plugin_manager_agent import ContentCache
+from packages.plugin_manager_agent.workspace import Workspace, use_workspace
+from packages.plugin_manager_agent.tools import read_file, write_file, edit_file
+
+class TestContentCache:
+    """Tests for the file content cache shared by the file tools."""
+
+    def test_repeated_reads_hit(self, tmp_path: Path):
+        """Test that reading an unchanged file again is served from the cache."""
+        path = tmp_path / "main.py"
+        path.write_text("print('hello')\n")
+        cache = ContentCache()
+
+        assert cache.read_text(path) == "print('hello')\n"
+        assert cache.read_text(path) == "print('hello')\n"
+        assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 1, "bytes": 15}
+
+    def test_outside_changes_are_seen(self, tmp_path: Path):
+        """Test that a file changed behind the cache's back is read again."""
+        path = tmp_path / "main.py"
+        path.write_text("old")
+        cache = ContentCache()
+        cache.read_text(path)
+
+        path.write_text("changed")
+        assert cache.read_text(path) == "changed"
+
+        # Replacing the file (a new inode) is noticed even with the same size and mtime.
+        stat = path.stat()
+        replacement = tmp_path / "replacement.py"
+        replacement.write_text("CHANGED")
+        os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(replacement, path)
+        assert cache.read_text(path) == "CHANGED"
+        assert cache.stats()["hits"] == 0
+
+    def test_writes_go_through_the_cache(self, tmp_path: Path):
+        """Test that written content is on disk and served by the next read."""
+        path = tmp_path / "out.txt"
+        cache = ContentCache()
+
+        cache.write_text(path, "written")
+        assert path.read_text() == "written"
+        assert cache.read_text(path) == "written"
+        assert cache.stats()["hits"] == 1
+
+        # Carriage returns are translated on read, so such content is read back from disk.
+        cache.write_text(path, "a\r\nb")
+        assert cache.read_text(path) == "a\nb"
+
+    def test_byte_budget_evicts_least_recently_used(self, tmp_path: Path):
+        """Test that the cache stays within its byte budget by evicting the oldest files."""
+        cache = ContentCache(max_bytes=25)
+        for name in ("a", "b", "c"):
+            (tmp_path / name).write_text(name * 10)
+
+        cache.read_text(tmp_path / "a")
+        cache.read_text(tmp_path / "b")
+        cache.read_text(tmp_path / "a")
+        cache.read_text(tmp_path / "c")
+
+        assert cache.stats() == {"hits": 1, "misses": 3, "evictions": 1, "entries": 2, "bytes": 20}
+        cache.read_text(tmp_path / "a")
+        assert cache.stats()["hits"] == 2
+
+    def test_tools_share_the_workspace_cache(self, tmp_path: Path):
+        """Test that read_file, edit_file and write_file read and write through the workspace's cache."""
+        cache = ContentCache()
+        with use_workspace(Workspace(tmp_path, content_cache=cache)):
+            write_file("main.py", "x = 1\n")
+            assert read_file("main.py") == "x = 1\n"
+            assert edit_file("main.py", "x = 1", "x = 2") == "Successfully edited main.py."
+            assert read_file("main.py") == "x = 2\n"
+
+        assert (tmp_path / "main.py").read_text() == "x = 2\n"
+        assert cache.stats()["hits"] == 3
+        assert cache.stats()["misses"] == 0
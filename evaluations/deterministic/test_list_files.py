@@ -4,7 +4,11 @@ import pytest
 import tempfile
 import os
 from pathlib import Path
+from unittest.mock import patch
 
+from packages.plugin_manager_agent import WorkspaceIndex
+from packages.plugin_manager_agent.workspace import Workspace, use_workspace
+from packages.plugin_manager_agent.tools import write_file
 from packages.plugin_manager_agent.tools.list_files import list_files
 
 class TestListFilesIsolated:
@@ -211,3 +215,81 @@ class TestListFilesIsolated:
             # Should list both files and directories
             assert "file1.txt" in result
             assert "subdir" in result
+
+class TestListFilesRecursive:
+    """Tests for recursive, filtered listings."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        for relative in ("README.md", "src/main.py", "src/utils/helpers.py", "build/out.bin", "debug.log", "keep.log",
+                         ".git/HEAD", "src/__pycache__/main.cpython-311.pyc", ".venv/bin/python"):
+            (tmp_path / relative).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / relative).write_text("content")
+        (tmp_path / ".gitignore").write_text("# build output\nbuild/\n*.log\n!keep.log\n")
+        return tmp_path
+
+    def test_recursive_listing_is_a_sorted_tree(self, tree):
+        """Test that subdirectories are listed right after their directory, down to max_depth."""
+        result = list_files(str(tree), max_depth=3)
+        assert result.splitlines() == [
+            str(tree / name) for name in
+            (".gitignore", "README.md", "keep.log", "src", "src/main.py", "src/utils", "src/utils/helpers.py")
+        ]
+
+    def test_depth_limit(self, tree):
+        """Test that max_depth stops the listing at that many levels."""
+        result = list_files(str(tree), max_depth=2)
+        assert str(tree / "src" / "utils") in result
+        assert "helpers.py" not in result
+
+    def test_gitignore_and_exclude_can_be_turned_off_or_extended(self, tree):
+        """Test that .gitignore rules can be ignored and extra patterns excluded."""
+        result = list_files(str(tree), max_depth=2, use_gitignore=False, exclude=["src/"])
+        assert "debug.log" in result and "build" in result
+        assert "src" not in result
+        assert ".git" + os.sep not in result and ".venv" not in result
+
+    def test_truncation_marker(self, tree):
+        """Test that a listing over max_entries is cut off with a marker."""
+        lines = list_files(str(tree), max_depth=3, max_entries=2).splitlines()
+        assert lines[:2] == [str(tree / ".gitignore"), str(tree / "README.md")]
+        assert lines[2].startswith("... [truncated after 2 entries")
+
+    def test_details_columns(self, tree):
+        """Test that details adds the type, size and mtime of each entry."""
+        lines = list_files(str(tree), details=True).splitlines()
+        readme = next(line for line in lines if line.endswith("README.md"))
+        src = next(line for line in lines if line.endswith("src"))
+        assert readme.split()[:2] == ["file", "7"]
+        assert src.split()[:2] == ["dir", "-"]
+
+    @pytest.mark.parametrize("arguments", [
+        {"max_depth": 3},
+        {"max_depth": 3, "details": True},
+        {"max_depth": 2, "use_gitignore": False, "exclude": ["src/"]},
+        {"path_suffix": "src", "max_depth": 2},
+    ])
+    def test_workspace_index_lists_what_the_disk_does(self, tree, arguments):
+        """Test that a listing answered by the workspace index matches one read from the disk."""
+        (tree / "src" / ".gitignore").write_text("helpers.py\n")
+        (tree / "src" / "utils" / "kept.py").write_text("x")
+        (tree / "empty").mkdir()
+        (tree / "link.md").symlink_to(tree / "README.md")
+        arguments = dict(arguments)
+        path = str(tree / arguments.pop("path_suffix", ""))
+
+        expected = list_files(path, **arguments)
+        with use_workspace(Workspace(tree, index=WorkspaceIndex(tree))):
+            with patch("packages.plugin_manager_agent.tools.list_files._walk") as walk:
+                assert list_files(path, **arguments) == expected
+                walk.assert_not_called()
+
+    def test_workspace_index_sees_files_written_by_the_tools(self, tree):
+        """Test that files written through the tools are listed without a full rescan."""
+        index = WorkspaceIndex(tree)
+        with use_workspace(Workspace(tree, index=index)):
+            list_files(".")
+            with patch.object(WorkspaceIndex, "_scan") as scan:
+                write_file("src/new/module.py", "x = 1\n")
+                assert "src/new/module.py" in list_files("src", max_depth=3).replace(os.sep, "/")
+                scan.assert_not_called()
@@ -3,9 +3,12 @@
 import pytest
 import tempfile
 import os
+import hashlib
 from pathlib import Path
 
 from packages.plugin_manager_agent.tools.read_file import read_file
+from packages.plugin_manager_agent.workspace import Workspace, use_workspace
+from packages.plugin_manager_agent.read_ledger import ReadLedger
 
 class TestReadFileIsolated:
     """Isolated tests for the read_file tool functionality."""
@@ -133,3 +136,93 @@ Line 3"""
                 assert result == content
             finally:
                 os.unlink(temp_file_path)
+
+class TestReadFileRanges:
+    """Tests for paged reads by line and by byte."""
+
+    @pytest.fixture
+    def numbered_file(self, tmp_path):
+        path = tmp_path / "numbers.txt"
+        path.write_text("".join(f"line {i}\n" for i in range(1, 101)))
+        return path
+
+    def test_read_lines(self, numbered_file):
+        """Test that a line range returns those lines under a header with the totals."""
+        result = read_file(str(numbered_file), start_line=10, max_lines=3)
+        size = numbered_file.stat().st_size
+        assert result == f"[{numbered_file}: lines 10-12 of 100, {size} bytes]\nline 10\nline 11\nline 12\n"
+
+    def test_read_lines_past_the_end(self, numbered_file):
+        """Test that a range past the last line reports the line count instead of content."""
+        result = read_file(str(numbered_file), start_line=101)
+        assert "no lines from line 101; the file has 100 lines" in result
+
+    def test_read_bytes(self, numbered_file):
+        """Test that a byte range returns exactly those bytes."""
+        result = read_file(str(numbered_file), byte_offset=7, max_bytes=6)
+        header, content = result.split("\n", 1)
+        assert header.endswith("bytes 7-13 of 792, 100 lines]")
+        assert content == "line 2"
+
+    def test_line_index_is_reused_until_the_file_changes(self, numbered_file):
+        """Test that the line index is built once per file version."""
+        from packages.plugin_manager_agent.tools.read_file import line_index
+
+        index = line_index(numbered_file)
+        assert line_index(numbered_file) is index
+
+        numbered_file.write_text("just one line")
+        stat = numbered_file.stat()
+        os.utime(numbered_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert line_index(numbered_file).line_count == 1
+
+    def test_very_large_file_returns_first_page(self, tmp_path):
+        """Test that an unranged read of a file over 4 MB pages instead of returning everything."""
+        path = tmp_path / "big.log"
+        path.write_text("x" * 99 + "\n" * 1 + ("y" * 99 + "\n") * 50_000)
+        result = read_file(str(path))
+        assert result.startswith(f"[{path} is larger than 4 MB")
+        assert f"lines 1-200 of 50001, {path.stat().st_size} bytes]" in result
+        assert len(result) < 25_000
+
+class TestReadFileUnchanged:
+    """Tests for answering re-reads of unchanged content with a marker."""
+
+    @pytest.fixture
+    def workspace(self, tmp_path):
+        (tmp_path / "main.py").write_text("def main():\n    return 'hello'\n" * 10)
+        workspace = Workspace(tmp_path, read_ledger=ReadLedger())
+        with use_workspace(workspace):
+            yield workspace
+
+    def test_reread_returns_marker(self, workspace):
+        """Test that reading unchanged content again returns a marker naming the earlier turn."""
+        workspace.read_ledger.begin_turn(1)
+        content = read_file("main.py")
+        workspace.read_ledger.begin_turn(3)
+
+        marker = read_file("main.py")
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        assert marker == f"[main.py: unchanged since turn 1 (sha256 {digest[:16]}); pass force=True to read it again]"
+        assert read_file("main.py", force=True) == content
+
+    def test_changed_content_is_returned_in_full(self, workspace):
+        """Test that content that changed since the last read is returned again."""
+        read_file("main.py")
+        (workspace.root / "main.py").write_text("def main():\n    return 'changed'\n" * 10)
+        assert read_file("main.py").startswith("def main():\n    return 'changed'")
+
+    def test_compacted_content_is_forgotten(self, workspace):
+        """Test that content compacted out of the sent history is returned in full again."""
+        workspace.read_ledger.begin_turn(1)
+        content = read_file("main.py")
+        digest = hashlib.sha256(content.encode()).hexdigest()
+
+        workspace.read_ledger.begin_turn(5, compacted={(2, digest)})
+        assert read_file("main.py") == content
+
+    def test_no_marker_without_ledger(self, tmp_path):
+        """Test that reads outside an agent run always return the content."""
+        path = tmp_path / "main.py"
+        path.write_text("x" * 500)
+        assert read_file(str(path)) == read_file(str(path)) == "x" * 500
@@ -0,0 +1,90 @@
+# evaluations/test_workspace.py
+
+import pytest
+import tempfile
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from pathlib import Path
+
+from packages.plugin_manager_agent.workspace import Workspace, use_workspace, resolve_path, get_current_workspace
+from packages.plugin_manager_agent.tools import read_file, write_file, edit_file, list_files, execute_shell_command
+
+class TestWorkspace:
+    """Tests for per-run workspace path resolution."""
+
+    def test_resolve_relative_path_against_root(self):
+        """Test that relative paths resolve against the workspace root, not the cwd."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workspace = Workspace(temp_dir)
+            assert workspace.resolve("src/main.py") == Path(temp_dir).resolve() / "src" / "main.py"
+            assert workspace.resolve(".") == Path(temp_dir).resolve()
+
+    def test_resolve_rejects_paths_outside_root(self):
+        """Test that paths escaping the workspace root are refused."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            workspace = Workspace(temp_dir)
+            with pytest.raises(PermissionError):
+                workspace.resolve("../outside.txt")
+            with pytest.raises(PermissionError):
+                workspace.resolve("/etc/passwd")
+
+    def test_resolve_path_without_workspace_is_unchanged(self):
+        """Test that tools called outside a workspace keep their original behavior."""
+        assert get_current_workspace() is None
+        assert resolve_path("relative.txt") == Path("relative.txt")
+
+    def test_tools_use_workspace_root(self):
+        """Test that every tool operates relative to the bound workspace."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with use_workspace(Workspace(temp_dir)):
+                assert "Successfully wrote" in write_file("notes.txt", "hello")
+                assert read_file("notes.txt") == "hello"
+                assert "Successfully edited" in edit_file("notes.txt", "hello", "goodbye")
+                assert list_files(".") == "notes.txt"
+                assert "goodbye" in execute_shell_command("cat notes.txt")
+
+            assert (Path(temp_dir) / "notes.txt").read_text() == "goodbye"
+            assert get_current_workspace() is None
+
+    def test_tools_refuse_paths_outside_workspace(self):
+        """Test that tools report an error instead of touching files outside the root."""
+        with tempfile.TemporaryDirectory() as outer_dir:
+            root = Path(outer_dir) / "plugin"
+            root.mkdir()
+            (Path(outer_dir) / "secret.txt").write_text("secret")
+
+            with use_workspace(Workspace(root)):
+                assert "Error reading file" in read_file("../secret.txt")
+                assert "Error writing to file" in write_file("../secret.txt", "overwritten")
+
+            assert (Path(outer_dir) / "secret.txt").read_text() == "secret"
+
+    def test_concurrent_workspaces_in_threads(self):
+        """Test that two threads can each operate on their own workspace."""
+        with tempfile.TemporaryDirectory() as dir_a, tempfile.TemporaryDirectory() as dir_b:
+            (Path(dir_a) / "name.txt").write_text("a")
+            (Path(dir_b) / "name.txt").write_text("b")
+            original_cwd = os.getcwd()
+
+            def read_in(root):
+                with use_workspace(Workspace(root)):
+                    return [read_file("name.txt") for _ in range(50)]
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                result_a = executor.submit(read_in, dir_a)
+                result_b = executor.submit(read_in, dir_b)
+
+            assert set(result_a.result()) == {"a"}
+            assert set(result_b.result()) == {"b"}
+            assert os.getcwd() == original_cwd
+
+    def test_workspace_propagates_with_copied_context(self):
+        """Test that a copied context carries the workspace into a worker thread."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "data.txt").write_text("from worker")
+            with use_workspace(Workspace(temp_dir)):
+                context = copy_context()
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(context.run, read_file, "data.txt").result()
+            assert result == "from worker"
@@ -0,0 +1,123 @@
+# evaluations/test_workspace_index.py
+
+import hashlib
+from pathlib import Path
+from unittest.mock import patch
+
+from packages.plugin_manager_agent import ContentCache, WorkspaceIndex
+from packages.plugin_manager_agent.workspace import Workspace, use_workspace
+from packages.plugin_manager_agent.tools import write_file, edit_file, execute_shell_command
+
+def sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+class TestWorkspaceIndex:
+    """Tests for the persistent file index and its change journal."""
+
+    def make_plugin(self, root: Path) -> Path:
+        (root / "src").mkdir()
+        (root / "src" / "main.py").write_text("print('hi')\n")
+        (root / "plugin-profile.yaml").write_text("name: demo\n")
+        (root / "__pycache__").mkdir()
+        (root / "__pycache__" / "main.pyc").write_text("bytecode")
+        return root
+
+    def test_index_records_files_and_persists(self, tmp_path: Path):
+        """Test that the index records every file and a new instance reloads it without re-hashing."""
+        self.make_plugin(tmp_path)
+        files = WorkspaceIndex(tmp_path).refresh()
+
+        assert sorted(files) == ["plugin-profile.yaml", "src/main.py"]
+        assert files["src/main.py"].sha256 == sha256("print('hi')\n")
+        assert (tmp_path / ".history" / "workspace-index" / "index.json").is_file()
+
+        with patch.object(WorkspaceIndex, "_hash") as hash_file:
+            assert WorkspaceIndex(tmp_path).refresh() == files
+            hash_file.assert_not_called()
+
+    def test_full_refresh_rehashes_only_changed_files(self, tmp_path: Path):
+        """Test that a full refresh re-hashes changed files only, and picks up new and deleted ones."""
+        self.make_plugin(tmp_path)
+        index = WorkspaceIndex(tmp_path)
+        index.refresh()
+
+        (tmp_path / "src" / "main.py").write_text("print('hello')\n")
+        (tmp_path / "src" / "new.py").write_text("x = 1\n")
+        (tmp_path / "plugin-profile.yaml").unlink()
+
+        with patch.object(WorkspaceIndex, "_hash", side_effect=WorkspaceIndex._hash) as hash_file:
+            files = index.refresh(full=True)
+        assert sorted(call.args[0].name for call in hash_file.call_args_list) == ["main.py", "new.py"]
+        assert sorted(files) == ["src/main.py", "src/new.py"]
+        assert files["src/main.py"].sha256 == sha256("print('hello')\n")
+
+    def test_journaled_changes_are_applied_without_a_scan(self, tmp_path: Path):
+        """Test that after the first refresh only journaled paths are looked at."""
+        self.make_plugin(tmp_path)
+        index = WorkspaceIndex(tmp_path)
+        index.refresh()
+
+        with use_workspace(Workspace(tmp_path, index=index)):
+            write_file("src/new.py", "x = 1\n")
+            edit_file("src/main.py", "hi", "hello")
+        (tmp_path / "plugin-profile.yaml").write_text("name: changed outside the tools\n")
+
+        with patch.object(WorkspaceIndex, "_scan") as scan:
+            files = index.refresh()
+            scan.assert_not_called()
+        assert files["src/new.py"].sha256 == sha256("x = 1\n")
+        assert files["src/main.py"].sha256 == sha256("print('hello')\n")
+        assert files["plugin-profile.yaml"].sha256 == sha256("name: demo\n")
+
+        # A full refresh also picks up edits made outside the tools.
+        assert index.refresh(full=True)["plugin-profile.yaml"].sha256 == sha256("name: changed outside the tools\n")
+        assert [(change["tool"], change["path"]) for change in index.changes()] == [
+            ("write_file", "src/new.py"), ("edit_file", "src/main.py")
+        ]
+
+    def test_shell_commands_trigger_a_full_refresh(self, tmp_path: Path):
+        """Test that a shell command, which can change anything, makes the next refresh stat every file."""
+        self.make_plugin(tmp_path)
+        index = WorkspaceIndex(tmp_path)
+        index.refresh()
+
+        with use_workspace(Workspace(tmp_path, index=index)):
+            execute_shell_command("rm src/main.py && echo 'name: moved' > profile.yaml")
+
+        files = index.refresh()
+        assert sorted(files) == ["plugin-profile.yaml", "profile.yaml"]
+        change = index.changes()[-1]
+        assert (change["tool"], change["path"]) == ("execute_shell_command", None)
+
+    def test_full_refresh_drops_changed_files_from_the_content_cache(self, tmp_path: Path):
+        """Test that files a full refresh finds changed or deleted are evicted from the content cache."""
+        self.make_plugin(tmp_path)
+        cache = ContentCache()
+        index = WorkspaceIndex(tmp_path, content_cache=cache)
+        index.refresh()
+        cache.read_text(tmp_path / "src" / "main.py")
+        cache.read_text(tmp_path / "plugin-profile.yaml")
+
+        (tmp_path / "src" / "main.py").unlink()
+        index.refresh(full=True)
+
+        assert cache.stats()["entries"] == 1
+
+    def test_journal_is_compacted(self, tmp_path: Path):
+        """Test that a journal past its size limit is emptied, and that other indexes notice and rescan."""
+        self.make_plugin(tmp_path)
+        index = WorkspaceIndex(tmp_path, max_journal_bytes=200)
+        other = WorkspaceIndex(tmp_path)
+        index.refresh()
+        other.refresh()
+
+        for number in range(5):
+            (tmp_path / f"file{number}.py").write_text("x")
+            index.record_change(tmp_path / f"file{number}.py", "write_file")
+        index.refresh()
+
+        assert (tmp_path / ".history" / "workspace-index" / "journal.jsonl").read_bytes() == b""
+        (tmp_path / "late.py").write_text("x")  # A change whose journal entry went to the old file.
+        with patch.object(WorkspaceIndex, "_scan", side_effect=WorkspaceIndex._scan, autospec=True) as scan:
+            assert "late.py" in other.refresh()
+            scan.assert_called_once()
@@ -1,7 +1,10 @@
 # packages/framework/__main__.py
 
 import argparse
+import json
 import os
+import socket
+import threading
 from pathlib import Path
 import logging
 
@@ -10,21 +13,468 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from packages.framework.orchestrator import Orchestrator
+from packages.framework.batch import run_batch
+from packages.framework.checkpoints import new_run_id
+from packages.framework.daemon import OrchestratorDaemon, RunRequest, submit_run
+from packages.framework.job_queue import JobQueue, JobWorker
+from packages.framework.scheduler import ModelCallScheduler
+from packages.framework.resilience import Resilience
+from packages.framework.client_pool import client_pool
+from packages.framework.tool_registry import tool_registry
+from packages.framework.mock_gemini_server import MockGeminiServer, MockScript
 from packages.framework.loaders import ProfileLoader, PlaybookLoader
 from packages.framework.prompt_constructor import PromptConstructor
-from packages.framework.utils import get_gemini_api_key
+from packages.framework.context_primer import ContextPrimer
+from packages.framework.utils import KeyPool, get_gemini_api_key, resolve_api_keys
+from packages.plugin_manager_agent import RunBudget, content_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_DAEMON_SOCKET = PROJECT_ROOT / ".framework-daemon.sock"
+DEFAULT_JOB_DB = PROJECT_ROOT / ".jobs.sqlite3"
+
+def print_stream(events) -> str:
+    """Prints streamed agent events as they arrive and returns the final response."""
+    final_response = None
+    for event in events:
+        if event["type"] == "text":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "tool_started":
+            args = ", ".join(f"{key}={value!r}" for key, value in event["args"].items())
+            print(f"\n[tool] {event['name']}({args})", flush=True)
+        elif event["type"] == "tool_finished":
+            status = "failed" if "error" in event["response"] else "done"
+            print(f"[tool] {event['name']} {status} in {event['seconds']:.2f}s", flush=True)
+        elif event["type"] == "final":
+            final_response = event["text"]
+            if event["result"]["status"] == "budget_exceeded":
+                print(f"\n[budget] Run stopped early: {event['result']['reason']}", flush=True)
+            print(f"\n[usage] {format_usage(event['result']['usage'])}", flush=True)
+    return final_response
+
+def format_usage(usage: dict) -> str:
+    """Formats a run's usage summary on one line."""
+    return (
+        f"{usage.get('turns', 0)} turn(s), {usage.get('tool_calls', 0)} tool call(s), "
+        f"{usage.get('input_tokens', 0)} input tokens ({usage.get('cached_tokens', 0)} cached), "
+        f"{usage.get('output_tokens', 0)} output tokens ({usage.get('thinking_tokens', 0)} thinking), "
+        f"{usage.get('seconds', 0)}s total ({usage.get('model_seconds', 0)}s model, {usage.get('tool_seconds', 0)}s tools)"
+    )
+
+def add_context_priming_argument(parser: argparse.ArgumentParser):
+    """Adds the option that turns off context priming for the commands that start runs."""
+    parser.add_argument(
+        "--no-context-priming", action="store_true",
+        help="Do not prepend the plugin's file manifest, profile digest and small files to the prompt."
+    )
+
+def prompt_constructor_from_args(args) -> PromptConstructor:
+    """Returns a prompt constructor that primes the context unless --no-context-priming was given."""
+    return PromptConstructor(context_primer=None if args.no_context_priming else ContextPrimer())
+
+BUDGET_LIMITS = ("max_seconds", "max_turns", "max_tool_calls", "max_input_tokens", "max_output_tokens")
+
+def add_budget_arguments(parser: argparse.ArgumentParser):
+    """Adds the per-run budget options shared by the commands that start runs."""
+    group = parser.add_argument_group("per-run budget", "A run that reaches a limit stops early with its partial result.")
+    group.add_argument("--max-seconds", type=float, help="Wall-clock deadline; running tools are cancelled when it passes.")
+    group.add_argument("--max-turns", type=int, help="Maximum number of model turns.")
+    group.add_argument("--max-tool-calls", type=int, help="Maximum number of tool calls.")
+    group.add_argument("--max-input-tokens", type=int, help="Maximum prompt tokens, summed over all turns.")
+    group.add_argument("--max-output-tokens", type=int, help="Maximum output (including thinking) tokens, summed over all turns.")
+
+def budget_from_args(args) -> RunBudget | None:
+    """Returns the budget set on the command line, or None if no limit was given."""
+    limits = {name: getattr(args, name) for name in BUDGET_LIMITS}
+    if all(value is None for value in limits.values()):
+        return None
+    return RunBudget(**limits)
+
+def batch_main(argv):
+    """Runs a playbook across many plugins in parallel."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework batch",
+        description="Run a playbook across many plugins using a bounded process pool."
+    )
+    parser.add_argument("playbook_name", help="The name of the playbook to run (e.g., 'playbook_fix_bug').")
+    parser.add_argument("plugin_names", nargs="*", help="The plugins to operate on. Defaults to every plugin in /plugins_real.")
+    parser.add_argument("--workers", type=int, default=None, help="Maximum number of concurrent runs (defaults to the CPU count).")
+    parser.add_argument("--bug", help="The description of the bug to fix.", default="")
+    parser.add_argument("--env", choices=["virtual", "real"], default="real", help="The execution environment.")
+    parser.add_argument("--output", type=Path, help="Write the collected results to this JSON file.")
+    parser.add_argument("--api-key", help="Gemini API key(s), comma-separated (overrides other sources).")
+    add_budget_arguments(parser)
+    add_context_priming_argument(parser)
+
+    args = parser.parse_args(argv)
+
+    try:
+        api_keys = resolve_api_keys(args.api_key)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    plugins_root = PROJECT_ROOT / "plugins_real"
+    playbook_path = PROJECT_ROOT / "playbooks" / f"{args.playbook_name}.md"
+
+    if not playbook_path.is_file():
+        print(f"Error: Playbook '{args.playbook_name}' not found at {playbook_path}")
+        sys.exit(1)
+
+    if args.plugin_names:
+        plugin_paths = [plugins_root / name for name in args.plugin_names]
+    else:
+        plugin_paths = sorted(p for p in plugins_root.iterdir() if p.is_dir())
+
+    missing = [p for p in plugin_paths if not p.is_dir()]
+    if missing:
+        print(f"Error: Plugin(s) not found: {', '.join(str(p) for p in missing)}")
+        sys.exit(1)
+
+    print(f"Running playbook '{args.playbook_name}' on {len(plugin_paths)} plugin(s)...")
+    results = run_batch(
+        playbook_path=playbook_path,
+        plugin_paths=plugin_paths,
+        env=args.env,
+        api_key=list(api_keys),
+        max_workers=args.workers,
+        budget=budget_from_args(args),
+        prime_context=not args.no_context_priming,
+        bug_description=args.bug
+    )
+
+    for result in results:
+        if not result.succeeded:
+            status = f"FAILED ({result.error})"
+        elif result.status == "budget_exceeded":
+            status = f"STOPPED ({result.reason})"
+        else:
+            status = "OK"
+        print(f"  {Path(result.plugin_path).name}: {status}, {len(result.events)} tool event(s)")
+
+    if args.output:
+        args.output.write_text(json.dumps([r.model_dump() for r in results], indent=2, default=str))
+        print(f"Results written to {args.output}")
+
+    if not all(result.succeeded for result in results):
+        sys.exit(1)
+
+def resume_main(argv):
+    """Resumes an interrupted run from its checkpoint."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework resume",
+        description="Resume an interrupted playbook run from the plugin's .history directory."
+    )
+    parser.add_argument("plugin_name", help="The name of the plugin the run operated on (must be in /plugins_real).")
+    parser.add_argument("run_id", help="The run ID printed when the run started.")
+    parser.add_argument("--hitl", action="store_true", help="Enable Human-in-the-Loop confirmation for destructive tools.")
+    parser.add_argument("--api-key", help="Gemini API key (overrides other sources).")
+
+    args = parser.parse_args(argv)
+
+    try:
+        api_key = get_gemini_api_key(args.api_key)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    plugin_path = PROJECT_ROOT / "plugins_real" / args.plugin_name
+    orchestrator = Orchestrator(
+        profile_loader=ProfileLoader(),
+        playbook_loader=PlaybookLoader(),
+        prompt_constructor=PromptConstructor(),
+        hitl=args.hitl,
+        resilience=Resilience()
+    )
+
+    print(f"Resuming run '{args.run_id}' on plugin '{args.plugin_name}'...")
+    try:
+        final_response = orchestrator.resume(plugin_path=plugin_path, run_id=args.run_id, api_key=api_key)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print("\n--- Agent's Final Response ---")
+    print(final_response)
+    print("----------------------------\n")
+
+def mock_server_main(argv):
+    """Serves a scripted, Gemini-compatible API on localhost for load testing."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework mock-server",
+        description="Run a local stand-in for the Gemini API that plays back a scripted conversation."
+    )
+    parser.add_argument("script", type=Path, help="Path to the YAML script of turns, latency and rate-limit settings.")
+    parser.add_argument("--host", default="127.0.0.1", help="The interface to listen on.")
+    parser.add_argument("--port", type=int, default=8765, help="The port to listen on.")
+
+    args = parser.parse_args(argv)
+
+    server = MockGeminiServer(MockScript.load(args.script), host=args.host, port=args.port)
+    print(f"Serving mock Gemini API at {server.base_url} (set GEMINI_BASE_URL to use it). Press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"Stats: {server.stats}")
+
+def daemon_main(argv):
+    """Runs a long-lived daemon that executes playbooks submitted over a Unix socket."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework daemon",
+        description="Keep the framework warm and serve playbook runs submitted with 'submit'."
+    )
+    parser.add_argument("--socket", type=Path, default=DEFAULT_DAEMON_SOCKET, help="The Unix domain socket to listen on.")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of concurrent runs.")
+    parser.add_argument("--rpm", type=float, default=60, help="Model requests per minute shared by all runs.")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Model tokens per minute shared by all runs.")
+    parser.add_argument("--api-key", help="Gemini API key(s), comma-separated (overrides other sources).")
+    parser.add_argument("--key-strategy", choices=KeyPool.STRATEGIES, default="round_robin", help="How runs are spread over several keys.")
+    add_budget_arguments(parser)
+    add_context_priming_argument(parser)
+
+    args = parser.parse_args(argv)
+
+    try:
+        api_keys = resolve_api_keys(args.api_key)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    # Runs submitted to the daemon come from people waiting at a terminal.
+    orchestrator = Orchestrator(
+        profile_loader=ProfileLoader(cache=True),
+        playbook_loader=PlaybookLoader(cache=True),
+        prompt_constructor=prompt_constructor_from_args(args),
+        scheduler=ModelCallScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm),
+        priority="interactive",
+        resilience=Resilience(),
+        key_pool=KeyPool(api_keys, strategy=args.key_strategy),
+        budget=budget_from_args(args)
+    )
+    daemon = OrchestratorDaemon(args.socket, api_key=None, max_workers=args.workers, orchestrator=orchestrator)
+    for api_key in api_keys:
+        client_pool.warm_up(api_key)
+    print(f"Daemon listening on {args.socket} with {args.workers} worker(s). Press Ctrl+C to stop.")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        print(f"Connections: {client_pool.stats()}")
+        print(f"File cache: {content_cache.stats()}")
+
+def submit_main(argv):
+    """Submits a playbook run to a running daemon and streams its output."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework submit",
+        description="Run a playbook through a running 'daemon' instead of starting a new interpreter."
+    )
+    parser.add_argument("plugin_name", help="The name of the plugin to operate on (must be in /plugins_real).")
+    parser.add_argument("playbook_name", help="The name of the playbook to run (e.g., 'playbook_fix_bug').")
+    parser.add_argument("--bug", help="The description of the bug to fix.", default="")
+    parser.add_argument("--socket", type=Path, default=DEFAULT_DAEMON_SOCKET, help="The daemon's Unix domain socket.")
+    parser.add_argument("--api-key", help="Gemini API key for this run (defaults to the daemon's key).")
+    parser.add_argument(
+        "--priority", choices=["interactive", "batch"], default="interactive",
+        help="Scheduler priority: batch runs only get model quota that interactive runs leave over."
+    )
+
+    args = parser.parse_args(argv)
+
+    request = RunRequest(
+        playbook_path=str(PROJECT_ROOT / "playbooks" / f"{args.playbook_name}.md"),
+        plugin_path=str(PROJECT_ROOT / "plugins_real" / args.plugin_name),
+        api_key=args.api_key,
+        priority=args.priority,
+        kwargs={"bug_description": args.bug}
+    )
+
+    def events():
+        for event in submit_run(args.socket, request):
+            if event["type"] == "accepted":
+                print(f"Running playbook '{args.playbook_name}' on plugin '{args.plugin_name}' (run ID: {event['run_id']})...")
+            elif event["type"] == "error":
+                print(f"Error: {event['error']}")
+                sys.exit(1)
+            else:
+                yield event
+
+    try:
+        final_response = print_stream(events())
+    except ConnectionError as e:
+        print(f"Error: {e}. Start one with: python -m packages.framework daemon")
+        sys.exit(1)
+
+    print("\n--- Agent's Final Response ---")
+    print(final_response)
+    print("----------------------------\n")
+
+def enqueue_main(argv):
+    """Adds playbook runs to the durable job queue."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework enqueue",
+        description="Queue a playbook run for each plugin; 'worker' executes them."
+    )
+    parser.add_argument("playbook_name", help="The name of the playbook to run (e.g., 'playbook_fix_bug').")
+    parser.add_argument("plugin_names", nargs="*", help="The plugins to operate on. Defaults to every plugin in /plugins_real.")
+    parser.add_argument("--bug", help="The description of the bug to fix.", default="")
+    parser.add_argument("--env", choices=["virtual", "real"], default="real", help="The execution environment.")
+    parser.add_argument("--max-attempts", type=int, default=3, help="How many times a failing job is tried.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_JOB_DB, help="The SQLite job database.")
+
+    args = parser.parse_args(argv)
+
+    plugins_root = PROJECT_ROOT / "plugins_real"
+    playbook_path = PROJECT_ROOT / "playbooks" / f"{args.playbook_name}.md"
+    if not playbook_path.is_file():
+        print(f"Error: Playbook '{args.playbook_name}' not found at {playbook_path}")
+        sys.exit(1)
+
+    if args.plugin_names:
+        plugin_paths = [plugins_root / name for name in args.plugin_names]
+    else:
+        plugin_paths = sorted(p for p in plugins_root.iterdir() if p.is_dir())
+
+    queue = JobQueue(args.db)
+    for plugin_path in plugin_paths:
+        job = queue.enqueue(playbook_path, plugin_path, env=args.env, max_attempts=args.max_attempts, bug_description=args.bug)
+        print(f"Queued job {job.id}: '{args.playbook_name}' on '{plugin_path.name}'")
+    print(f"Queue: {queue.counts()}")
+
+def worker_main(argv):
+    """Drains the durable job queue into the orchestrator."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework worker",
+        description="Execute queued jobs. Safe to restart: completed jobs are never run again."
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Number of jobs to run concurrently.")
+    parser.add_argument("--until-empty", action="store_true", help="Exit once no jobs are left instead of polling.")
+    parser.add_argument("--lease", type=float, default=600, help="Seconds before a job held by an unresponsive worker is retried.")
+    parser.add_argument("--rpm", type=float, default=60, help="Model requests per minute shared by all workers.")
+    parser.add_argument("--tpm", type=float, default=1_000_000, help="Model tokens per minute shared by all workers.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_JOB_DB, help="The SQLite job database.")
+    parser.add_argument("--api-key", help="Gemini API key(s), comma-separated (overrides other sources).")
+    parser.add_argument("--key-strategy", choices=KeyPool.STRATEGIES, default="round_robin", help="How jobs are spread over several keys.")
+    add_budget_arguments(parser)
+    add_context_priming_argument(parser)
+
+    args = parser.parse_args(argv)
+
+    try:
+        api_keys = resolve_api_keys(args.api_key)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    queue = JobQueue(args.db, lease_seconds=args.lease)
+    orchestrator = Orchestrator(
+        profile_loader=ProfileLoader(cache=True),
+        playbook_loader=PlaybookLoader(cache=True),
+        prompt_constructor=prompt_constructor_from_args(args),
+        scheduler=ModelCallScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm),
+        priority="batch",
+        resilience=Resilience(),
+        key_pool=KeyPool(api_keys, strategy=args.key_strategy),
+        budget=budget_from_args(args)
+    )
+    stop_event = threading.Event()
+    threads = [
+        threading.Thread(
+            target=JobWorker(queue, orchestrator, api_key=None, name=f"{socket.gethostname()}-{os.getpid()}-{index}").run,
+            kwargs={"stop_when_empty": args.until_empty, "stop_event": stop_event}
+        )
+        for index in range(args.workers)
+    ]
+    for api_key in api_keys:
+        client_pool.warm_up(api_key)
+    print(f"Draining {args.db} with {args.workers} worker(s). Press Ctrl+C to stop.")
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        print("Stopping after the current jobs finish...")
+        stop_event.set()
+        for thread in threads:
+            thread.join()
+    print(f"Queue: {queue.counts()}")
+    print(f"Connections: {client_pool.stats()}")
+    print(f"File cache: {content_cache.stats()}")
+
+def jobs_main(argv):
+    """Lists the jobs in the durable job queue."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework jobs",
+        description="Show queued, running, completed and failed jobs."
+    )
+    parser.add_argument("--state", choices=JobQueue.STATES, help="Only show jobs in this state.")
+    parser.add_argument("--db", type=Path, default=DEFAULT_JOB_DB, help="The SQLite job database.")
+
+    args = parser.parse_args(argv)
+
+    queue = JobQueue(args.db)
+    for job in queue.jobs(args.state):
+        detail = f" - {job.error}" if job.state == "failed" else ""
+        print(f"  {job.id}: {Path(job.plugin_path).name} [{job.state}, attempt {job.attempts}/{job.max_attempts}, run {job.run_id}]{detail}")
+    print(f"Queue: {queue.counts()}")
+
+def tools_main(argv):
+    """Prints the function declarations sent to the model and their schema version."""
+    parser = argparse.ArgumentParser(
+        prog="python -m packages.framework tools",
+        description="Show the exact tool schema the agent sends to the model."
+    )
+    parser.add_argument("--hitl", action="store_true", help="Show the tools as configured for Human-in-the-Loop runs.")
+
+    args = parser.parse_args(argv)
+
+    tool_set = tool_registry.get(args.hitl)
+    print(json.dumps({"version": tool_set.version, "function_declarations": tool_set.schema()}, indent=2))
+
+SUBCOMMANDS = {
+    "batch": batch_main,
+    "resume": resume_main,
+    "mock-server": mock_server_main,
+    "daemon": daemon_main,
+    "submit": submit_main,
+    "enqueue": enqueue_main,
+    "worker": worker_main,
+    "jobs": jobs_main,
+    "tools": tools_main,
+}
+
 def main():
     """The main entrypoint for the CLI."""
-    parser = argparse.ArgumentParser(description="Plugin Manager Agent CLI")
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="Plugin Manager Agent CLI",
+        epilog=(
+            "Other commands: 'batch' runs a playbook across many plugins, "
+            "'resume' continues an interrupted run, 'mock-server' serves a scripted "
+            "stand-in for the Gemini API, 'daemon' keeps the framework warm and "
+            "'submit' sends a run to it, 'enqueue', 'worker' and 'jobs' manage a "
+            "durable job queue, 'tools' prints the tool schema. Use '<command> --help' for details."
+        )
+    )
     parser.add_argument("plugin_name", help="The name of the plugin to operate on (must be in /plugins_real).")
     parser.add_argument("playbook_name", help="The name of the playbook to run (e.g., 'playbook_fix_bug').")
     parser.add_argument("--bug", help="The description of the bug to fix.", default="")
     parser.add_argument("--hitl", action="store_true", help="Enable Human-in-the-Loop confirmation for destructive tools.")
+    parser.add_argument("--stream", action="store_true", help="Print model output and tool calls as they happen.")
     parser.add_argument("--api-key", help="Gemini API key (overrides other sources).")
+    add_budget_arguments(parser)
+    add_context_priming_argument(parser)
 
     args = parser.parse_args()
 
@@ -35,9 +485,8 @@ def main():
         sys.exit(1)
 
     # Construct paths
-    project_root = Path(__file__).parent.parent.parent
-    plugin_path = project_root / "plugins_real" / args.plugin_name
-    playbook_path = project_root / "playbooks" / f"{args.playbook_name}.md"
+    plugin_path = PROJECT_ROOT / "plugins_real" / args.plugin_name
+    playbook_path = PROJECT_ROOT / "playbooks" / f"{args.playbook_name}.md"
 
     if not plugin_path.is_dir():
         print(f"Error: Plugin '{args.plugin_name}' not found at {plugin_path}")
@@ -51,19 +500,32 @@ def main():
     orchestrator = Orchestrator(
         profile_loader=ProfileLoader(),
         playbook_loader=PlaybookLoader(),
-        prompt_constructor=PromptConstructor(),
-        hitl=args.hitl
+        prompt_constructor=prompt_constructor_from_args(args),
+        hitl=args.hitl,
+        resilience=Resilience(),
+        budget=budget_from_args(args)
     )
 
     # Run the orchestrator
-    print(f"Running playbook '{args.playbook_name}' on plugin '{args.plugin_name}'...")
-    final_response = orchestrator.run(
+    run_id = new_run_id()
+    print(f"Running playbook '{args.playbook_name}' on plugin '{args.plugin_name}' (run ID: {run_id})...")
+    print(f"If interrupted, continue with: python -m packages.framework resume {args.plugin_name} {run_id}")
+    run_kwargs = dict(
         playbook_path=playbook_path,
         plugin_path=plugin_path,
         env="real",
         api_key=api_key,
+        run_id=run_id,
         bug_description=args.bug
     )
+    if args.stream:
+        final_response = print_stream(orchestrator.stream(**run_kwargs))
+    else:
+        result = orchestrator.run_with_result(**run_kwargs)
+        final_response = result.final_response
+        if result.status == "budget_exceeded":
+            print(f"Run stopped early: {result.reason}. Continue it with the resume command above.")
+        print(f"Usage: {format_usage(result.usage)}")
 
     print("\n--- Agent's Final Response ---")
     print(final_response)
@@ -0,0 +1,133 @@
+# packages/framework/batch.py
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
+from pydantic import BaseModel
+from .events import event_emitter
+from .loaders import ProfileLoader, PlaybookLoader
+from .orchestrator import Orchestrator
+from .context_primer import ContextPrimer
+from .prompt_constructor import PromptConstructor
+from .resilience import Resilience
+from .utils import KeyPool
+from packages.plugin_manager_agent import RunBudget, RunStatus
+
+logger = logging.getLogger(__name__)
+
+TOOL_EVENTS = ["tool_requested", "tool_completed", "tool_failed"]
+
+class BatchResult(BaseModel):
+    """The outcome of running a playbook on a single plugin within a batch."""
+    plugin_path: str
+    final_response: Optional[str] = None
+    status: Optional[RunStatus] = None  # The run's `RunResult.status` once it has ended.
+    reason: Optional[str] = None
+    usage: Dict[str, Any] = {}
+    events: List[Dict[str, Any]] = []
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+def run_single(
+    playbook_path: Path,
+    plugin_path: Path,
+    env: str,
+    api_key: str,
+    budget: Optional[RunBudget] = None,
+    prime_context: bool = False,
+    **kwargs
+) -> BatchResult:
+    """
+    Runs a playbook on one plugin and captures its tool events.
+
+    This is the unit of work executed inside each worker process. It builds
+    its own Orchestrator so that nothing needs to be pickled besides paths
+    and plain keyword arguments.
+    """
+    captured_events: List[Dict[str, Any]] = []
+
+    def listener(data):
+        captured_events.append(data)
+
+    for event_name in TOOL_EVENTS:
+        event_emitter.on(event_name, listener)
+
+    try:
+        orchestrator = Orchestrator(
+            profile_loader=ProfileLoader(),
+            playbook_loader=PlaybookLoader(),
+            prompt_constructor=PromptConstructor(context_primer=ContextPrimer() if prime_context else None),
+            resilience=Resilience(),
+            budget=budget
+        )
+        result = orchestrator.run_with_result(
+            playbook_path=playbook_path,
+            plugin_path=plugin_path,
+            env=env,
+            api_key=api_key,
+            **kwargs
+        )
+        return BatchResult(plugin_path=str(plugin_path), events=captured_events, **result.model_dump())
+    except Exception as e:
+        logger.error(f"Playbook run failed for {plugin_path}: {e}")
+        return BatchResult(plugin_path=str(plugin_path), events=captured_events, error=str(e))
+    finally:
+        for event_name in TOOL_EVENTS:
+            event_emitter.remove_listener(event_name, listener)
+
+def run_batch(
+    playbook_path: Path,
+    plugin_paths: List[Path],
+    env: str,
+    api_key: Union[str, List[str]],
+    max_workers: Optional[int] = None,
+    budget: Optional[RunBudget] = None,
+    prime_context: bool = False,
+    **kwargs
+) -> List[BatchResult]:
+    """
+    Fans a playbook out over many plugin directories using a bounded process pool.
+
+    A process pool (rather than threads) is used so that runs get their own
+    interpreter, and so that each worker's global event listeners only see
+    the tool events of its own run.
+
+    Args:
+        playbook_path: The path to the playbook markdown file.
+        plugin_paths: The plugin directories to run the playbook on.
+        env: The execution environment ('virtual' or 'real').
+        api_key: The Gemini API key, or several keys to assign to the runs round-robin.
+        max_workers: The maximum number of concurrent runs. Defaults to the CPU count.
+        budget: Limits applied to each run; runs that reach one stop early with status "budget_exceeded".
+        prime_context: Prepend each plugin's file manifest and profile digest to its prompt.
+        **kwargs: Additional placeholder values passed to every run.
+
+    Returns:
+        A list of BatchResult objects, in the same order as `plugin_paths`.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(plugin_paths) or 1))
+
+    key_pool = KeyPool([api_key] if isinstance(api_key, str) else api_key)
+    results: Dict[int, BatchResult] = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_single, playbook_path, plugin_path, env, key_pool.acquire(), budget, prime_context, **kwargs): index
+            for index, plugin_path in enumerate(plugin_paths)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. it was killed or ran out of memory).
+                results[index] = BatchResult(plugin_path=str(plugin_paths[index]), error=str(e))
+            logger.info(f"Finished {results[index].plugin_path} ({len(results)}/{len(plugin_paths)})")
+
+    return [results[index] for index in range(len(plugin_paths))]
@@ -0,0 +1,118 @@
+# packages/framework/checkpoints.py
+
+import json
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from google.genai import types
+
+def new_run_id() -> str:
+    """Generates a sortable, unique identifier for a playbook run."""
+    return f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+class RunCheckpoint:
+    """
+    Persists a playbook run incrementally to `<plugin>/.history/<run_id>/`.
+
+    The directory holds three files:
+        meta.json      - The run's inputs and status.
+        history.jsonl  - One serialized `types.Content` per line, appended as turns complete.
+        events.jsonl   - One tool event per line, appended as each tool call finishes.
+
+    Nothing is written until the run reaches the model, so runs that fail
+    while loading their inputs leave no trace.
+    """
+
+    def __init__(self, plugin_path: Path, run_id: Optional[str] = None, meta: Optional[Dict[str, Any]] = None):
+        self.run_id = run_id or new_run_id()
+        self.run_dir = Path(plugin_path) / ".history" / self.run_id
+        self.meta = {"run_id": self.run_id, "status": "running", **(meta or {})}
+        self._saved_turns = 0
+
+    @classmethod
+    def load(cls, plugin_path: Path, run_id: str) -> "RunCheckpoint":
+        """
+        Opens an existing checkpoint so that its run can be resumed.
+
+        Raises:
+            FileNotFoundError: If no checkpoint exists for the run.
+        """
+        checkpoint = cls(plugin_path, run_id)
+        meta_path = checkpoint.run_dir / "meta.json"
+        if not meta_path.is_file():
+            raise FileNotFoundError(f"No checkpoint found for run '{run_id}' in {checkpoint.run_dir.parent}")
+        checkpoint.meta = json.loads(meta_path.read_text())
+        for name in ("history.jsonl", "events.jsonl"):
+            checkpoint._truncate_partial_line(name)
+        checkpoint._saved_turns = len(checkpoint._read_jsonl("history.jsonl"))
+        return checkpoint
+
+    def save_history(self, history: List[types.Content]):
+        """Appends any turns that have not been persisted yet."""
+        new_turns = history[self._saved_turns:]
+        if not new_turns:
+            return
+        self._ensure_started()
+        with open(self.run_dir / "history.jsonl", "a") as f:
+            for content in new_turns:
+                f.write(json.dumps(content.model_dump(mode="json", exclude_none=True)) + "\n")
+        self._saved_turns = len(history)
+
+    def record_tool_event(self, event: Dict[str, Any]):
+        """Appends a completed tool call to the event stream."""
+        self._ensure_started()
+        with open(self.run_dir / "events.jsonl", "a") as f:
+            f.write(json.dumps(event, default=str) + "\n")
+
+    def load_history(self) -> List[types.Content]:
+        """Returns the persisted conversation history."""
+        return [types.Content.model_validate(data) for data in self._read_jsonl("history.jsonl")]
+
+    def load_tool_events(self) -> List[Dict[str, Any]]:
+        """Returns the persisted tool events."""
+        return self._read_jsonl("events.jsonl")
+
+    def finish(self, final_response: Optional[str], status: str = "completed", **details):
+        """
+        Marks the run as over. A run stopped by its budget is recorded with
+        status "budget_exceeded" and can still be resumed.
+        """
+        self._update_meta(status=status, final_response=final_response, **details)
+
+    def fail(self, error: str):
+        """Marks the run as failed so that it can be resumed later."""
+        self._update_meta(status="failed", error=error)
+
+    def _ensure_started(self):
+        if not (self.run_dir / "meta.json").exists():
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            self._update_meta(created_at=datetime.now(timezone.utc).isoformat())
+
+    def _update_meta(self, **fields):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        self.meta.update(fields, updated_at=datetime.now(timezone.utc).isoformat())
+        # Write to a temporary file first so a crash never leaves a truncated meta.json.
+        tmp_path = self.run_dir / "meta.json.tmp"
+        tmp_path.write_text(json.dumps(self.meta, indent=2, default=str))
+        tmp_path.replace(self.run_dir / "meta.json")
+
+    def _truncate_partial_line(self, name: str):
+        # A crash mid-write can leave a partial trailing line; drop it before appending again.
+        path = self.run_dir / name
+        if path.is_file():
+            content = path.read_text()
+            if content and not content.endswith("\n"):
+                path.write_text(content[:content.rfind("\n") + 1])
+
+    def _read_jsonl(self, name: str) -> List[Dict[str, Any]]:
+        path = self.run_dir / name
+        if not path.is_file():
+            return []
+        records = []
+        for line in path.read_text().splitlines():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                break
+        return records
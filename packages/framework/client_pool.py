@@ -0,0 +1,114 @@
+# packages/framework/client_pool.py
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+import httpx
+from google import genai
+from google.genai import types
+from packages.plugin_manager_agent.gemini_agent import DEFAULT_MODEL
+
+logger = logging.getLogger(__name__)
+
+class ClientPool:
+    """
+    Shares `genai.Client` instances, and their keep-alive HTTP connections, across runs.
+
+    Clients are keyed by API key and base URL, and are safe to use from many
+    threads at once. Each key gets its own `httpx.Client` with a keep-alive
+    connection pool. A trace hook on every request counts how often a new
+    connection had to be opened, so `stats()` can report how many requests
+    reused a warm connection.
+
+    A client's async side (`client.aio`) is bound to the event loop that first
+    uses it. So `get` called from inside a running loop returns a client
+    belonging to that loop. It shares the key's sync connections, and it is
+    dropped when the loop is garbage-collected, so runs that each use their own
+    `asyncio.run` never inherit a closed loop.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20, keepalive_expiry: float = 120.0):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._clients: Dict[Tuple[str, Optional[str]], genai.Client] = {}
+        # Per event loop: the clients used from inside that loop, keyed like `_clients`.
+        self._loop_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+        self._http_clients: Dict[Tuple[str, Optional[str]], httpx.Client] = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "new_connections": 0}
+
+    def get(self, api_key: str, base_url: Optional[str] = None) -> genai.Client:
+        """Returns the shared client for the key (and the running event loop, if any), creating it on first use."""
+        base_url = base_url or os.getenv("GEMINI_BASE_URL")
+        key = (api_key, base_url)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            for closed in [other for other in self._loop_clients if other.is_closed()]:
+                del self._loop_clients[closed]
+            clients = self._clients if loop is None else self._loop_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = self._create(key)
+                clients[key] = client
+            return client
+
+    def warm_up(self, api_key: str, model: str = DEFAULT_MODEL, base_url: Optional[str] = None):
+        """
+        Opens a connection ahead of the first run by fetching the model's metadata,
+        which costs no tokens. Failures are logged, not raised: the first real call
+        would simply pay the connection set-up instead.
+        """
+        try:
+            self.get(api_key, base_url).models.get(model=model)
+        except Exception as e:
+            logger.warning(f"Client warm-up for {model} failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of clients, requests, and new versus reused connections."""
+        with self._lock:
+            return {
+                "clients": len(self._clients) + sum(len(clients) for clients in self._loop_clients.values()),
+                "requests": self._stats["requests"],
+                "new_connections": self._stats["new_connections"],
+                "reused_connections": self._stats["requests"] - self._stats["new_connections"],
+            }
+
+    def close(self):
+        """Closes every pooled connection and forgets all clients."""
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.close()
+            self._http_clients.clear()
+            self._clients.clear()
+            self._loop_clients.clear()
+
+    def _create(self, key: Tuple[str, Optional[str]]) -> genai.Client:
+        api_key, base_url = key
+        http_client = self._http_clients.get(key)
+        if http_client is None:
+            http_client = httpx.Client(limits=self.limits, event_hooks={"request": [self._on_request]})
+            self._http_clients[key] = http_client
+        http_options = types.HttpOptions(base_url=base_url, httpx_client=http_client)
+        return genai.Client(api_key=api_key, http_options=http_options)
+
+    def _on_request(self, request: httpx.Request):
+        request.extensions["trace"] = self._trace
+        with self._lock:
+            self._stats["requests"] += 1
+
+    def _trace(self, event_name: str, info: dict):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._stats["new_connections"] += 1
+
+# A process-wide pool shared by every orchestrator that does not bring its own.
+client_pool = ClientPool()
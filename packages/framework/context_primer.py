@@ -0,0 +1,122 @@
+# packages/framework/context_primer.py
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .schema import PluginProfile
+from packages.plugin_manager_agent.workspace_index import DEFAULT_IGNORED_DIRS, workspace_index
+
+class ContextPrimer:
+    """
+    Builds a compact description of a plugin's workspace to prepend to the initial prompt.
+
+    The context holds a manifest of the plugin tree (path, size and a short
+    SHA-256 per file), a digest of the plugin profile (tools and behavioral
+    scenarios), and the full text of small files. With it the agent can start
+    working right away, instead of spending its first turns on `list_files`
+    and `read_file('plugin-profile.yaml')`.
+
+    The manifest comes from the plugin's `WorkspaceIndex`, so only files that
+    changed since the last run are hashed again.
+    """
+
+    def __init__(
+        self,
+        max_files: int = 200,
+        inline_max_bytes: int = 4_096,
+        inline_total_bytes: int = 24_576,
+        ignored_dirs: frozenset = DEFAULT_IGNORED_DIRS
+    ):
+        self.max_files = max_files
+        # Text files up to this size are inlined, until the total reaches `inline_total_bytes`.
+        self.inline_max_bytes = inline_max_bytes
+        self.inline_total_bytes = inline_total_bytes
+        self.ignored_dirs = ignored_dirs
+
+    def prime(self, plugin_path: Path, profile: PluginProfile) -> str:
+        """Returns the workspace context for a plugin as markdown."""
+        files = self._walk(Path(plugin_path))
+        sections = [
+            "## Workspace Context",
+            "A snapshot of the plugin taken when this run started. Paths are relative to your working "
+            "directory. Files shown in full below do not need to be read again unless you change them.",
+            self._manifest(files),
+            self._profile_digest(profile),
+        ]
+        inlined = self._inline(files)
+        if inlined:
+            sections.append(inlined)
+        return "\n\n".join(sections)
+
+    def _walk(self, root: Path) -> List[Tuple[str, Path, int, str]]:
+        """Returns (relative path, path, size, sha256) for every file under root, sorted by path."""
+        # A full refresh, once per run: between runs the plugin may have been edited outside the tools.
+        # During the run, the tools journal their changes, so `list_files` only needs incremental refreshes.
+        records = workspace_index(root).refresh(full=True)
+        return sorted(
+            (relative, root / relative, record.size, record.sha256)
+            for relative, record in records.items()
+            if not self.ignored_dirs.intersection(relative.split("/")[:-1])
+        )
+
+    def _manifest(self, files: List[Tuple[str, Path, int, str]]) -> str:
+        lines = ["### Files (path, bytes, sha256 prefix)"]
+        for relative, path, size, sha256 in files[:self.max_files]:
+            lines.append(f"{relative} {size} {sha256[:8]}")
+        if len(files) > self.max_files:
+            lines.append(f"... and {len(files) - self.max_files} more file(s); use `list_files` to see them.")
+        if not files:
+            lines.append("(no files)")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _profile_digest(profile: PluginProfile) -> str:
+        lines = [
+            "### Plugin Profile Digest (from plugin-profile.yaml)",
+            f"Name: {profile.name} (version {profile.version})",
+            f"Description: {profile.description}",
+        ]
+        if profile.mcp_profile:
+            lines.append("Tools:")
+            for tool in profile.mcp_profile:
+                parameters = ", ".join(f"{name}: {parameter.type}" for name, parameter in tool.parameters.items())
+                lines.append(f"- {tool.name}({parameters}): {tool.description}")
+        if profile.dependencies:
+            lines.append(f"Dependencies: {', '.join(profile.dependencies)}")
+        if profile.behavioral_profile is not None:
+            lines.append("Scenarios:")
+            for kind, scenarios in (
+                ("success", profile.behavioral_profile.success_scenarios),
+                ("failure", profile.behavioral_profile.failure_scenarios),
+            ):
+                for scenario in scenarios:
+                    lines.append(f"- {kind}: {scenario.description} ({scenario.tool_call} with {scenario.inputs})")
+        return "\n".join(lines)
+
+    def _inline(self, files: List[Tuple[str, Path, int, str]]) -> Optional[str]:
+        sections, total = [], 0
+        for relative, path, size, _ in files[:self.max_files]:
+            if size > self.inline_max_bytes or total + size > self.inline_total_bytes:
+                continue
+            text = self._read_text(path)
+            if text is None:
+                continue
+            text = text.rstrip("\n")
+            sections.append(f"#### {relative}\n```\n{text}\n```")
+            total += size
+        if not sections:
+            return None
+        return "\n\n".join(["### File Contents"] + sections)
+
+    @staticmethod
+    def _read_text(path: Path) -> Optional[str]:
+        """Returns the file's text, or None for binary or unreadable files."""
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        if b"\0" in data:
+            return None
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
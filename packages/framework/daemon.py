@@ -0,0 +1,174 @@
+# packages/framework/daemon.py
+
+import os
+import json
+import queue
+import socket
+import logging
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Literal, Optional
+from pydantic import BaseModel, ValidationError
+from .checkpoints import new_run_id
+from .loaders import ProfileLoader, PlaybookLoader
+from .orchestrator import Orchestrator
+from .prompt_constructor import PromptConstructor
+
+logger = logging.getLogger(__name__)
+
+class RunRequest(BaseModel):
+    """A playbook run submitted to the daemon."""
+    playbook_path: str
+    plugin_path: str
+    env: str = "real"
+    run_id: Optional[str] = None
+    api_key: Optional[str] = None  # Overrides the daemon's key for this run.
+    priority: Optional[Literal["interactive", "batch"]] = None  # Overrides the orchestrator's scheduler priority.
+    kwargs: Dict[str, str] = {}
+
+class OrchestratorDaemon:
+    """
+    A long-lived process that serves playbook runs over a Unix domain socket.
+
+    Imports, parsed profiles and playbooks stay warm between jobs, so submitting
+    a run costs a socket round trip instead of an interpreter start-up. Runs
+    execute on a bounded thread pool; connections beyond its size wait for a
+    free worker.
+
+    Protocol (newline-delimited JSON): the client sends one `RunRequest` and
+    receives `{"type": "accepted", "run_id": ...}`, then the events of
+    `Orchestrator.stream`, ending with either a `final` or an `error` event.
+    With `api_key=None`, runs that bring no key draw one from the orchestrator's key pool.
+    A request's `priority` lets interactive and batch runs share one daemon, and
+    so one quota scheduler, with interactive calls served first.
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        api_key: Optional[str],
+        max_workers: int = 4,
+        orchestrator: Optional[Orchestrator] = None
+    ):
+        self.socket_path = Path(socket_path)
+        self.api_key = api_key
+        self.max_workers = max_workers
+        self.orchestrator = orchestrator or Orchestrator(
+            profile_loader=ProfileLoader(cache=True),
+            playbook_loader=PlaybookLoader(cache=True),
+            prompt_constructor=PromptConstructor()
+        )
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="daemon-run")
+        self._thread: Optional[threading.Thread] = None
+
+        if self.socket_path.exists():
+            # A stale socket from a daemon that did not shut down cleanly.
+            self.socket_path.unlink()
+
+        daemon = self
+
+        class Handler(_RunRequestHandler):
+            server_daemon = daemon
+
+        self._server = _UnixServer(str(self.socket_path), Handler)
+
+    def start(self) -> "OrchestratorDaemon":
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Daemon listening on {self.socket_path} with {self.max_workers} worker(s)")
+        return self
+
+    def serve_forever(self):
+        """Serves requests on the calling thread until interrupted."""
+        logger.info(f"Daemon listening on {self.socket_path} with {self.max_workers} worker(s)")
+        self._server.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._executor.shutdown(wait=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+    def __enter__(self) -> "OrchestratorDaemon":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def submit(self, request: RunRequest, events: queue.Queue):
+        """Queues a run on the worker pool; its events (and a closing None) are put on `events`."""
+        self._executor.submit(self._run, request, events)
+
+    def _run(self, request: RunRequest, events: queue.Queue):
+        try:
+            for event in self.orchestrator.stream(
+                playbook_path=Path(request.playbook_path),
+                plugin_path=Path(request.plugin_path),
+                env=request.env,
+                api_key=request.api_key or self.api_key,
+                run_id=request.run_id,
+                priority=request.priority,
+                **request.kwargs
+            ):
+                events.put(event)
+        except Exception as e:
+            logger.error(f"Run {request.run_id} failed: {e}")
+            events.put({"type": "error", "error": str(e)})
+        finally:
+            events.put(None)
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class _RunRequestHandler(socketserver.StreamRequestHandler):
+    server_daemon: OrchestratorDaemon
+
+    def handle(self):
+        line = self.rfile.readline()
+        try:
+            request = RunRequest.model_validate_json(line)
+        except ValidationError as e:
+            self._send({"type": "error", "error": f"Invalid run request: {e}"})
+            return
+
+        request.run_id = request.run_id or new_run_id()
+        self._send({"type": "accepted", "run_id": request.run_id})
+
+        events = queue.Queue()
+        self.server_daemon.submit(request, events)
+        client_connected = True
+        while (event := events.get()) is not None:
+            if client_connected:
+                try:
+                    self._send(event)
+                except OSError:
+                    # The run carries on (and stays resumable) even if its client went away.
+                    client_connected = False
+
+    def _send(self, event: Dict[str, Any]):
+        self.wfile.write((json.dumps(event, default=str) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+def submit_run(socket_path: Path, request: RunRequest) -> Iterator[Dict[str, Any]]:
+    """
+    Sends a run to a daemon and yields its events as they arrive.
+
+    Raises:
+        ConnectionError: If no daemon is listening on the socket.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(os.fspath(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No daemon is listening on {socket_path}") from e
+        sock.sendall((request.model_dump_json() + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                yield json.loads(line)
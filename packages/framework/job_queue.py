@@ -0,0 +1,294 @@
+# packages/framework/job_queue.py
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from .checkpoints import RunCheckpoint, new_run_id
+from .orchestrator import Orchestrator
+from packages.plugin_manager_agent import RunResult
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    playbook_path TEXT NOT NULL,
+    plugin_path TEXT NOT NULL,
+    env TEXT NOT NULL,
+    kwargs TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_id TEXT,
+    worker TEXT,
+    lease_expires_at REAL,
+    final_response TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+class Job(BaseModel):
+    """A playbook run tracked by the job queue."""
+    id: int
+    playbook_path: str
+    plugin_path: str
+    env: str
+    kwargs: Dict[str, str] = {}
+    state: str  # pending | running | completed | failed
+    attempts: int = 0
+    max_attempts: int
+    run_id: Optional[str] = None
+    worker: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    final_response: Optional[str] = None
+    error: Optional[str] = None
+
+class JobQueue:
+    """
+    A durable queue of playbook runs stored in SQLite (WAL mode).
+
+    Workers `claim` a job, which leases it for `lease_seconds`. A worker that
+    crashes simply stops renewing its lease, and the job becomes claimable
+    again once the lease expires (or fails, if that was its last attempt).
+    Failed attempts are retried until `max_attempts` is reached. Only the
+    worker holding a job's lease can record its outcome. Each job keeps one `run_id` across attempts, so
+    a retry resumes the run's checkpoint instead of starting over.
+
+    Every operation opens its own connection, so one queue object can be shared
+    by worker threads and several processes can drain the same database.
+    """
+
+    STATES = ("pending", "running", "completed", "failed")
+
+    def __init__(self, db_path: Path, lease_seconds: float = 600):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def enqueue(self, playbook_path: Path, plugin_path: Path, env: str = "real", max_attempts: int = 3, **kwargs) -> Job:
+        """Adds a run to the queue and returns its job."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (playbook_path, plugin_path, env, kwargs, state, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?, ?)",
+                (str(playbook_path), str(plugin_path), env, json.dumps(kwargs), max_attempts, now, now)
+            )
+            return self._get(conn, cursor.lastrowid)
+
+    def claim(self, worker: str) -> Optional[Job]:
+        """Leases the oldest pending job (or one whose lease has expired), or returns None."""
+        now = time.time()
+        with self._transaction() as conn:
+            # A worker that died on a job's last attempt leaves it running; it has no attempts left to reclaim.
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', error = 'Lease expired on the last attempt (the worker stopped renewing it)', "
+                "lease_expires_at = NULL, updated_at = ? "
+                "WHERE state = 'running' AND lease_expires_at < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT id, run_id FROM jobs WHERE state = 'pending' OR (state = 'running' AND lease_expires_at < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, worker = ?, run_id = ?, "
+                "lease_expires_at = ?, updated_at = ? WHERE id = ?",
+                (worker, row["run_id"] or new_run_id(), now + self.lease_seconds, now, row["id"])
+            )
+            return self._get(conn, row["id"])
+
+    def renew(self, job_id: int, worker: str) -> bool:
+        """Extends a job's lease. Returns False if the worker no longer holds it."""
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND state = 'running' AND worker = ?",
+                (now + self.lease_seconds, now, job_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, final_response: Optional[str], worker: str) -> bool:
+        """Marks a job as completed. Returns False (and changes nothing) if the worker no longer holds its lease."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'completed', final_response = ?, error = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ? AND state = 'running' AND worker = ?",
+                (final_response, time.time(), job_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: int, error: str, worker: str) -> Optional[Job]:
+        """
+        Records a failed attempt; the job is retried unless it has used up its attempts.
+        Returns None (and changes nothing) if the worker no longer holds the job's lease.
+        """
+        with self._transaction() as conn:
+            job = self._get(conn, job_id)
+            if job.state != "running" or job.worker != worker:
+                return None
+            state = "failed" if job.attempts >= job.max_attempts else "pending"
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_expires_at = NULL, updated_at = ? WHERE id = ?",
+                (state, error, time.time(), job_id)
+            )
+            return self._get(conn, job_id)
+
+    def get(self, job_id: int) -> Job:
+        """
+        Returns a job by ID.
+
+        Raises:
+            KeyError: If no job has the ID.
+        """
+        with self._connect() as conn:
+            return self._get(conn, job_id)
+
+    def jobs(self, state: Optional[str] = None) -> List[Job]:
+        """Returns all jobs, optionally only those in one state."""
+        with self._connect() as conn:
+            if state is None:
+                rows = conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM jobs WHERE state = ? ORDER BY id", (state,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs in each state."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+        return {state: 0 for state in self.STATES} | {row["state"]: row["n"] for row in rows}
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can never claim the same job.
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _get(self, conn: sqlite3.Connection, job_id: int) -> Job:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"No job with ID {job_id}")
+        return self._job(row)
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        data = dict(row)
+        data["kwargs"] = json.loads(data["kwargs"])
+        return Job(**{key: value for key, value in data.items() if key in Job.model_fields})
+
+class JobWorker:
+    """
+    Drains a JobQueue into an Orchestrator, one job at a time.
+
+    While a job runs, a background thread renews its lease; if the lease is
+    lost (e.g. the worker stalled and another worker took the job over), the
+    run is cancelled and its outcome discarded. Only a run that completes
+    completes its job; one stopped by its budget or cancelled counts as a failed
+    attempt. A job whose run already has a checkpoint (from an earlier,
+    interrupted or stopped attempt) is resumed rather than run again from the start. With `api_key=None` the orchestrator's
+    key pool chooses a key for every run.
+    """
+
+    def __init__(self, queue: JobQueue, orchestrator: Orchestrator, api_key: Optional[str], name: str):
+        self.queue = queue
+        self.orchestrator = orchestrator
+        self.api_key = api_key
+        self.name = name
+
+    def run(self, poll_interval: float = 1.0, stop_when_empty: bool = False, stop_event: Optional[threading.Event] = None):
+        """Processes jobs until the queue is empty (if `stop_when_empty`) or `stop_event` is set."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            job = self.queue.claim(self.name)
+            if job is None:
+                if stop_when_empty:
+                    return
+                stop_event.wait(poll_interval)
+                continue
+            self.process(job)
+
+    def process(self, job: Job):
+        """Runs a claimed job and records its outcome in the queue."""
+        logger.info(f"[{self.name}] Running job {job.id} (attempt {job.attempts}/{job.max_attempts}): {job.plugin_path}")
+        done, lease_lost = threading.Event(), threading.Event()
+        renewer = threading.Thread(target=self._renew_lease, args=(job.id, done, lease_lost), daemon=True)
+        renewer.start()
+        try:
+            result = self._execute(job, lease_lost)
+        except Exception as e:
+            self._record_failure(job, str(e))
+        else:
+            if result.status != "completed":
+                # The checkpoint keeps the partial run, so the retry resumes it.
+                self._record_failure(job, f"Run {result.status}: {result.reason}")
+            elif self.queue.complete(job.id, result.final_response, self.name):
+                logger.info(f"[{self.name}] Job {job.id} completed")
+            else:
+                logger.warning(f"[{self.name}] Job {job.id} finished after its lease was lost; the result is discarded")
+        finally:
+            done.set()
+            renewer.join()
+
+    def _record_failure(self, job: Job, error: str):
+        failed = self.queue.fail(job.id, error, self.name)
+        if failed is None:
+            logger.warning(f"[{self.name}] Job {job.id} failed after its lease was lost; the failure is not recorded: {error}")
+        else:
+            logger.error(f"[{self.name}] Job {job.id} failed ({failed.state}): {error}")
+
+    def _execute(self, job: Job, cancel_event: threading.Event) -> RunResult:
+        plugin_path = Path(job.plugin_path)
+        try:
+            RunCheckpoint.load(plugin_path, job.run_id)
+        except FileNotFoundError:
+            return self.orchestrator.run_with_result(
+                playbook_path=Path(job.playbook_path),
+                plugin_path=plugin_path,
+                env=job.env,
+                api_key=self.api_key,
+                run_id=job.run_id,
+                cancel_event=cancel_event,
+                **job.kwargs
+            )
+        logger.info(f"[{self.name}] Resuming run {job.run_id} from its checkpoint")
+        return self.orchestrator.resume_with_result(
+            plugin_path=plugin_path, run_id=job.run_id, api_key=self.api_key, cancel_event=cancel_event
+        )
+
+    def _renew_lease(self, job_id: int, done: threading.Event, lease_lost: threading.Event):
+        while not done.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(job_id, self.name):
+                logger.warning(f"[{self.name}] Lost the lease on job {job_id}; cancelling its run")
+                # Another worker may already be driving the same run; stop before we both write its checkpoint.
+                lease_lost.set()
+                return
@@ -2,17 +2,63 @@
 
 import yaml
 from pathlib import Path
-from pydantic import BaseModel, ValidationError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from google.genai import types
+from pydantic import BaseModel, ConfigDict, ValidationError
 from .schema import PluginProfile
 
+def _load_cached(cache: Optional[Dict[Path, Tuple[int, Any]]], path: Path, parse: Callable[[], Any]) -> Any:
+    """Returns the parsed file from the cache unless it has been modified since it was parsed."""
+    if cache is None:
+        return parse()
+    mtime = path.stat().st_mtime_ns
+    cached = cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, parse())
+        cache[path] = cached
+    return cached[1]
+
+class PlaybookSettings(BaseModel):
+    """
+    Optional run settings declared in a playbook's YAML front matter.
+
+    Unset fields keep the framework defaults (every tool, the agent's default
+    model and generation settings, and its turn limit).
+    """
+    model_config = ConfigDict(extra="forbid")
+
+    tools: Optional[List[str]] = None  # Names of the tools the agent may call.
+    model: Optional[str] = None
+    temperature: Optional[float] = None
+    top_p: Optional[float] = None
+    max_output_tokens: Optional[int] = None
+    thinking_budget: Optional[int] = None  # 0 turns thinking off on models that allow it.
+    max_turns: Optional[int] = None  # Maximum number of model turns (function-calling rounds).
+
+    def generation_config(self) -> Optional[types.GenerateContentConfig]:
+        """Returns the declared generation settings, or None if the playbook declares none."""
+        fields = {
+            name: value
+            for name, value in (("temperature", self.temperature), ("top_p", self.top_p), ("max_output_tokens", self.max_output_tokens))
+            if value is not None
+        }
+        if self.thinking_budget is not None:
+            fields["thinking_config"] = types.ThinkingConfig(thinking_budget=self.thinking_budget)
+        return types.GenerateContentConfig(**fields) if fields else None
+
 class Playbook(BaseModel):
     """A simple data class to hold the parsed playbook content."""
     objective: str
     prompt_template: str
+    settings: PlaybookSettings = PlaybookSettings()
 
 class ProfileLoader:
     """Loads and validates a plugin-profile.yaml file."""
 
+    def __init__(self, cache: bool = False):
+        # Long-lived processes (e.g. the daemon) re-use parsed profiles until the file changes.
+        self._cache = {} if cache else None
+
     def load(self, plugin_directory: Path) -> PluginProfile:
         """
         Finds and loads the plugin profile from a given directory.
@@ -31,6 +77,9 @@ class ProfileLoader:
         if not profile_path.is_file():
             raise FileNotFoundError(f"plugin-profile.yaml not found in {plugin_directory}")
 
+        return _load_cached(self._cache, profile_path.resolve(), lambda: self._parse(profile_path))
+
+    def _parse(self, profile_path: Path) -> PluginProfile:
         with open(profile_path, 'r') as f:
             data = yaml.safe_load(f)
             try:
@@ -43,6 +92,10 @@ class ProfileLoader:
 class PlaybookLoader:
     """Loads and parses a playbook.md file."""
 
+    def __init__(self, cache: bool = False):
+        # Long-lived processes (e.g. the daemon) re-use parsed playbooks until the file changes.
+        self._cache = {} if cache else None
+
     def load(self, playbook_path: Path) -> Playbook:
         """
         Loads a playbook from a given path.
@@ -52,12 +105,20 @@ class PlaybookLoader:
 
         Returns:
             A Playbook object with the parsed content.
+
+        Raises:
+            FileNotFoundError: If the playbook does not exist.
+            ValueError: If a required section is missing or the front matter is invalid.
         """
         if not playbook_path.is_file():
             raise FileNotFoundError(f"Playbook not found at {playbook_path}")
 
+        return _load_cached(self._cache, playbook_path.resolve(), lambda: self._parse(playbook_path))
+
+    def _parse(self, playbook_path: Path) -> Playbook:
         content = playbook_path.read_text()
-        
+        settings, content = self._split_front_matter(playbook_path, content)
+
         try:
             # A simple parsing logic based on markdown headers.
             objective_section = content.split("## Objective")[1].split("##")[0].strip()
@@ -65,4 +126,19 @@ class PlaybookLoader:
         except IndexError:
             raise ValueError(f"Playbook {playbook_path} is missing required sections.")
 
-        return Playbook(objective=objective_section, prompt_template=prompt_section)
+        return Playbook(objective=objective_section, prompt_template=prompt_section, settings=settings)
+
+    @staticmethod
+    def _split_front_matter(playbook_path: Path, content: str) -> Tuple[PlaybookSettings, str]:
+        """Separates an optional `---`-delimited YAML header from the markdown body."""
+        if not content.startswith("---"):
+            return PlaybookSettings(), content
+        try:
+            _, header, body = content.split("---", 2)
+        except ValueError:
+            raise ValueError(f"Playbook {playbook_path} has unterminated front matter.")
+        try:
+            settings = PlaybookSettings(**(yaml.safe_load(header) or {}))
+        except (yaml.YAMLError, TypeError, ValidationError) as e:
+            raise ValueError(f"Playbook {playbook_path} has invalid front matter: {e}")
+        return settings, body
@@ -0,0 +1,210 @@
+# packages/framework/mock_gemini_server.py
+
+import re
+import json
+import time
+import random
+import logging
+import threading
+import yaml
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+class LatencyProfile(BaseModel):
+    """The distribution each simulated model turn's latency (in seconds) is drawn from."""
+    distribution: str = "fixed"  # fixed | uniform | normal | exponential
+    mean: float = 0.0
+    stddev: float = 0.0
+    min: float = 0.0
+    max: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "fixed":
+            return self.mean
+        if self.distribution == "uniform":
+            return rng.uniform(self.min, self.max)
+        if self.distribution == "normal":
+            value = rng.gauss(self.mean, self.stddev)
+        elif self.distribution == "exponential":
+            value = rng.expovariate(1 / self.mean) if self.mean > 0 else 0.0
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.distribution}")
+        # Clamp to [min, max] when a maximum is configured; never sleep a negative time.
+        return max(self.min, min(value, self.max) if self.max else value)
+
+class RateLimitProfile(BaseModel):
+    """Controls injection of 429 RESOURCE_EXHAUSTED responses."""
+    probability: float = 0.0  # Chance that any single request is rejected.
+    every_nth: Optional[int] = None  # Deterministically reject every n-th request.
+
+class ScriptedFunctionCall(BaseModel):
+    name: str
+    args: Dict[str, Any] = {}
+
+class ScriptedTurn(BaseModel):
+    """One model turn: either function calls, a final text response, or both."""
+    function_calls: List[ScriptedFunctionCall] = []
+    text: Optional[str] = None
+    latency: Optional[LatencyProfile] = None  # Overrides the script-wide latency for this turn.
+
+class MockScript(BaseModel):
+    """The conversation a MockGeminiServer plays back to every session."""
+    turns: List[ScriptedTurn] = Field(default_factory=lambda: [ScriptedTurn(text="Done.")])
+    latency: LatencyProfile = LatencyProfile()
+    rate_limit: RateLimitProfile = RateLimitProfile()
+    seed: Optional[int] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "MockScript":
+        with open(path, 'r') as f:
+            return cls(**(yaml.safe_load(f) or {}))
+
+class MockGeminiServer:
+    """
+    A local stand-in for the Gemini API that speaks the `google.genai` REST wire protocol.
+
+    Every session receives the same scripted conversation. The server is
+    stateless: the turn to play is the number of model turns already present
+    in the request's `contents`, so any number of concurrent sessions can be
+    driven without bookkeeping. Point an agent at it with
+    `GeminiAgent(base_url=server.base_url)` or `GEMINI_BASE_URL`.
+    """
+
+    def __init__(self, script: MockScript, host: str = "127.0.0.1", port: int = 0):
+        self.script = script
+        self._rng = random.Random(script.seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "rate_limited": 0, "completed": 0}
+
+        server = self
+
+        class Handler(_MockGeminiHandler):
+            mock = server
+
+        self._httpd = _MockHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "MockGeminiServer":
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Mock Gemini server listening on {self.base_url}")
+        return self
+
+    def serve_forever(self):
+        """Serves requests on the calling thread until interrupted."""
+        logger.info(f"Mock Gemini server listening on {self.base_url}")
+        self._httpd.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def next_outcome(self, turn_index: int) -> tuple[float, bool]:
+        """Decides the latency and whether to rate-limit the next request."""
+        turn = self.turn(turn_index)
+        latency_profile = turn.latency or self.script.latency
+        with self._lock:
+            self.stats["requests"] += 1
+            count = self.stats["requests"]
+            latency = latency_profile.sample(self._rng)
+            rate_limit = self.script.rate_limit
+            limited = (
+                (rate_limit.every_nth is not None and count % rate_limit.every_nth == 0)
+                or self._rng.random() < rate_limit.probability
+            )
+            if limited:
+                self.stats["rate_limited"] += 1
+            else:
+                self.stats["completed"] += 1
+        return latency, limited
+
+    def turn(self, turn_index: int) -> ScriptedTurn:
+        # Sessions that outlast the script keep receiving its final turn.
+        return self.script.turns[min(turn_index, len(self.script.turns) - 1)]
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open many connections at once; the default backlog of 5 would refuse them.
+    request_queue_size = 1024
+
+class _MockGeminiHandler(BaseHTTPRequestHandler):
+    mock: MockGeminiServer
+    protocol_version = "HTTP/1.1"
+    _path_pattern = re.compile(r"^/(?P<version>[^/]+)/models/(?P<model>[^:/]+):(?P<method>\w+)")
+
+    def do_POST(self):
+        match = self._path_pattern.match(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not match or match["method"] not in ("generateContent", "streamGenerateContent"):
+            self._send_json(404, {"error": {"code": 404, "message": f"Unsupported path: {self.path}", "status": "NOT_FOUND"}})
+            return
+
+        request = json.loads(body or b"{}")
+        turn_index = sum(1 for content in request.get("contents", []) if content.get("role") == "model")
+        latency, limited = self.mock.next_outcome(turn_index)
+        time.sleep(latency)
+
+        if limited:
+            self._send_json(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).", "status": "RESOURCE_EXHAUSTED"}})
+            return
+
+        response = self._build_response(self.mock.turn(turn_index), match["model"], len(body))
+        if match["method"] == "streamGenerateContent":
+            self._send_sse(response)
+        else:
+            self._send_json(200, response)
+
+    def _build_response(self, turn: ScriptedTurn, model: str, request_size: int) -> Dict[str, Any]:
+        parts = [{"functionCall": {"name": call.name, "args": call.args}} for call in turn.function_calls]
+        if turn.text is not None:
+            parts.append({"text": turn.text})
+        candidates_tokens = max(1, len(json.dumps(parts)) // 4)
+        prompt_tokens = max(1, request_size // 4)
+        return {
+            "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": 0}],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": candidates_tokens,
+                "totalTokenCount": prompt_tokens + candidates_tokens,
+            },
+            "modelVersion": model,
+        }
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_sse(self, payload: Dict[str, Any]):
+        data = f"data: {json.dumps(payload)}\r\n\r\n".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Per-request access logs would swamp load tests.
+        logger.debug(format % args)
@@ -1,11 +1,21 @@
 # packages/framework/orchestrator.py
 
+import logging
+import threading
 from pathlib import Path
-from .loaders import ProfileLoader, PlaybookLoader
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .loaders import ProfileLoader, PlaybookLoader, PlaybookSettings
+from .checkpoints import RunCheckpoint
+from .events import event_emitter
+from .client_pool import ClientPool, client_pool as default_client_pool
 from .prompt_constructor import PromptConstructor
-from .tool_wrapper import tool_wrapper_factory
-from packages.plugin_manager_agent import GeminiAgent
-from packages.plugin_manager_agent.tools import TOOL_LIST
+from .resilience import Resilience
+from .scheduler import ModelCallScheduler
+from .tool_registry import ToolRegistry, tool_registry as default_tool_registry
+from .utils import KeyPool
+from packages.plugin_manager_agent import GeminiAgent, HistoryManager, RunBudget, RunResult, workspace_index
+
+logger = logging.getLogger(__name__)
 
 class Orchestrator:
     """
@@ -17,23 +27,52 @@ class Orchestrator:
         profile_loader: ProfileLoader,
         playbook_loader: PlaybookLoader,
         prompt_constructor: PromptConstructor,
-        hitl: bool = False
+        hitl: bool = False,
+        model_call_wrappers: Optional[List] = None,
+        max_history_tokens: Optional[int] = None,
+        scheduler: Optional[ModelCallScheduler] = None,
+        priority: str = "batch",
+        resilience: Optional[Resilience] = None,
+        client_pool: Optional[ClientPool] = None,
+        key_pool: Optional[KeyPool] = None,
+        tool_registry: Optional[ToolRegistry] = None,
+        budget: Optional[RunBudget] = None
     ):
         self.profile_loader = profile_loader
         self.playbook_loader = playbook_loader
         self.prompt_constructor = prompt_constructor
         self.hitl = hitl
+        # Layered around every model call of the agents this orchestrator creates (e.g. a `Cassette`).
+        self.model_call_wrappers = model_call_wrappers or []
+        # Token budget for the history sent to the model; `None` keeps the agent's default.
+        self.max_history_tokens = max_history_tokens
+        # A quota scheduler shared with other orchestrators in this process, and the default priority class of runs.
+        self.scheduler = scheduler
+        self.priority = priority
+        # Retries transient model failures; its circuit breaker also gates new runs.
+        self.resilience = resilience
+        # Runs share clients (and their keep-alive connections) through this pool.
+        self.client_pool = client_pool or default_client_pool
+        # When set, runs started without an explicit API key draw one from this pool.
+        self.key_pool = key_pool
+        # Wrapped tools and their function declarations, built once and shared by every run.
+        self.tool_registry = tool_registry or default_tool_registry
+        # Limits every run's wall-clock time, turns, tool calls and tokens; `None` leaves runs unbounded.
+        self.budget = budget
 
-    def run(
+    def _prepare(
         self,
         playbook_path: Path,
         plugin_path: Path,
         env: str,
         api_key: str,
+        run_id: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: Optional[str] = None,
         **kwargs
-    ) -> str:
+    ) -> Tuple[GeminiAgent, str]:
         """
-        The main execution method to run a playbook on a plugin.
+        Loads the inputs for a run and returns the configured agent and its initial prompt.
         """
         # 1. Load profile and playbook
         profile = self.profile_loader.load(plugin_path)
@@ -44,20 +83,210 @@ class Orchestrator:
             playbook=playbook,
             profile=profile,
             env=env,
+            plugin_path=plugin_path,
             **kwargs
         )
 
-        # 3. Instantiate the agent with HITL-aware tools
-        tool_wrapper = tool_wrapper_factory(hitl=self.hitl)
-        wrapped_tools = [tool_wrapper(tool) for tool in TOOL_LIST]
-        
-        agent = GeminiAgent(
+        # 3. Instantiate the agent with HITL-aware tools and a checkpoint in the plugin's .history
+        checkpoint = RunCheckpoint(plugin_path, run_id, meta={
+            "playbook_path": str(playbook_path),
+            "plugin_path": str(plugin_path),
+            "env": env,
+            "kwargs": kwargs,
+            # Kept with the run so that `resume` honors the playbook's front matter too.
+            "playbook_settings": playbook.settings.model_dump(exclude_none=True),
+        })
+        agent = self._create_agent(plugin_path, api_key, checkpoint, cancel_event, priority)
+
+        return agent, prompt
+
+    def _create_agent(
+        self,
+        plugin_path: Path,
+        api_key: str,
+        checkpoint: RunCheckpoint,
+        cancel_event: Optional[threading.Event] = None,
+        priority: Optional[str] = None
+    ) -> GeminiAgent:
+        if self.resilience is not None:
+            # Refuse to start sessions while the backend is failing (raises CircuitOpenError).
+            self.resilience.circuit_breaker.check()
+
+        settings = PlaybookSettings(**checkpoint.meta.get("playbook_settings", {}))
+        tool_set = self.tool_registry.get(self.hitl, settings.tools)
+        recorded_version = checkpoint.meta.get("tools_version")
+        if recorded_version is not None and recorded_version != tool_set.version:
+            logger.warning(
+                f"Run {checkpoint.run_id} was recorded with tool schema {recorded_version}; "
+                f"continuing with {tool_set.version}"
+            )
+        checkpoint.meta["tools_version"] = tool_set.version
+
+        model_call_wrappers = list(self.model_call_wrappers)
+        if self.resilience is not None:
+            model_call_wrappers.insert(0, self.resilience)
+        if self.key_pool is not None:
+            if not api_key:
+                api_key = self.key_pool.acquire()
+            model_call_wrappers.insert(0, self.key_pool.reporter(api_key))
+        if self.scheduler is not None:
+            # Innermost, so that every retry waits for quota and cassette replays never consume any.
+            model_call_wrappers.insert(0, self.scheduler.session(checkpoint.run_id, priority or self.priority))
+
+        # Only the settings a playbook declares are passed on; the rest keep the agent's defaults.
+        agent_settings = {"model_name": settings.model, "max_turns": settings.max_turns}
+        return GeminiAgent(
             api_key=api_key,
+            client=self.client_pool.get(api_key),
             working_directory=str(plugin_path),
-            tools=wrapped_tools
+            tools=tool_set.functions,
+            function_declarations=tool_set.declarations,
+            generation_config=settings.generation_config(),
+            checkpoint=checkpoint,
+            model_call_wrappers=model_call_wrappers,
+            history_manager=HistoryManager(max_tokens=self.max_history_tokens) if self.max_history_tokens else None,
+            budget=self.budget,
+            workspace_index=workspace_index(plugin_path),
+            cancel_event=cancel_event,
+            on_turn_completed=lambda record: event_emitter.emit("model_turn_completed", {"run_id": checkpoint.run_id, **record}),
+            **{name: value for name, value in agent_settings.items() if value is not None}
         )
 
+    def run(
+        self,
+        playbook_path: Path,
+        plugin_path: Path,
+        env: str,
+        api_key: str,
+        run_id: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """
+        The main execution method to run a playbook on a plugin.
+
+        Progress is checkpointed to `<plugin_path>/.history/<run_id>/`; pass an
+        explicit `run_id` to be able to `resume` the run if it is interrupted.
+        Setting `cancel_event` stops the run before its next model or tool call.
+        `priority` overrides the orchestrator's scheduler priority class for this run.
+        """
+        return self.run_with_result(playbook_path, plugin_path, env, api_key, run_id, cancel_event, priority, **kwargs).final_response
+
+    def run_with_result(
+        self,
+        playbook_path: Path,
+        plugin_path: Path,
+        env: str,
+        api_key: str,
+        run_id: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: Optional[str] = None,
+        **kwargs
+    ) -> RunResult:
+        """
+        Like `run`, but returns the structured result: whether the run completed
+        or was stopped by its budget (and why), and what it consumed.
+        """
+        agent, prompt = self._prepare(playbook_path, plugin_path, env, api_key, run_id, cancel_event, priority, **kwargs)
+
         # 4. Run the agent's execution method
-        final_response = agent.execute(prompt)
-        
-        return final_response
\ No newline at end of file
+        return self._finish(agent, lambda: agent.execute(prompt))
+
+    def stream(
+        self,
+        playbook_path: Path,
+        plugin_path: Path,
+        env: str,
+        api_key: str,
+        run_id: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: Optional[str] = None,
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of `run`. Yields the agent's text chunks and tool
+        events as they happen (see `GeminiAgent.stream`); the last event is
+        `{"type": "final", "text": ...}`.
+        """
+        agent, prompt = self._prepare(playbook_path, plugin_path, env, api_key, run_id, cancel_event, priority, **kwargs)
+
+        try:
+            for event in agent.stream(prompt):
+                yield event
+        except Exception as e:
+            agent.checkpoint.fail(str(e))
+            raise
+        finally:
+            self._release(agent)
+        self._record_result(agent)
+
+    async def arun(
+        self,
+        playbook_path: Path,
+        plugin_path: Path,
+        env: str,
+        api_key: str,
+        run_id: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """
+        Asynchronous counterpart of `run`. Many runs can be awaited concurrently
+        (e.g. with `asyncio.gather`) from a single process.
+        """
+        agent, prompt = self._prepare(playbook_path, plugin_path, env, api_key, run_id, cancel_event, priority, **kwargs)
+
+        try:
+            await agent.aexecute(prompt)
+        except Exception as e:
+            agent.checkpoint.fail(str(e))
+            raise
+        finally:
+            self._release(agent)
+        return self._record_result(agent).final_response
+
+    def resume(self, plugin_path: Path, run_id: str, api_key: str, cancel_event: Optional[threading.Event] = None) -> str:
+        """
+        Continues an interrupted run from its last completed turn.
+
+        Raises:
+            FileNotFoundError: If no checkpoint exists for the run.
+            CircuitOpenError: If the circuit breaker is refusing new sessions.
+        """
+        return self.resume_with_result(plugin_path, run_id, api_key, cancel_event).final_response
+
+    def resume_with_result(
+        self,
+        plugin_path: Path,
+        run_id: str,
+        api_key: str,
+        cancel_event: Optional[threading.Event] = None
+    ) -> RunResult:
+        """Like `resume`, but returns the structured result (see `run_with_result`)."""
+        checkpoint = RunCheckpoint.load(plugin_path, run_id)
+        agent = self._create_agent(plugin_path, api_key, checkpoint, cancel_event)
+        agent.history = checkpoint.load_history()
+
+        return self._finish(agent, agent.resume)
+
+    def _finish(self, agent: GeminiAgent, execute: Callable[[], str]) -> RunResult:
+        """Runs the agent and records the outcome in its checkpoint."""
+        try:
+            execute()
+        except Exception as e:
+            agent.checkpoint.fail(str(e))
+            raise
+        finally:
+            self._release(agent)
+        return self._record_result(agent)
+
+    def _record_result(self, agent: GeminiAgent) -> RunResult:
+        result = agent.result
+        agent.checkpoint.finish(result.final_response, status=result.status, reason=result.reason, usage=result.usage)
+        return result
+
+    def _release(self, agent: GeminiAgent):
+        if self.scheduler is not None:
+            self.scheduler.forget(agent.checkpoint.run_id)
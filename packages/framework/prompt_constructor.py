@@ -1,12 +1,19 @@
 # packages/framework/prompt_constructor.py
 
+from pathlib import Path
+from typing import Optional
+from .context_primer import ContextPrimer
 from .loaders import Playbook
 from .schema import PluginProfile
 
 class PromptConstructor:
     """Constructs the initial prompt for the agent."""
 
-    def construct(self, playbook: Playbook, profile: PluginProfile, env: str, **kwargs) -> str:
+    def __init__(self, context_primer: Optional[ContextPrimer] = None):
+        # When set, a manifest of the plugin and a digest of its profile are prepended to every prompt.
+        self.context_primer = context_primer
+
+    def construct(self, playbook: Playbook, profile: PluginProfile, env: str, plugin_path: Optional[Path] = None, **kwargs) -> str:
         """
         Constructs the final prompt string by injecting context into the playbook template.
 
@@ -14,6 +21,7 @@ class PromptConstructor:
             playbook: The loaded playbook object.
             profile: The loaded plugin profile object.
             env: The execution environment ('virtual' or 'real').
+            plugin_path: The plugin's root directory, needed for context priming.
             **kwargs: Additional placeholder values (e.g., bug_description).
 
         Returns:
@@ -46,4 +54,7 @@ class PromptConstructor:
         
         prompt = prompt.replace("{environment_specific_instructions}", instructions)
 
+        if self.context_primer is not None and plugin_path is not None:
+            prompt = f"{self.context_primer.prime(plugin_path, profile)}\n\n{prompt}"
+
         return prompt
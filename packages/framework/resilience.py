@@ -0,0 +1,256 @@
+# packages/framework/resilience.py
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from functools import wraps
+from typing import Callable, Optional
+import httpx
+from google.genai import errors
+from .events import event_emitter
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: throttling and transient server-side failures.
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a new session is refused because the model backend is failing."""
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)
+
+def is_throttle(error: Exception) -> bool:
+    return isinstance(error, errors.APIError) and error.code == 429
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n waits uniformly in [0, min(max_delay, base_delay * 2**n)]."""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0, rng: Optional[random.Random] = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int) -> float:
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+class AIMDLimiter:
+    """
+    Limits in-flight model calls with additive-increase / multiplicative-decrease.
+
+    Every success raises the limit by 1/limit (about +1 per round of calls);
+    every throttling signal halves it. Callers above the limit wait.
+    """
+
+    def __init__(self, initial: float = 8, minimum: float = 1, maximum: float = 64, decrease_factor: float = 0.5):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False, succeeded: bool = False):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                logger.info(f"Throttled; model call concurrency limit lowered to {self.limit:.1f}")
+            elif succeeded:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class CircuitBreaker:
+    """
+    Stops new sessions from starting while the model backend is failing.
+
+    After `failure_threshold` consecutive failed calls the circuit opens and
+    `check` raises CircuitOpenError. Once `reset_timeout` seconds have passed it
+    is half-open: one session may start, and the next call outcome closes the
+    circuit or opens it again. A probe whose call failed before reaching the
+    backend (see `release_probe`) lets the next session probe right away; if a
+    probe never reports anything (e.g. it was replayed from a cassette or stopped
+    by its budget), another session may probe once `reset_timeout` has passed
+    again. State changes are emitted on the framework
+    `event_emitter` as `circuit_opened`, `circuit_half_opened` and `circuit_closed`.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raises CircuitOpenError if a new session may not start."""
+        with self._lock:
+            if self.state == "open":
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError(
+                        f"The model backend is failing; new sessions are paused for up to {self.reset_timeout:.0f}s."
+                    )
+                self._probe_started_at = self.clock()
+                self._probing = True
+                self._transition("half_open")
+            elif self.state == "half_open":
+                if self._probing and self.clock() - self._probe_started_at < self.reset_timeout:
+                    raise CircuitOpenError("The model backend is being probed; new sessions are paused.")
+                # The probe session never reached the backend; let this session probe instead.
+                self._probe_started_at = self.clock()
+                self._probing = True
+
+    def release_probe(self):
+        """Gives up a half-open probe without an outcome (its call failed locally), so the next session may probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            if self.state != "closed":
+                self._transition("closed")
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self._opened_at = self.clock()
+                self._transition("open", error=str(error))
+
+    def _transition(self, state: str, **data):
+        self.state = state
+        event_name = {"open": "circuit_opened", "half_open": "circuit_half_opened", "closed": "circuit_closed"}[state]
+        logger.warning(f"Model circuit breaker is now {state}")
+        event_emitter.emit(event_name, {"failures": self.failures, **data})
+
+class Resilience:
+    """
+    A model call wrapper that retries transient failures.
+
+    Each attempt passes through the AIMD limiter, and its outcome is reported to
+    the circuit breaker. Retries use the policy's jittered exponential backoff
+    and are announced as `model_call_retried` events. Streams are only retried
+    if they fail before their first chunk.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        limiter: Optional[AIMDLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.policy = policy or RetryPolicy()
+        self.limiter = limiter or AIMDLimiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.sleep = sleep
+
+    def wrap(self, call):
+        @wraps(call)
+        def wrapper(*, model, contents, config=None):
+            for attempt in range(self.policy.max_attempts):
+                self.limiter.acquire()
+                try:
+                    response = call(model=model, contents=contents, config=config)
+                except Exception as e:
+                    self._failed(e, attempt)
+                    self.sleep(self._retry_delay(e, attempt))
+                    continue
+                except BaseException:
+                    self.limiter.release()
+                    raise
+                self._succeeded()
+                return response
+        return wrapper
+
+    def wrap_async(self, call):
+        @wraps(call)
+        async def wrapper(*, model, contents, config=None):
+            for attempt in range(self.policy.max_attempts):
+                await asyncio.to_thread(self.limiter.acquire)
+                try:
+                    response = await call(model=model, contents=contents, config=config)
+                except Exception as e:
+                    self._failed(e, attempt)
+                    await asyncio.sleep(self._retry_delay(e, attempt))
+                    continue
+                except BaseException:
+                    # E.g. the task was cancelled; the slot must still be given back.
+                    self.limiter.release()
+                    raise
+                self._succeeded()
+                return response
+        return wrapper
+
+    def wrap_stream(self, call):
+        @wraps(call)
+        def wrapper(*, model, contents, config=None):
+            for attempt in range(self.policy.max_attempts):
+                self.limiter.acquire()
+                started, settled = False, False
+                try:
+                    for chunk in call(model=model, contents=contents, config=config):
+                        started = True
+                        yield chunk
+                    settled = True
+                except Exception as e:
+                    settled = True
+                    if started:
+                        # Chunks already reached the caller; replaying the stream would duplicate them.
+                        self.limiter.release()
+                        self._report(e)
+                        raise
+                    self._failed(e, attempt)
+                    self.sleep(self._retry_delay(e, attempt))
+                    continue
+                finally:
+                    if not settled:
+                        # The consumer closed the stream early (GeneratorExit); give the slot back.
+                        self.limiter.release()
+                self._succeeded()
+                return
+        return wrapper
+
+    def _succeeded(self):
+        self.limiter.release(succeeded=True)
+        self.circuit_breaker.record_success()
+
+    def _failed(self, error: Exception, attempt: int):
+        """Records a failed attempt and re-raises it unless it should be retried."""
+        self.limiter.release(throttled=is_throttle(error))
+        self._report(error)
+        if not is_retryable(error) or attempt + 1 >= self.policy.max_attempts:
+            raise error
+
+    def _report(self, error: Exception):
+        """Reports a failed attempt to the circuit breaker, according to what it says about the backend."""
+        if is_retryable(error):
+            self.circuit_breaker.record_failure(error)
+        elif isinstance(error, errors.APIError) and 400 <= error.code < 500:
+            # The backend answered (e.g. a 400), so it is up: this also ends a half-open probe.
+            self.circuit_breaker.record_success()
+        else:
+            # The call failed before reaching the backend (e.g. a cassette miss or a bug), which proves nothing.
+            self.circuit_breaker.release_probe()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        delay = self.policy.delay(attempt)
+        logger.warning(f"Model call failed ({error}); retrying in {delay:.1f}s (attempt {attempt + 2}/{self.policy.max_attempts})")
+        event_emitter.emit("model_call_retried", {"attempt": attempt + 1, "delay": delay, "error": str(error)})
+        return delay
@@ -0,0 +1,189 @@
+# packages/framework/scheduler.py
+
+import time
+import asyncio
+import logging
+import itertools
+import threading
+from functools import wraps
+from typing import Callable, Dict, Optional
+from google.genai import errors
+from packages.plugin_manager_agent import HistoryManager
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first.
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+class TokenBucket:
+    """A bucket refilled continuously at `rate_per_minute`, holding at most `capacity`."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate_per_minute / 60
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.clock = clock
+        self.level = self.capacity
+        self._updated = clock()
+
+    def refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (0 if it can be taken now)."""
+        self.refill()
+        # A request larger than the whole bucket only needs a full bucket.
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        """Removes `amount`; the level may go negative, which delays later callers."""
+        self.refill()
+        self.level -= amount
+
+    def drain(self):
+        self.refill()
+        self.level = min(self.level, 0.0)
+
+class ModelCallScheduler:
+    """
+    Admits model calls from many concurrent runs within a shared quota.
+
+    Two token buckets enforce requests per minute and tokens per minute. Calls
+    that cannot be admitted wait in a queue ordered by priority class
+    (`interactive` before `batch`), then by how many calls their job has already
+    been granted (so a long job cannot starve a new one), then by arrival.
+    Token use is estimated from the request before the call and corrected
+    with the response's usage metadata afterwards. A 429 from the API drains the
+    request bucket so that every waiting run backs off together.
+
+    The scheduler is shared by all agents in one process; each run talks to it
+    through its own `session`, which is a model call wrapper.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 1_000_000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self._condition = threading.Condition()
+        self._waiting = {}
+        self._granted: Dict[str, int] = {}
+        self._sequence = itertools.count()
+
+    def session(self, job: str, priority: str = "batch") -> "SchedulerSession":
+        """Returns the model call wrapper through which one run's calls are scheduled."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'. Expected one of: {', '.join(PRIORITIES)}")
+        return SchedulerSession(self, job, priority)
+
+    def acquire(self, job: str, priority: str, estimated_tokens: int):
+        """Blocks until the call may be sent."""
+        ticket = next(self._sequence)
+        with self._condition:
+            self._waiting[ticket] = (PRIORITIES[priority], self._granted.get(job, 0), ticket)
+            try:
+                while True:
+                    if min(self._waiting.values()) == self._waiting[ticket]:
+                        delay = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                        if delay == 0:
+                            break
+                        self._condition.wait(delay)
+                    else:
+                        self._condition.wait()
+                self.requests.take(1)
+                self.tokens.take(estimated_tokens)
+                self._granted[job] = self._granted.get(job, 0) + 1
+            finally:
+                del self._waiting[ticket]
+                self._condition.notify_all()
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Corrects the token bucket once a call's real usage is known."""
+        if actual_tokens is None:
+            return
+        with self._condition:
+            self.tokens.take(actual_tokens - estimated_tokens)
+            self._condition.notify_all()
+
+    def throttled(self):
+        """Records a 429 from the API."""
+        logger.warning("Model quota exhausted (429); holding back queued calls.")
+        with self._condition:
+            self.requests.drain()
+            self._condition.notify_all()
+
+    def forget(self, job: str):
+        """Drops the fair-share state of a finished job."""
+        with self._condition:
+            self._granted.pop(job, None)
+
+class SchedulerSession:
+    """One run's view of a ModelCallScheduler, usable as a `model_call_wrapper`."""
+
+    def __init__(self, scheduler: ModelCallScheduler, job: str, priority: str):
+        self.scheduler = scheduler
+        self.job = job
+        self.priority = priority
+
+    def wrap(self, call):
+        @wraps(call)
+        def wrapper(*, model, contents, config=None):
+            estimated = self._estimate(contents)
+            self.scheduler.acquire(self.job, self.priority, estimated)
+            try:
+                response = call(model=model, contents=contents, config=config)
+            except errors.APIError as e:
+                self._failed(e)
+                raise
+            self.scheduler.settle(estimated, _total_tokens(response))
+            return response
+        return wrapper
+
+    def wrap_async(self, call):
+        @wraps(call)
+        async def wrapper(*, model, contents, config=None):
+            estimated = self._estimate(contents)
+            # Waiting for quota must not block the event loop that drives the other runs.
+            await asyncio.to_thread(self.scheduler.acquire, self.job, self.priority, estimated)
+            try:
+                response = await call(model=model, contents=contents, config=config)
+            except errors.APIError as e:
+                self._failed(e)
+                raise
+            self.scheduler.settle(estimated, _total_tokens(response))
+            return response
+        return wrapper
+
+    def wrap_stream(self, call):
+        @wraps(call)
+        def wrapper(*, model, contents, config=None):
+            estimated = self._estimate(contents)
+            self.scheduler.acquire(self.job, self.priority, estimated)
+            last_chunk = None
+            try:
+                # The request is only sent once iteration starts, so errors surface here.
+                for chunk in call(model=model, contents=contents, config=config):
+                    last_chunk = chunk
+                    yield chunk
+            except errors.APIError as e:
+                self._failed(e)
+                raise
+            self.scheduler.settle(estimated, _total_tokens(last_chunk))
+        return wrapper
+
+    def _failed(self, error: errors.APIError):
+        if error.code == 429:
+            self.scheduler.throttled()
+
+    @staticmethod
+    def _estimate(contents: list) -> int:
+        return sum(HistoryManager.estimate_tokens(content) for content in contents)
+
+def _total_tokens(response) -> Optional[int]:
+    usage = getattr(response, "usage_metadata", None)
+    return usage.total_token_count if usage is not None else None
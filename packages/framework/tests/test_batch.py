@@ -0,0 +1,50 @@
+# packages/framework/tests/test_batch.py
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from pathlib import Path
+from packages.framework.batch import run_single, run_batch, BatchResult
+from packages.framework.events import event_emitter
+from packages.plugin_manager_agent import RunResult
+
+@pytest.fixture
+def mock_orchestrator_run():
+    """Patches Orchestrator.run_with_result so that it emits a tool event and returns a summary."""
+    def fake_run(self, playbook_path, plugin_path, env, api_key, **kwargs):
+        if plugin_path.name == "broken-plugin":
+            raise FileNotFoundError("plugin-profile.yaml not found")
+        event_emitter.emit("tool_requested", {"name": "list_files", "args": {"path": str(plugin_path)}})
+        return RunResult(status="completed", final_response=f"Done with {plugin_path.name}", usage={"turns": 2})
+
+    with patch('packages.framework.batch.Orchestrator.run_with_result', fake_run):
+        yield
+
+def test_run_single_captures_response_and_events(mock_orchestrator_run):
+    """Tests that a single run collects its final response and tool events."""
+    result = run_single(Path("playbook.md"), Path("plugin-a"), "virtual", "test_key")
+
+    assert result.succeeded
+    assert result.final_response == "Done with plugin-a"
+    assert (result.status, result.usage) == ("completed", {"turns": 2})
+    assert result.events == [{"name": "list_files", "args": {"path": "plugin-a"}}]
+
+def test_run_single_records_errors(mock_orchestrator_run):
+    """Tests that a failing run is reported in the result rather than raised."""
+    result = run_single(Path("playbook.md"), Path("broken-plugin"), "virtual", "test_key")
+
+    assert not result.succeeded
+    assert "plugin-profile.yaml not found" in result.error
+    assert result.final_response is None
+
+def test_run_batch_preserves_plugin_order(mock_orchestrator_run):
+    """Tests that batch results are returned in the order the plugins were given."""
+    plugin_paths = [Path(f"plugin-{i}") for i in range(5)] + [Path("broken-plugin")]
+
+    # Threads stand in for processes so the patched Orchestrator is visible to the workers.
+    with patch('packages.framework.batch.ProcessPoolExecutor', ThreadPoolExecutor):
+        results = run_batch(Path("playbook.md"), plugin_paths, "virtual", "test_key", max_workers=3)
+
+    assert [r.plugin_path for r in results] == [str(p) for p in plugin_paths]
+    assert all(isinstance(r, BatchResult) for r in results)
+    assert [r.succeeded for r in results] == [True] * 5 + [False]
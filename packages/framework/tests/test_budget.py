@@ -0,0 +1,154 @@
+# packages/framework/tests/test_budget.py
+
+import time
+import pytest
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+from google.genai import types
+from packages.framework.checkpoints import RunCheckpoint
+from packages.plugin_manager_agent import GeminiAgent, RunBudget
+from packages.plugin_manager_agent.tools import execute_shell_command
+
+def model_turn(*parts: types.Part, prompt_tokens: int = 0, output_tokens: int = 0) -> types.GenerateContentResponse:
+    """Builds a model response with the given parts and token usage."""
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))],
+        usage_metadata=types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens, candidates_token_count=output_tokens
+        ),
+    )
+
+def call(name: str, **args) -> types.Part:
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+def make_agent(tmp_path: Path, tools: list, budget: RunBudget, *responses: types.GenerateContentResponse) -> GeminiAgent:
+    agent = GeminiAgent(api_key="test_key", working_directory=str(tmp_path), tools=tools, budget=budget)
+    agent.client = MagicMock()
+    agent.client.models.generate_content.side_effect = list(responses)
+    return agent
+
+def test_completed_runs_report_their_usage(tmp_path: Path):
+    """Tests that an unlimited run completes and reports turns, tool calls and tokens."""
+    agent = make_agent(
+        tmp_path, [execute_shell_command], RunBudget(),
+        model_turn(call("execute_shell_command", command="true"), prompt_tokens=100, output_tokens=10),
+        model_turn(types.Part.from_text(text="Done."), prompt_tokens=150, output_tokens=5),
+    )
+
+    assert agent.execute("Run it.") == "Done."
+    assert agent.result.status == "completed" and agent.result.reason is None
+    assert {key: agent.result.usage[key] for key in ("turns", "tool_calls", "input_tokens", "output_tokens")} == {
+        "turns": 2, "tool_calls": 1, "input_tokens": 250, "output_tokens": 15,
+    }
+
+def test_turn_limit_ends_the_run_with_its_partial_answer(tmp_path: Path):
+    """Tests that the run stops before the next model call and leaves the pending calls for a resume."""
+    agent = make_agent(
+        tmp_path, [execute_shell_command], RunBudget(max_turns=1),
+        model_turn(types.Part.from_text(text="Checking first."), call("execute_shell_command", command="true")),
+    )
+
+    assert agent.execute("Run it.") == "Checking first."
+    assert (agent.result.status, agent.result.reason) == ("budget_exceeded", "turn limit of 1 reached")
+    assert agent.client.models.generate_content.call_count == 1
+    assert agent.history[-1].role == "model"  # The requested call was not run, so a resume will run it.
+
+def test_tool_call_limit_leaves_refused_calls_for_a_resume(tmp_path: Path):
+    """Tests that calls beyond the limit are neither run nor answered, so that a resume runs only those."""
+    ran = []
+
+    def echo(text: str) -> str:
+        ran.append(text)
+        return text
+
+    checkpoint = RunCheckpoint(tmp_path, "run-1")
+    agent = make_agent(
+        tmp_path, [echo], RunBudget(max_tool_calls=1),
+        model_turn(call("echo", text="one"), call("echo", text="two")),
+    )
+    agent.checkpoint = checkpoint
+
+    agent.execute("Run both.")
+
+    # The two calls run concurrently, so either one may be the call that is refused.
+    assert len(ran) == 1 and agent.result.status == "budget_exceeded"
+    assert agent.history[-1].role == "model"
+    assert [event["args"]["text"] for event in checkpoint.load_tool_events()] == ran
+
+    resumed_checkpoint = RunCheckpoint.load(tmp_path, "run-1")
+    resumed = make_agent(tmp_path, [echo], RunBudget(), model_turn(types.Part.from_text(text="Done.")))
+    resumed.checkpoint = resumed_checkpoint
+    resumed.history = resumed_checkpoint.load_history()
+
+    assert resumed.resume() == "Done."
+    assert sorted(ran) == ["one", "two"]
+    responses = [part.function_response.response for part in resumed.history[2].parts]
+    assert responses == [{"result": "one"}, {"result": "two"}]
+
+def test_failed_runs_stop_the_deadline_watchdog(tmp_path: Path):
+    """Tests that a run ended by an error other than its budget does not leave the deadline timer running."""
+    agent = make_agent(tmp_path, [execute_shell_command], RunBudget(max_seconds=60))
+    agent.client.models.generate_content.side_effect = RuntimeError("backend down")
+
+    with pytest.raises(RuntimeError):
+        agent.execute("Run it.")
+
+    agent._tracker._timer.join(timeout=1)
+    assert not agent._tracker._timer.is_alive()
+
+def test_cancel_event_stops_the_run(tmp_path: Path):
+    """Tests that setting the caller's cancel event ends the run as cancelled before its next model call."""
+    agent = make_agent(
+        tmp_path, [execute_shell_command], RunBudget(),
+        model_turn(call("execute_shell_command", command="true")),
+    )
+    agent.cancel_event = threading.Event()
+    agent.cancel_event.set()
+
+    agent.execute("Run it.")
+
+    assert (agent.result.status, agent.result.reason) == ("cancelled", "cancelled by the caller")
+    agent.client.models.generate_content.assert_not_called()
+
+def test_turn_cap_ends_the_run_as_a_partial_result(tmp_path: Path):
+    """Tests that a run cut off by max_turns reports budget_exceeded, not completed, from run and stream alike."""
+    turn = model_turn(call("execute_shell_command", command="true"))
+    agent = make_agent(tmp_path, [execute_shell_command], RunBudget(), turn, turn)
+    agent.max_turns = 2
+
+    agent.execute("Keep going.")
+    assert (agent.result.status, agent.result.reason) == ("budget_exceeded", "turn limit of 2 reached")
+    assert agent.history[-1].role == "model"  # The last requested call is left for a resume.
+
+    agent.client.models.generate_content_stream.side_effect = lambda **kwargs: iter([turn])
+    final = list(agent.stream("Keep going."))[-1]
+    assert (final["result"]["status"], final["result"]["reason"]) == ("budget_exceeded", "turn limit of 2 reached")
+
+def test_token_limit_stops_the_run(tmp_path: Path):
+    """Tests that the run stops once the reported input tokens reach the limit."""
+    agent = make_agent(
+        tmp_path, [execute_shell_command], RunBudget(max_input_tokens=1_000),
+        model_turn(call("execute_shell_command", command="true"), prompt_tokens=1_200),
+    )
+
+    agent.execute("Run it.")
+
+    assert agent.result.reason == "input token limit of 1000 reached"
+    assert agent.result.usage["input_tokens"] == 1_200
+
+def test_deadline_cancels_a_running_tool(tmp_path: Path):
+    """Tests that the deadline stops a long shell command instead of waiting for it."""
+    agent = make_agent(
+        tmp_path, [execute_shell_command], RunBudget(max_seconds=0.3),
+        model_turn(call("execute_shell_command", command="sleep 5")),
+    )
+
+    started = time.monotonic()
+    agent.execute("Wait.")
+
+    assert time.monotonic() - started < 3
+    assert agent.history[-1].parts[0].function_response.response == {
+        "result": "Error executing command: Command 'sleep 5' was cancelled"
+    }
+    assert (agent.result.status, agent.result.reason) == ("budget_exceeded", "deadline of 0.3s reached")
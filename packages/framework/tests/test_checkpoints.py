@@ -0,0 +1,120 @@
+# packages/framework/tests/test_checkpoints.py
+
+import pytest
+from pathlib import Path
+from unittest.mock import MagicMock
+from google.genai import types
+from packages.framework.checkpoints import RunCheckpoint
+from packages.plugin_manager_agent import GeminiAgent
+
+def model_turn(*parts: types.Part) -> types.GenerateContentResponse:
+    """Builds a model response with the given parts."""
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+def call(name: str, **args) -> types.Part:
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+@pytest.fixture
+def plugin_path(tmp_path: Path) -> Path:
+    (tmp_path / "notes.txt").write_text("hello")
+    return tmp_path
+
+def make_agent(plugin_path: Path, checkpoint: RunCheckpoint, tool_calls: list) -> GeminiAgent:
+    """Creates an agent with a scripted model client and a recording tool."""
+    def read_file(path: str) -> str:
+        tool_calls.append(path)
+        return (plugin_path / path).read_text()
+
+    agent = GeminiAgent(api_key="test_key", working_directory=str(plugin_path), tools=[read_file], checkpoint=checkpoint)
+    agent.client = MagicMock()
+    return agent
+
+def test_checkpoint_is_not_created_until_history_is_saved(plugin_path: Path):
+    """Tests that a checkpoint leaves no trace before the run reaches the model."""
+    checkpoint = RunCheckpoint(plugin_path, "run-1")
+    assert not checkpoint.run_dir.exists()
+
+    checkpoint.save_history([types.Content(role="user", parts=[types.Part.from_text(text="Hi")])])
+
+    assert (checkpoint.run_dir / "meta.json").is_file()
+    assert RunCheckpoint.load(plugin_path, "run-1").load_history()[0].parts[0].text == "Hi"
+
+def test_checkpoint_appends_history_incrementally(plugin_path: Path):
+    """Tests that only new turns are appended on each save."""
+    checkpoint = RunCheckpoint(plugin_path, "run-1")
+    history = [types.Content(role="user", parts=[types.Part.from_text(text="one")])]
+    checkpoint.save_history(history)
+    history.append(types.Content(role="model", parts=[types.Part.from_text(text="two")]))
+    checkpoint.save_history(history)
+
+    lines = (checkpoint.run_dir / "history.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+
+def test_checkpoint_load_drops_partial_trailing_line(plugin_path: Path):
+    """Tests that a line truncated by a crash is discarded on load."""
+    checkpoint = RunCheckpoint(plugin_path, "run-1")
+    checkpoint.save_history([types.Content(role="user", parts=[types.Part.from_text(text="one")])])
+    with open(checkpoint.run_dir / "history.jsonl", "a") as f:
+        f.write('{"role": "mod')
+
+    reloaded = RunCheckpoint.load(plugin_path, "run-1")
+
+    assert len(reloaded.load_history()) == 1
+    assert (reloaded.run_dir / "history.jsonl").read_text().endswith("\n")
+
+def test_load_missing_checkpoint_raises(plugin_path: Path):
+    """Tests that resuming an unknown run fails clearly."""
+    with pytest.raises(FileNotFoundError):
+        RunCheckpoint.load(plugin_path, "does-not-exist")
+
+def test_agent_persists_turns_and_tool_events(plugin_path: Path):
+    """Tests that a full run is written to .history as it progresses."""
+    tool_calls = []
+    checkpoint = RunCheckpoint(plugin_path, "run-1")
+    agent = make_agent(plugin_path, checkpoint, tool_calls)
+    agent.client.models.generate_content.side_effect = [
+        model_turn(call("read_file", path="notes.txt")),
+        model_turn(types.Part.from_text(text="The file says hello")),
+    ]
+
+    assert agent.execute("Read notes.txt") == "The file says hello"
+
+    reloaded = RunCheckpoint.load(plugin_path, "run-1")
+    assert [c.role for c in reloaded.load_history()] == ["user", "model", "user", "model"]
+    events = reloaded.load_tool_events()
+    assert events == [{"turn": 1, "index": 0, "name": "read_file", "args": {"path": "notes.txt"}, "response": {"result": "hello"}}]
+
+def test_agent_resume_does_not_replay_completed_tool_calls(plugin_path: Path):
+    """Tests that a run interrupted mid-turn only executes the tool calls that never finished."""
+    tool_calls = []
+    checkpoint = RunCheckpoint(plugin_path, "run-1")
+    agent = make_agent(plugin_path, checkpoint, tool_calls)
+
+    # Simulate a crash after the first of two tool calls in a turn.
+    agent.history = [types.Content(role="user", parts=[types.Part.from_text(text="Read both")])]
+    agent.history.append(model_turn(call("read_file", path="notes.txt"), call("read_file", path="notes.txt")).candidates[0].content)
+    checkpoint.save_history(agent.history)
+    checkpoint.record_tool_event({"turn": 1, "index": 0, "name": "read_file", "args": {"path": "notes.txt"}, "response": {"result": "recorded"}})
+
+    resumed_checkpoint = RunCheckpoint.load(plugin_path, "run-1")
+    resumed = make_agent(plugin_path, resumed_checkpoint, tool_calls)
+    resumed.history = resumed_checkpoint.load_history()
+    resumed.client.models.generate_content.return_value = model_turn(types.Part.from_text(text="Done"))
+
+    assert resumed.resume() == "Done"
+    assert tool_calls == ["notes.txt"]  # Only the second call ran.
+    responses = [part.function_response.response for part in resumed.history[2].parts]
+    assert responses == [{"result": "recorded"}, {"result": "hello"}]
+
+def test_agent_resume_of_finished_run_returns_final_text(plugin_path: Path):
+    """Tests that resuming a completed run does not call the model again."""
+    agent = make_agent(plugin_path, None, [])
+    agent.history = [
+        types.Content(role="user", parts=[types.Part.from_text(text="Hi")]),
+        types.Content(role="model", parts=[types.Part.from_text(text="Already done")]),
+    ]
+
+    assert agent.resume() == "Already done"
+    agent.client.models.generate_content.assert_not_called()
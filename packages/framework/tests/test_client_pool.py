@@ -0,0 +1,64 @@
+# packages/framework/tests/test_client_pool.py
+
+import asyncio
+from pathlib import Path
+from packages.framework.client_pool import ClientPool
+from packages.framework.mock_gemini_server import MockGeminiServer, MockScript
+from packages.plugin_manager_agent import GeminiAgent
+
+def test_clients_are_shared_per_key():
+    """Tests that the same key returns the same client and different keys do not."""
+    pool = ClientPool()
+    try:
+        assert pool.get("key-a", base_url="http://localhost:1/") is pool.get("key-a", base_url="http://localhost:1/")
+        assert pool.get("key-a", base_url="http://localhost:1/") is not pool.get("key-b", base_url="http://localhost:1/")
+        assert pool.stats()["clients"] == 2
+    finally:
+        pool.close()
+
+def test_runs_reuse_keep_alive_connections(tmp_path: Path):
+    """Tests that consecutive runs on a pooled client reuse one connection."""
+    pool = ClientPool()
+    try:
+        with MockGeminiServer(MockScript(turns=[{"text": "Done."}])) as server:
+            for _ in range(3):
+                agent = GeminiAgent(api_key="test_key", working_directory=str(tmp_path), tools=[],
+                                    client=pool.get("test_key", base_url=server.base_url))
+                assert agent.execute("Hello") == "Done."
+
+        assert pool.stats() == {"clients": 1, "requests": 3, "new_connections": 1, "reused_connections": 2}
+    finally:
+        pool.close()
+
+def test_warm_up_failures_are_not_raised(caplog):
+    """Tests that a failed warm-up only logs a warning."""
+    pool = ClientPool()
+    try:
+        with MockGeminiServer(MockScript()) as server:
+            pool.warm_up("test_key", base_url=server.base_url)  # The stand-in does not serve model metadata.
+        assert "warm-up" in caplog.text
+        assert pool.stats()["new_connections"] == 1
+    finally:
+        pool.close()
+
+def test_async_runs_on_separate_event_loops(tmp_path: Path):
+    """Tests that each event loop gets its own pooled client, so a closed loop is never reused."""
+    pool = ClientPool()
+
+    async def run(base_url: str) -> tuple:
+        client = pool.get("test_key", base_url=base_url)
+        agent = GeminiAgent(api_key="test_key", working_directory=str(tmp_path), tools=[], client=client)
+        return client, await agent.aexecute("Hello")
+
+    try:
+        with MockGeminiServer(MockScript(turns=[{"text": "Done."}])) as server:
+            first_client, first = asyncio.run(run(server.base_url))
+            second_client, second = asyncio.run(run(server.base_url))
+            sync_client = pool.get("test_key", base_url=server.base_url)
+
+        assert first == second == "Done."
+        assert first_client is not second_client
+        assert sync_client is not second_client
+        assert pool.stats()["clients"] == 1  # Clients of closed loops are dropped.
+    finally:
+        pool.close()
@@ -0,0 +1,64 @@
+# packages/framework/tests/test_context_primer.py
+
+import hashlib
+from pathlib import Path
+from packages.framework.context_primer import ContextPrimer
+from packages.framework.schema import BehavioralProfile, BehaviorScenario, MCPParameter, MCPTool, PluginProfile
+
+PROFILE = PluginProfile(
+    name="Test-Plugin",
+    version="1.0.0",
+    description="A test plugin.",
+    mcp_profile=[MCPTool(
+        name="greet",
+        description="Greets someone.",
+        parameters={"name": MCPParameter(type="string", description="Who to greet.")},
+        output={"type": "string"},
+    )],
+    behavioral_profile=BehavioralProfile(failure_scenarios=[BehaviorScenario(
+        description="Empty name", tool_call="greet", inputs={"name": ""}, expected_log="", expected_error="Name required",
+    )]),
+)
+
+def make_plugin(root: Path) -> Path:
+    (root / "src").mkdir()
+    (root / "src" / "main.py").write_text("print('hi')\n")
+    (root / "big.log").write_text("x" * 10_000)
+    (root / "image.bin").write_bytes(b"\0\1\2")
+    (root / ".history" / "run-1").mkdir(parents=True)
+    (root / ".history" / "run-1" / "meta.json").write_text("{}")
+    return root
+
+def test_manifest_lists_files_with_sizes_and_hashes(tmp_path: Path):
+    """Tests that every file outside ignored directories is listed with its size and short hash."""
+    context = ContextPrimer().prime(make_plugin(tmp_path), PROFILE)
+
+    short_hash = hashlib.sha256(b"print('hi')\n").hexdigest()[:8]
+    assert f"src/main.py 12 {short_hash}" in context
+    assert "big.log 10000 " in context and "image.bin 3 " in context
+    assert ".history" not in context
+
+def test_profile_digest_lists_tools_and_scenarios(tmp_path: Path):
+    """Tests that the profile digest names the plugin, its tools and its scenarios."""
+    context = ContextPrimer().prime(tmp_path, PROFILE)
+
+    assert "Name: Test-Plugin (version 1.0.0)" in context
+    assert "- greet(name: string): Greets someone." in context
+    assert "- failure: Empty name (greet with {'name': ''})" in context
+
+def test_only_small_text_files_are_inlined(tmp_path: Path):
+    """Tests that small text files are shown in full while large and binary files are not."""
+    context = ContextPrimer(inline_max_bytes=1_000).prime(make_plugin(tmp_path), PROFILE)
+
+    assert "#### src/main.py\n```\nprint('hi')\n```" in context
+    assert "#### big.log" not in context and "#### image.bin" not in context
+
+def test_manifest_is_capped(tmp_path: Path):
+    """Tests that only `max_files` files are listed and the rest are summarized."""
+    for index in range(5):
+        (tmp_path / f"file{index}.txt").write_text(str(index))
+
+    context = ContextPrimer(max_files=2).prime(tmp_path, PROFILE)
+
+    assert "file1.txt" in context and "file2.txt" not in context
+    assert "... and 3 more file(s)" in context
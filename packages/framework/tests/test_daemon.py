@@ -0,0 +1,88 @@
+# packages/framework/tests/test_daemon.py
+
+import pytest
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+from packages.framework.daemon import OrchestratorDaemon, RunRequest, submit_run
+
+@pytest.fixture
+def orchestrator() -> MagicMock:
+    orchestrator = MagicMock()
+    orchestrator.stream.side_effect = lambda **kwargs: iter([
+        {"type": "text", "text": f"Working on {kwargs['plugin_path'].name}"},
+        {"type": "final", "text": "Done."},
+    ])
+    return orchestrator
+
+def test_daemon_streams_run_events(tmp_path: Path, orchestrator: MagicMock):
+    """Tests that a submitted run is acknowledged and its events are streamed back."""
+    request = RunRequest(playbook_path="playbook.md", plugin_path=str(tmp_path / "plugin"), kwargs={"bug_description": "x"})
+
+    with OrchestratorDaemon(tmp_path / "d.sock", api_key="daemon_key", orchestrator=orchestrator) as daemon:
+        events = list(submit_run(daemon.socket_path, request))
+
+    assert events[0]["type"] == "accepted"
+    assert events[1:] == [{"type": "text", "text": "Working on plugin"}, {"type": "final", "text": "Done."}]
+    kwargs = orchestrator.stream.call_args.kwargs
+    assert kwargs["api_key"] == "daemon_key"
+    assert kwargs["run_id"] == events[0]["run_id"]
+    assert kwargs["bug_description"] == "x"
+    assert not (tmp_path / "d.sock").exists()
+
+def test_daemon_passes_the_requested_priority(tmp_path: Path, orchestrator: MagicMock):
+    """Tests that a request's priority class reaches the orchestrator, and that the default is left to it."""
+    requests = [
+        RunRequest(playbook_path="playbook.md", plugin_path=str(tmp_path), priority="batch"),
+        RunRequest(playbook_path="playbook.md", plugin_path=str(tmp_path)),
+    ]
+
+    with OrchestratorDaemon(tmp_path / "d.sock", api_key="key", orchestrator=orchestrator) as daemon:
+        for request in requests:
+            list(submit_run(daemon.socket_path, request))
+
+    assert [call.kwargs["priority"] for call in orchestrator.stream.call_args_list] == ["batch", None]
+
+def test_daemon_reports_failed_runs(tmp_path: Path, orchestrator: MagicMock):
+    """Tests that an exception in a run is returned to the client as an error event."""
+    orchestrator.stream.side_effect = FileNotFoundError("Playbook not found")
+    request = RunRequest(playbook_path="missing.md", plugin_path=str(tmp_path))
+
+    with OrchestratorDaemon(tmp_path / "d.sock", api_key="key", orchestrator=orchestrator) as daemon:
+        events = list(submit_run(daemon.socket_path, request))
+
+    assert events[-1] == {"type": "error", "error": "Playbook not found"}
+
+def test_daemon_bounds_concurrent_runs(tmp_path: Path, orchestrator: MagicMock):
+    """Tests that runs beyond the worker pool size wait for a free worker."""
+    release = threading.Event()
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def stream(**kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(timeout=5)
+        with lock:
+            active[0] -= 1
+        yield {"type": "final", "text": "Done."}
+
+    orchestrator.stream.side_effect = stream
+    request = RunRequest(playbook_path="playbook.md", plugin_path=str(tmp_path))
+
+    with OrchestratorDaemon(tmp_path / "d.sock", api_key="key", max_workers=2, orchestrator=orchestrator) as daemon:
+        results = []
+        clients = [threading.Thread(target=lambda: results.append(list(submit_run(daemon.socket_path, request)))) for _ in range(4)]
+        for client in clients:
+            client.start()
+        threading.Timer(0.3, release.set).start()
+        for client in clients:
+            client.join(timeout=10)
+
+    assert peak[0] == 2
+    assert len(results) == 4 and all(events[-1]["type"] == "final" for events in results)
+
+def test_submit_without_daemon_raises_connection_error(tmp_path: Path):
+    """Tests that submitting to a socket nobody listens on fails clearly."""
+    with pytest.raises(ConnectionError):
+        list(submit_run(tmp_path / "missing.sock", RunRequest(playbook_path="p.md", plugin_path=".")))
@@ -0,0 +1,220 @@
+# packages/framework/tests/test_gemini_agent.py
+
+import time
+import asyncio
+import threading
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from google.genai import types
+from packages.plugin_manager_agent import GeminiAgent
+from packages.plugin_manager_agent.workspace import resolve_path
+from packages.plugin_manager_agent import tools
+
+def model_turn(*parts: types.Part) -> types.GenerateContentResponse:
+    """Builds a model response with the given parts."""
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(content=types.Content(role="model", parts=list(parts)))]
+    )
+
+def call(name: str, **args) -> types.Part:
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+def make_agent(tmp_path: Path, tools: list, *responses: types.GenerateContentResponse) -> GeminiAgent:
+    agent = GeminiAgent(api_key="test_key", working_directory=str(tmp_path), tools=tools)
+    agent.client = MagicMock()
+    agent.client.models.generate_content.side_effect = list(responses)
+    return agent
+
+def test_same_turn_tool_calls_run_concurrently(tmp_path: Path):
+    """Tests that independent calls from one turn overlap instead of running back to back."""
+    barrier = threading.Barrier(3, timeout=5)
+
+    def read_file(path: str) -> str:
+        barrier.wait()  # Only returns once all three calls are in flight at the same time.
+        return path
+
+    agent = make_agent(
+        tmp_path, [read_file],
+        model_turn(call("read_file", path="a"), call("read_file", path="b"), call("read_file", path="c")),
+        model_turn(types.Part.from_text(text="Done.")),
+    )
+
+    assert agent.execute("Read everything.") == "Done."
+    responses = [part.function_response for part in agent.history[2].parts]
+    assert [(r.name, r.response) for r in responses] == [("read_file", {"result": p}) for p in "abc"]
+
+def test_tool_threads_see_the_agent_workspace(tmp_path: Path):
+    """Tests that the workspace binding is propagated into tool worker threads."""
+    def read_file(path: str) -> str:
+        return str(resolve_path(path))
+
+    agent = make_agent(
+        tmp_path, [read_file],
+        model_turn(call("read_file", path="a"), call("read_file", path="b")),
+        model_turn(types.Part.from_text(text="Done.")),
+    )
+    agent.execute("Read.")
+
+    results = [part.function_response.response["result"] for part in agent.history[2].parts]
+    assert results == [str(tmp_path.resolve() / "a"), str(tmp_path.resolve() / "b")]
+
+def test_calls_that_write_the_same_path_run_in_order(tmp_path: Path):
+    """Tests that a write and a read of the same file are not run concurrently."""
+    log = []
+
+    def write_file(path: str, content: str) -> str:
+        time.sleep(0.05)
+        log.append(("write", path))
+        return "ok"
+
+    def read_file(path: str) -> str:
+        log.append(("read", path))
+        return "ok"
+
+    agent = make_agent(tmp_path, [write_file, read_file])
+    batches = agent._independent_batches(list(enumerate([
+        types.FunctionCall(name="read_file", args={"path": "other.txt"}),
+        types.FunctionCall(name="write_file", args={"path": "notes.txt", "content": "x"}),
+        types.FunctionCall(name="read_file", args={"path": str(tmp_path / "notes.txt")}),
+    ])))
+    assert [[index for index, _ in batch] for batch in batches] == [[0, 1], [2]]
+
+    agent = make_agent(
+        tmp_path, [write_file, read_file],
+        model_turn(call("write_file", path="notes.txt", content="x"), call("read_file", path="notes.txt")),
+        model_turn(types.Part.from_text(text="Done.")),
+    )
+    agent.execute("Write then read.")
+    assert log == [("write", "notes.txt"), ("read", "notes.txt")]
+
+def test_shell_commands_run_alone_and_in_order(tmp_path: Path):
+    """Tests that a shell command waits for earlier writes and runs before later calls start."""
+    log = []
+
+    def write_file(path: str, content: str) -> str:
+        time.sleep(0.05)
+        log.append("write")
+        return "ok"
+
+    def execute_shell_command(command: str) -> str:
+        log.append("shell")
+        return "ok"
+
+    def read_file(path: str) -> str:
+        log.append("read")
+        return "ok"
+
+    agent = make_agent(
+        tmp_path, [write_file, execute_shell_command, read_file],
+        model_turn(
+            call("write_file", path="t.py", content="x"),
+            call("execute_shell_command", command="pytest t.py"),
+            call("read_file", path="src/a.py"),
+        ),
+        model_turn(types.Part.from_text(text="Done.")),
+    )
+    batches = agent._independent_batches(list(enumerate(agent._function_calls(
+        types.Content(role="model", parts=[
+            call("write_file", path="t.py", content="x"),
+            call("execute_shell_command", command="pytest t.py"),
+            call("edit_file", file_path=str(tmp_path / "src" / "a.py")),
+            call("read_file", path="src/a.py"),
+        ])
+    ))))
+    assert [[index for index, _ in batch] for batch in batches] == [[0], [1], [2], [3]]
+
+    agent.execute("Write, test, read.")
+    assert log == ["write", "shell", "read"]
+
+def test_rereading_an_unchanged_file_returns_a_marker(tmp_path: Path):
+    """Tests that a second read of unchanged content points back to the turn that returned it."""
+    (tmp_path / "main.py").write_text("print('hello world')\n" * 20)
+    agent = make_agent(
+        tmp_path, [tools.read_file],
+        model_turn(call("read_file", path="main.py")),
+        model_turn(call("read_file", path="main.py")),
+        model_turn(types.Part.from_text(text="Done.")),
+    )
+    agent.execute("Read it twice.")
+
+    first, second = (agent.history[index].parts[0].function_response.response["result"] for index in (2, 4))
+    assert first == "print('hello world')\n" * 20
+    assert second.startswith("[main.py: unchanged since turn 1 ")
+
+def test_turn_timings_are_recorded(tmp_path: Path):
+    """Tests that each model turn records its latency and the duration of its tool calls."""
+    def list_files(path: str) -> str:
+        return ""
+
+    agent = make_agent(
+        tmp_path, [list_files],
+        model_turn(call("list_files", path=".")),
+        model_turn(types.Part.from_text(text="Done.")),
+    )
+    agent.execute("List.")
+
+    first, last = agent.turn_timings
+    assert first["turn"] == 1 and first["function_calls"] == 1
+    assert first["tool_seconds"] >= 0 and [t["name"] for t in first["tools"]] == ["list_files"]
+    assert last["turn"] == 3 and last["function_calls"] == 0 and "tool_seconds" not in last
+
+def test_turn_usage_is_reported_and_rolled_up(tmp_path: Path):
+    """Tests that each turn's token counts reach `on_turn_completed` and add up in the run's usage."""
+    def list_files(path: str) -> str:
+        return ""
+
+    def with_usage(response: types.GenerateContentResponse, **counts) -> types.GenerateContentResponse:
+        return response.model_copy(update={"usage_metadata": types.GenerateContentResponseUsageMetadata(**counts)})
+
+    agent = make_agent(
+        tmp_path, [list_files],
+        with_usage(model_turn(call("list_files", path=".")),
+                   prompt_token_count=1_000, cached_content_token_count=800, candidates_token_count=20, thoughts_token_count=50),
+        with_usage(model_turn(types.Part.from_text(text="Done.")), prompt_token_count=1_100, candidates_token_count=5),
+    )
+    reported = []
+    agent.on_turn_completed = reported.append
+    agent.execute("List.")
+
+    assert [record["turn"] for record in reported] == [1, 3]
+    assert {key: reported[0][key] for key in ("prompt_tokens", "cached_tokens", "candidates_tokens", "thinking_tokens")} == {
+        "prompt_tokens": 1_000, "cached_tokens": 800, "candidates_tokens": 20, "thinking_tokens": 50,
+    }
+    assert reported[0]["model_seconds"] >= 0 and reported[0]["model"] == agent.model_name
+    usage = agent.result.usage
+    assert (usage["input_tokens"], usage["cached_tokens"], usage["output_tokens"], usage["thinking_tokens"]) == (2_100, 800, 75, 50)
+    assert usage["model_seconds"] >= 0 and usage["tool_seconds"] >= 0
+
+def test_streamed_text_chunks_are_merged_into_one_turn(tmp_path: Path):
+    """Tests that streamed text is yielded chunk by chunk but stored as a single part."""
+    agent = make_agent(tmp_path, [])
+    agent.client.models.generate_content_stream.return_value = iter([
+        model_turn(types.Part.from_text(text="Hello, ")),
+        model_turn(types.Part.from_text(text="world.")),
+    ])
+
+    events = list(agent.stream("Greet."))
+
+    assert events[:-1] == [
+        {"type": "text", "text": "Hello, "},
+        {"type": "text", "text": "world."},
+    ]
+    assert (events[-1]["type"], events[-1]["text"]) == ("final", "Hello, world.")
+    assert events[-1]["result"]["status"] == "completed"
+    assert [part.text for part in agent.history[-1].parts] == ["Hello, world."]
+
+def test_turn_cap_returns_the_last_model_text_from_every_entry_point(tmp_path: Path):
+    """Tests that execute, aexecute and stream end a capped run the same way, including with max_turns=0."""
+    def list_files(path: str) -> str:
+        return path
+
+    for max_turns, expected in ((0, None), (1, "Looking.")):
+        turn = model_turn(types.Part.from_text(text="Looking."), call("list_files", path="."))
+        agent = make_agent(tmp_path, [list_files], turn)
+        agent.client.models.generate_content_stream.side_effect = lambda **kwargs: iter([turn])
+        agent.client.aio.models.generate_content = AsyncMock(return_value=turn)
+        agent.max_turns = max_turns
+
+        assert agent.execute("Go.") == expected
+        assert asyncio.run(agent.aexecute("Go.")) == expected
+        assert list(agent.stream("Go."))[-1]["text"] == expected
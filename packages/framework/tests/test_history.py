@@ -0,0 +1,61 @@
+# packages/framework/tests/test_history.py
+
+import hashlib
+from google.genai import types
+from packages.plugin_manager_agent import HistoryManager
+
+def text_turn(role: str, text: str) -> types.Content:
+    return types.Content(role=role, parts=[types.Part.from_text(text=text)])
+
+def tool_turn(output: str) -> types.Content:
+    return types.Content(role="user", parts=[types.Part.from_function_response(name="read_file", response={"result": output})])
+
+def call_turn() -> types.Content:
+    return types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(name="read_file", args={"path": "big.txt"}))])
+
+def make_history(outputs: list) -> list:
+    history = [text_turn("user", "Fix the bug.")]
+    for output in outputs:
+        history += [call_turn(), tool_turn(output)]
+    return history
+
+def test_history_under_budget_is_sent_unchanged():
+    """Tests that nothing is compacted while the history fits the budget."""
+    history = make_history(["x" * 10_000])
+    assert HistoryManager(max_tokens=10_000).compact(history) is history
+
+def test_old_tool_results_are_replaced_by_excerpts():
+    """Tests that old bulky results are compacted while recent turns stay verbatim."""
+    old, recent = "a" * 50_000, "b" * 50_000
+    history = make_history([old, "small", recent])
+    manager = HistoryManager(max_tokens=15_000, keep_recent_turns=2, max_result_chars=100)
+
+    sent = manager.compact(history)
+
+    assert len(sent) == len(history)
+    assert sent[0] is history[0] and sent[-1] is history[-1]
+    response = sent[2].parts[0].function_response.response
+    assert response["compacted"] == {"sha256": hashlib.sha256(old.encode()).hexdigest(), "chars": 50_000}
+    assert response["result"].startswith("a" * 50) and "characters omitted" in response["result"]
+    assert sent[4] is history[4]  # Small results are left alone.
+    assert history[2].parts[0].function_response.response["result"] == old  # The agent's history is untouched.
+    assert sum(HistoryManager.estimate_tokens(content) for content in sent) <= 15_000
+
+def test_only_as_many_results_as_needed_are_compacted():
+    """Tests that compaction stops, oldest first, once the history fits the budget."""
+    history = make_history(["a" * 40_000, "b" * 40_000, "c" * 40_000, "d"])
+    sent = HistoryManager(max_tokens=15_000, keep_recent_turns=2, max_result_chars=100).compact(history)
+
+    assert "compacted" in sent[2].parts[0].function_response.response
+    assert "compacted" in sent[4].parts[0].function_response.response
+    assert sent[6] is history[6]
+
+def test_compacted_results_record_where_each_output_was_compacted():
+    """Tests that compacted outputs are recorded with their history index, for the read ledger."""
+    old = "a" * 50_000
+    history = make_history([old, "b" * 10, "c" * 10])
+    manager = HistoryManager(max_tokens=5_000, keep_recent_turns=2, max_result_chars=100)
+
+    manager.compact(history)
+
+    assert manager.compacted_results == {(2, hashlib.sha256(old.encode()).hexdigest())}
@@ -0,0 +1,171 @@
+# packages/framework/tests/test_job_queue.py
+
+import pytest
+import threading
+from pathlib import Path
+from unittest.mock import ANY, MagicMock
+from packages.framework.checkpoints import RunCheckpoint
+from packages.framework.job_queue import JobQueue, JobWorker
+from packages.plugin_manager_agent import RunResult
+
+@pytest.fixture
+def queue(tmp_path: Path) -> JobQueue:
+    return JobQueue(tmp_path / "jobs.sqlite3")
+
+def test_enqueue_and_claim_in_order(queue: JobQueue):
+    """Tests that jobs are claimed oldest first and assigned a run ID."""
+    first = queue.enqueue("playbook.md", "plugin-a", bug_description="x")
+    queue.enqueue("playbook.md", "plugin-b")
+
+    claimed = queue.claim("worker-1")
+
+    assert claimed.id == first.id
+    assert claimed.state == "running" and claimed.attempts == 1 and claimed.worker == "worker-1"
+    assert claimed.run_id is not None and claimed.kwargs == {"bug_description": "x"}
+    assert queue.counts() == {"pending": 1, "running": 1, "completed": 0, "failed": 0}
+
+def test_database_uses_wal_mode(queue: JobQueue):
+    """Tests that the queue database is switched to write-ahead logging."""
+    with queue._connect() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_failed_jobs_are_retried_until_max_attempts(queue: JobQueue):
+    """Tests that a failure requeues the job with the same run ID until its attempts are used up."""
+    job = queue.enqueue("playbook.md", "plugin", max_attempts=2)
+
+    first = queue.claim("w")
+    assert queue.fail(job.id, "boom", "w").state == "pending"
+    second = queue.claim("w")
+    assert second.run_id == first.run_id and second.attempts == 2
+    assert queue.fail(job.id, "boom again", "w").state == "failed"
+    assert queue.claim("w") is None
+
+def test_expired_leases_are_reclaimed(tmp_path: Path):
+    """Tests that a job held by a crashed worker becomes claimable once its lease expires."""
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=0)
+    queue.enqueue("playbook.md", "plugin")
+    crashed = queue.claim("crashed-worker")
+
+    reclaimed = queue.claim("new-worker")
+
+    assert reclaimed.id == crashed.id and reclaimed.worker == "new-worker" and reclaimed.attempts == 2
+    assert not queue.renew(crashed.id, "crashed-worker")
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(tmp_path: Path):
+    """Tests that a job whose last attempt's lease expires is failed instead of claimed again."""
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=0)
+    job = queue.enqueue("playbook.md", "plugin", max_attempts=2)
+    queue.claim("first")
+    queue.claim("second")
+
+    assert queue.claim("third") is None
+    failed = queue.get(job.id)
+    assert failed.state == "failed" and failed.attempts == 2 and "Lease expired" in failed.error
+
+def test_a_worker_that_lost_its_lease_cannot_record_an_outcome(tmp_path: Path):
+    """Tests that complete and fail are refused for a worker whose job was taken over."""
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=0)
+    job = queue.enqueue("playbook.md", "plugin")
+    queue.claim("stale")
+    queue.claim("current")
+
+    assert not queue.complete(job.id, "Stale result.", "stale")
+    assert queue.fail(job.id, "stale failure", "stale") is None
+    assert queue.get(job.id).state == "running" and queue.get(job.id).worker == "current"
+    assert queue.complete(job.id, "Done.", "current")
+    assert queue.get(job.id).final_response == "Done."
+
+def test_concurrent_claims_never_share_a_job(queue: JobQueue):
+    """Tests that workers racing for jobs each receive distinct ones."""
+    for index in range(20):
+        queue.enqueue("playbook.md", f"plugin-{index}")
+    claimed, lock = [], threading.Lock()
+
+    def drain(name):
+        while (job := queue.claim(name)) is not None:
+            with lock:
+                claimed.append(job.id)
+
+    threads = [threading.Thread(target=drain, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == list(range(1, 21))
+
+def test_worker_runs_jobs_and_records_outcomes(queue: JobQueue, tmp_path: Path):
+    """Tests that the worker drains the queue into the orchestrator and records results."""
+    ok = queue.enqueue("playbook.md", str(tmp_path / "ok"), bug_description="x")
+    bad = queue.enqueue("playbook.md", str(tmp_path / "bad"), max_attempts=1)
+
+    def run(**kwargs):
+        if kwargs["plugin_path"].name == "bad":
+            raise RuntimeError("boom")
+        return RunResult(status="completed", final_response="Done.")
+
+    orchestrator = MagicMock()
+    orchestrator.run_with_result.side_effect = run
+
+    JobWorker(queue, orchestrator, api_key="key", name="w").run(stop_when_empty=True)
+
+    assert queue.get(ok.id).state == "completed" and queue.get(ok.id).final_response == "Done."
+    assert queue.get(bad.id).state == "failed" and queue.get(bad.id).error == "boom"
+    run_kwargs = orchestrator.run_with_result.call_args_list[0].kwargs
+    assert run_kwargs["run_id"] == queue.get(ok.id).run_id and run_kwargs["bug_description"] == "x"
+
+def test_worker_resumes_checkpointed_runs(queue: JobQueue, tmp_path: Path):
+    """Tests that a retried job with an existing checkpoint is resumed, not restarted."""
+    job = queue.enqueue("playbook.md", str(tmp_path))
+    run_id = queue.claim("crashed").run_id
+    queue.fail(job.id, "worker crashed", "crashed")
+    RunCheckpoint(tmp_path, run_id).fail("worker crashed")
+    orchestrator = MagicMock()
+    orchestrator.resume_with_result.return_value = RunResult(status="completed", final_response="Resumed.")
+
+    JobWorker(queue, orchestrator, api_key="key", name="w").run(stop_when_empty=True)
+
+    orchestrator.run_with_result.assert_not_called()
+    orchestrator.resume_with_result.assert_called_once_with(plugin_path=tmp_path, run_id=run_id, api_key="key", cancel_event=ANY)
+    assert queue.get(job.id).state == "completed"
+
+def test_runs_stopped_early_are_retried_and_resumed(queue: JobQueue, tmp_path: Path):
+    """Tests that a run stopped by its budget fails the attempt, and the retry resumes its checkpoint."""
+    job = queue.enqueue("playbook.md", str(tmp_path), max_attempts=2)
+
+    def run(**kwargs):
+        RunCheckpoint(tmp_path, kwargs["run_id"]).fail("stopped")  # The run leaves a checkpoint behind.
+        return RunResult(status="budget_exceeded", final_response="Partial.", reason="turn limit of 3 reached")
+
+    orchestrator = MagicMock()
+    orchestrator.run_with_result.side_effect = run
+    orchestrator.resume_with_result.return_value = RunResult(status="completed", final_response="Done.")
+    worker = JobWorker(queue, orchestrator, api_key="key", name="w")
+
+    worker.process(queue.claim("w"))
+    retried = queue.get(job.id)
+    assert retried.state == "pending" and retried.error == "Run budget_exceeded: turn limit of 3 reached"
+
+    worker.process(queue.claim("w"))
+    orchestrator.resume_with_result.assert_called_once_with(plugin_path=tmp_path, run_id=retried.run_id, api_key="key", cancel_event=ANY)
+    assert queue.get(job.id).state == "completed" and queue.get(job.id).final_response == "Done."
+
+def test_worker_cancels_a_run_whose_lease_is_lost(tmp_path: Path):
+    """Tests that losing the lease cancels the run and discards its result."""
+    queue = JobQueue(tmp_path / "jobs.sqlite3", lease_seconds=0.03)
+    job = queue.enqueue("playbook.md", str(tmp_path))
+
+    def run(**kwargs):
+        # Another worker takes the job over, as if this one had stalled past its lease.
+        with queue._connect() as conn:
+            conn.execute("UPDATE jobs SET worker = 'other' WHERE id = ?", (job.id,))
+        assert kwargs["cancel_event"].wait(timeout=5)
+        return RunResult(status="cancelled", final_response="Too late.", reason="cancelled by the caller")
+
+    orchestrator = MagicMock()
+    orchestrator.run_with_result.side_effect = run
+    worker = JobWorker(queue, orchestrator, api_key="key", name="w")
+    worker.process(queue.claim("w"))
+
+    assert queue.get(job.id).state == "running" and queue.get(job.id).worker == "other"
+    assert queue.get(job.id).final_response is None
@@ -0,0 +1,85 @@
+# packages/framework/tests/test_key_pool.py
+
+import pytest
+from unittest.mock import MagicMock
+from google.genai import errors
+from packages.framework.utils import KeyPool, get_gemini_api_key, resolve_api_keys
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clear_key_cache():
+    resolve_api_keys.cache_clear()
+    yield
+    resolve_api_keys.cache_clear()
+
+def quota_error() -> errors.ClientError:
+    return errors.ClientError(429, {"error": {"code": 429, "message": "exhausted", "status": "RESOURCE_EXHAUSTED"}})
+
+def test_round_robin_cycles_through_keys():
+    """Tests that keys are handed out in turn."""
+    pool = KeyPool(["a", "b", "c"])
+    assert [pool.acquire() for _ in range(4)] == ["a", "b", "c", "a"]
+
+def test_throttled_keys_leave_rotation_until_cooled_down():
+    """Tests that a key reporting quota errors is skipped until its cooldown ends."""
+    clock = FakeClock()
+    pool = KeyPool(["a", "b"], cooldown=60, clock=clock)
+    pool.report_throttled("a")
+
+    assert [pool.acquire() for _ in range(3)] == ["b", "b", "b"]
+    clock.now = 61
+    assert {pool.acquire() for _ in range(2)} == {"a", "b"}
+
+def test_all_keys_cooling_down_returns_first_to_recover():
+    """Tests that runs are not blocked when every key is throttled."""
+    clock = FakeClock()
+    pool = KeyPool(["a", "b"], cooldown=60, clock=clock)
+    pool.report_throttled("b")
+    clock.now = 10
+    pool.report_throttled("a")
+
+    assert pool.acquire() == "b"
+
+def test_least_recently_throttled_prefers_unthrottled_keys():
+    """Tests that keys that have never been throttled, then the longest recovered, come first."""
+    clock = FakeClock()
+    pool = KeyPool(["a", "b", "c"], strategy="least_recently_throttled", cooldown=1, clock=clock)
+    pool.report_throttled("a")
+    clock.now = 5
+    pool.report_throttled("b")
+    clock.now = 10
+
+    assert pool.acquire() == "c"
+    pool.report_throttled("c")
+    clock.now = 20
+    assert pool.acquire() == "a"
+
+def test_reporter_reports_quota_errors_for_its_key():
+    """Tests that the model call wrapper takes its key out of rotation on a 429."""
+    pool = KeyPool(["a", "b"])
+    call = pool.reporter("a").wrap(MagicMock(side_effect=quota_error()))
+
+    with pytest.raises(errors.ClientError):
+        call(model="m", contents=[], config=None)
+
+    assert [pool.acquire() for _ in range(2)] == ["b", "b"]
+
+def test_keys_are_resolved_once_and_split(monkeypatch, clear_key_cache):
+    """Tests that a comma-separated key pool is read from the environment and cached."""
+    monkeypatch.setattr("packages.framework.utils.api_key._read_env_file", MagicMock(return_value={}))
+    monkeypatch.setenv("GEMINI_API_KEYS", "key-1, key-2")
+
+    assert resolve_api_keys() == ("key-1", "key-2")
+    assert get_gemini_api_key() == "key-1"
+    monkeypatch.setenv("GEMINI_API_KEYS", "key-3")
+    assert resolve_api_keys() == ("key-1", "key-2")
+
+def test_command_line_keys_take_priority(clear_key_cache):
+    """Tests that keys given on the command line win over every other source."""
+    assert resolve_api_keys("cli-1,cli-2") == ("cli-1", "cli-2")
@@ -1,5 +1,6 @@
 # packages/framework/tests/test_loaders.py
 
+import os
 import pytest
 import yaml
 from pathlib import Path
@@ -79,3 +80,39 @@ def test_playbook_loader_malformed_content(tmp_path: Path):
     loader = PlaybookLoader()
     with pytest.raises(ValueError):
         loader.load(tmp_path / "playbook.md")
+
+def test_playbook_loader_parses_front_matter(temp_playbook_file: Path):
+    """Tests that YAML front matter becomes the playbook's settings and is not part of its content."""
+    temp_playbook_file.write_text(
+        "---\ntools: [list_files]\nmodel: gemini-2.5-flash\nthinking_budget: 0\nmax_turns: 5\n---\n"
+        + temp_playbook_file.read_text()
+    )
+    playbook = PlaybookLoader().load(temp_playbook_file)
+    assert playbook.prompt_template == "Test template."
+    assert playbook.settings.tools == ["list_files"]
+    assert (playbook.settings.model, playbook.settings.max_turns) == ("gemini-2.5-flash", 5)
+    assert playbook.settings.generation_config().thinking_config.thinking_budget == 0
+
+def test_playbook_without_front_matter_keeps_defaults(temp_playbook_file: Path):
+    """Tests that a playbook without front matter declares no settings."""
+    settings = PlaybookLoader().load(temp_playbook_file).settings
+    assert settings.tools is None and settings.model is None
+    assert settings.generation_config() is None
+
+def test_playbook_loader_rejects_unknown_front_matter_keys(temp_playbook_file: Path):
+    """Tests that a misspelled setting raises ValueError instead of being ignored."""
+    temp_playbook_file.write_text("---\nmax_turn: 5\n---\n" + temp_playbook_file.read_text())
+    with pytest.raises(ValueError, match="front matter"):
+        PlaybookLoader().load(temp_playbook_file)
+
+def test_caching_playbook_loader_reparses_modified_files(temp_playbook_file: Path):
+    """Tests that a caching loader reuses a parsed playbook until the file changes."""
+    loader = PlaybookLoader(cache=True)
+    first = loader.load(temp_playbook_file)
+    assert loader.load(temp_playbook_file) is first
+
+    temp_playbook_file.write_text(temp_playbook_file.read_text().replace("Test template.", "New template."))
+    stat = temp_playbook_file.stat()
+    os.utime(temp_playbook_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert loader.load(temp_playbook_file).prompt_template == "New template."
@@ -0,0 +1,81 @@
+# packages/framework/tests/test_mock_gemini_server.py
+
+import random
+import pytest
+from pathlib import Path
+from google.genai import errors
+from packages.framework.mock_gemini_server import MockGeminiServer, MockScript, LatencyProfile
+from packages.plugin_manager_agent import GeminiAgent
+from packages.plugin_manager_agent.tools import TOOL_LIST
+
+@pytest.fixture
+def plugin_path(tmp_path: Path) -> Path:
+    (tmp_path / "plugin-profile.yaml").write_text("name: Test-Plugin\n")
+    return tmp_path
+
+def test_scripted_function_calls_drive_real_tools(plugin_path: Path):
+    """Tests that the agent talks to the stand-in over HTTP and executes the scripted tool calls."""
+    script = MockScript(turns=[
+        {"function_calls": [{"name": "list_files", "args": {"path": "."}}, {"name": "read_file", "args": {"path": "plugin-profile.yaml"}}]},
+        {"function_calls": [{"name": "write_file", "args": {"path": "out.txt", "content": "written"}}]},
+        {"text": "All done."},
+    ])
+
+    with MockGeminiServer(script) as server:
+        agent = GeminiAgent(api_key="test_key", working_directory=str(plugin_path), tools=TOOL_LIST, base_url=server.base_url)
+        final_response = agent.execute("Do the thing")
+
+    assert final_response == "All done."
+    assert (plugin_path / "out.txt").read_text() == "written"
+    assert server.stats == {"requests": 3, "rate_limited": 0, "completed": 3}
+    tool_results = [part.function_response.response["result"] for part in agent.history[2].parts]
+    assert tool_results == ["plugin-profile.yaml", "name: Test-Plugin\n"]
+
+def test_streamed_run_yields_text_and_tool_events(plugin_path: Path):
+    """Tests that a streamed run reports tool calls and text as they happen over SSE."""
+    script = MockScript(turns=[
+        {"function_calls": [{"name": "read_file", "args": {"path": "plugin-profile.yaml"}}]},
+        {"text": "All done."},
+    ])
+
+    with MockGeminiServer(script) as server:
+        agent = GeminiAgent(api_key="test_key", working_directory=str(plugin_path), tools=TOOL_LIST, base_url=server.base_url)
+        events = list(agent.stream("Do the thing"))
+
+    assert [event["type"] for event in events] == ["tool_started", "tool_finished", "text", "final"]
+    assert events[1]["response"] == {"result": "name: Test-Plugin\n"}
+    assert events[-1]["text"] == "All done."
+    assert [content.role for content in agent.history] == ["user", "model", "user", "model"]
+
+def test_rate_limit_injection_returns_429(plugin_path: Path):
+    """Tests that injected rate limits surface as RESOURCE_EXHAUSTED client errors."""
+    script = MockScript(rate_limit={"every_nth": 1})
+
+    with MockGeminiServer(script) as server:
+        agent = GeminiAgent(api_key="test_key", working_directory=str(plugin_path), tools=TOOL_LIST, base_url=server.base_url)
+        with pytest.raises(errors.ClientError) as excinfo:
+            agent.execute("Hello")
+
+    assert excinfo.value.code == 429
+    assert server.stats["rate_limited"] == 1
+
+def test_sessions_beyond_the_script_receive_the_final_turn():
+    """Tests that the last scripted turn is repeated for longer conversations."""
+    server = MockGeminiServer(MockScript(turns=[{"text": "first"}, {"text": "last"}]))
+    try:
+        assert server.turn(0).text == "first"
+        assert server.turn(5).text == "last"
+    finally:
+        server.stop()
+
+def test_latency_profiles_respect_bounds():
+    """Tests that sampled latencies stay within the configured range and are never negative."""
+    rng = random.Random(0)
+    uniform = LatencyProfile(distribution="uniform", min=0.1, max=0.2)
+    normal = LatencyProfile(distribution="normal", mean=0.0, stddev=1.0, max=0.5)
+
+    assert LatencyProfile(mean=0.25).sample(rng) == 0.25
+    assert all(0.1 <= uniform.sample(rng) <= 0.2 for _ in range(100))
+    assert all(0.0 <= normal.sample(rng) <= 0.5 for _ in range(100))
+    with pytest.raises(ValueError):
+        LatencyProfile(distribution="pareto").sample(rng)
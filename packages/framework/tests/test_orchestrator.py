@@ -1,12 +1,19 @@
 # packages/framework/tests/test_orchestrator.py
 
+import asyncio
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 from packages.framework.orchestrator import Orchestrator
-from packages.framework.loaders import ProfileLoader, PlaybookLoader, Playbook
+from packages.framework.events import event_emitter
+from packages.framework.loaders import ProfileLoader, PlaybookLoader, Playbook, PlaybookSettings
 from packages.framework.prompt_constructor import PromptConstructor
+from packages.framework.resilience import CircuitBreaker, CircuitOpenError, Resilience
+from packages.framework.scheduler import ModelCallScheduler, SchedulerSession
+from packages.framework.tool_registry import ToolRegistry
+from packages.framework.utils import KeyPool
 from packages.framework.schema import PluginProfile
+from packages.plugin_manager_agent import RunBudget, RunResult
 
 # Mock the agent class since it's now instantiated inside the orchestrator
 @pytest.fixture(autouse=True)
@@ -14,6 +21,8 @@ def mock_gemini_agent():
     with patch('packages.framework.orchestrator.GeminiAgent') as mock:
         mock_instance = mock.return_value
         mock_instance.execute.return_value = "Final summary"
+        # The orchestrator reads the outcome of a run from the agent's structured result.
+        mock_instance.result = RunResult(status="completed", final_response="Final summary")
         yield mock
 
 @pytest.fixture
@@ -28,6 +37,7 @@ def mock_playbook_loader():
     """Provides a mock PlaybookLoader."""
     loader = MagicMock(spec=PlaybookLoader)
     loader.load.return_value = MagicMock(spec=Playbook)
+    loader.load.return_value.settings = PlaybookSettings()
     return loader
 
 @pytest.fixture
@@ -83,4 +93,222 @@ def test_orchestrator_run_method_calls_dependencies_in_order(
     mock_gemini_agent.return_value.execute.assert_called_once_with("This is the constructed prompt.")
     
     # 4. Verify the final summary is returned
-    assert final_summary == "Final summary"
\ No newline at end of file
+    assert final_summary == "Final summary"
+
+
+def test_orchestrator_arun_awaits_agent_aexecute(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that the async run path builds the agent the same way and awaits aexecute."""
+    mock_gemini_agent.return_value.aexecute = AsyncMock(return_value="Async summary")
+    mock_gemini_agent.return_value.result = RunResult(status="completed", final_response="Async summary")
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+    )
+
+    final_summary = asyncio.run(orchestrator.arun(
+        playbook_path=Path("playbook.md"),
+        plugin_path=Path("plugin/"),
+        env="virtual",
+        api_key="test_key",
+    ))
+
+    mock_gemini_agent.assert_called_once()
+    mock_gemini_agent.return_value.aexecute.assert_awaited_once_with("This is the constructed prompt.")
+    mock_gemini_agent.return_value.execute.assert_not_called()
+    assert final_summary == "Async summary"
+
+def test_orchestrator_stream_yields_agent_events_and_finishes_checkpoint(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that the streaming path passes agent events through and records the final response."""
+    events = [{"type": "text", "text": "Sum"}, {"type": "final", "text": "Summary"}]
+    mock_gemini_agent.return_value.stream.return_value = iter(events)
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+    )
+
+    streamed = list(orchestrator.stream(
+        playbook_path=Path("playbook.md"),
+        plugin_path=Path("plugin/"),
+        env="virtual",
+        api_key="test_key",
+    ))
+
+    assert streamed == events
+    mock_gemini_agent.return_value.stream.assert_called_once_with("This is the constructed prompt.")
+
+def test_orchestrator_resume_restores_history_and_resumes_agent(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor, tmp_path
+):
+    """Tests that resume rebuilds the agent from the run's checkpoint."""
+    from google.genai import types
+    from packages.framework.checkpoints import RunCheckpoint
+
+    history = [types.Content(role="user", parts=[types.Part.from_text(text="Fix the bug")])]
+    RunCheckpoint(tmp_path, "run-1").save_history(history)
+    mock_gemini_agent.return_value.resume.return_value = "Resumed summary"
+    mock_gemini_agent.return_value.result = RunResult(status="completed", final_response="Resumed summary")
+
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+    )
+    final_summary = orchestrator.resume(plugin_path=tmp_path, run_id="run-1", api_key="test_key")
+
+    assert final_summary == "Resumed summary"
+    assert mock_gemini_agent.return_value.history == history
+    mock_gemini_agent.return_value.resume.assert_called_once()
+    mock_profile_loader.load.assert_not_called()
+
+def test_orchestrator_schedules_model_calls_per_run(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that each run gets a scheduler session, innermost, with the orchestrator's or the run's priority."""
+    cassette = MagicMock()
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+        model_call_wrappers=[cassette],
+        scheduler=ModelCallScheduler(),
+        priority="interactive",
+    )
+
+    orchestrator.run(playbook_path=Path("playbook.md"), plugin_path=Path("plugin/"), env="virtual", api_key="test_key", run_id="run-1")
+
+    wrappers = mock_gemini_agent.call_args.kwargs["model_call_wrappers"]
+    assert isinstance(wrappers[0], SchedulerSession) and wrappers[1] is cassette
+    assert (wrappers[0].job, wrappers[0].priority) == ("run-1", "interactive")
+
+    orchestrator.run(
+        playbook_path=Path("playbook.md"), plugin_path=Path("plugin/"), env="virtual", api_key="test_key",
+        run_id="run-2", priority="batch"
+    )
+
+    session = mock_gemini_agent.call_args.kwargs["model_call_wrappers"][0]
+    assert (session.job, session.priority) == ("run-2", "batch")
+
+def test_orchestrator_refuses_new_runs_while_circuit_is_open(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that no agent is created while the circuit breaker is open."""
+    resilience = Resilience(circuit_breaker=CircuitBreaker(failure_threshold=1))
+    resilience.circuit_breaker.record_failure(RuntimeError("backend down"))
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+        resilience=resilience,
+    )
+
+    with pytest.raises(CircuitOpenError):
+        orchestrator.run(playbook_path=Path("playbook.md"), plugin_path=Path("plugin/"), env="virtual", api_key="test_key")
+
+    mock_gemini_agent.assert_not_called()
+
+def test_orchestrator_draws_keys_from_its_key_pool(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that runs without an explicit key take one from the pool and report its quota errors."""
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+        key_pool=KeyPool(["key-a", "key-b"]),
+    )
+
+    for _ in range(2):
+        orchestrator.run(playbook_path=Path("playbook.md"), plugin_path=Path("plugin/"), env="virtual", api_key=None)
+
+    keys = [call.kwargs["api_key"] for call in mock_gemini_agent.call_args_list]
+    assert keys == ["key-a", "key-b"]
+    assert mock_gemini_agent.call_args.kwargs["model_call_wrappers"][0].key == "key-b"
+
+def test_orchestrator_shares_registered_tools_across_runs(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that every run gets the registry's prebuilt tools and declarations."""
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+        tool_registry=ToolRegistry(),
+    )
+
+    for _ in range(2):
+        orchestrator.run(playbook_path=Path("playbook.md"), plugin_path=Path("plugin/"), env="virtual", api_key="test_key")
+
+    first, second = (call.kwargs for call in mock_gemini_agent.call_args_list)
+    assert first["tools"] is second["tools"]
+    assert first["function_declarations"] is orchestrator.tool_registry.get().declarations
+
+def test_orchestrator_honors_playbook_settings_on_run_and_resume(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor, tmp_path
+):
+    """Tests that a playbook's declared tools, model and limits configure the agent, also when resumed."""
+    mock_playbook_loader.load.return_value.settings = PlaybookSettings(
+        tools=["list_files"], model="gemini-2.5-flash", thinking_budget=0, max_turns=3
+    )
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+    )
+
+    orchestrator.run(playbook_path=Path("playbook.md"), plugin_path=tmp_path, env="virtual", api_key="test_key", run_id="run-1")
+    mock_gemini_agent.call_args.kwargs["checkpoint"].fail("Interrupted")  # The agent is mocked, so persist the checkpoint here.
+    orchestrator.resume(plugin_path=tmp_path, run_id="run-1", api_key="test_key")
+
+    for call in mock_gemini_agent.call_args_list:
+        assert [tool.__name__ for tool in call.kwargs["tools"]] == ["list_files"]
+        assert (call.kwargs["model_name"], call.kwargs["max_turns"]) == ("gemini-2.5-flash", 3)
+        assert call.kwargs["generation_config"].thinking_config.thinking_budget == 0
+
+def test_orchestrator_records_budget_exceeded_runs(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor, tmp_path
+):
+    """Tests that every agent gets the orchestrator's budget and a stopped run is checkpointed as such."""
+    budget = RunBudget(max_seconds=60, max_tool_calls=10)
+    mock_gemini_agent.return_value.result = RunResult(
+        status="budget_exceeded", final_response="Partial", reason="tool call limit of 10 reached", usage={"tool_calls": 10}
+    )
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+        budget=budget,
+    )
+
+    result = orchestrator.run_with_result(playbook_path=Path("playbook.md"), plugin_path=tmp_path, env="virtual", api_key="test_key")
+
+    assert mock_gemini_agent.call_args.kwargs["budget"] is budget
+    assert (result.status, result.final_response) == ("budget_exceeded", "Partial")
+    mock_gemini_agent.return_value.checkpoint.finish.assert_called_once_with(
+        "Partial", status="budget_exceeded", reason="tool call limit of 10 reached", usage={"tool_calls": 10}
+    )
+
+def test_orchestrator_emits_model_turn_completed_events(
+    mock_gemini_agent, mock_profile_loader, mock_playbook_loader, mock_prompt_constructor
+):
+    """Tests that the agent's per-turn records are emitted as model_turn_completed events with the run ID."""
+    orchestrator = Orchestrator(
+        profile_loader=mock_profile_loader,
+        playbook_loader=mock_playbook_loader,
+        prompt_constructor=mock_prompt_constructor,
+    )
+    orchestrator.run(playbook_path=Path("playbook.md"), plugin_path=Path("plugin/"), env="virtual", api_key="test_key", run_id="run-1")
+
+    emitted = []
+    event_emitter.on("model_turn_completed", emitted.append)
+    try:
+        mock_gemini_agent.call_args.kwargs["on_turn_completed"]({"turn": 1, "prompt_tokens": 10})
+    finally:
+        event_emitter.remove_listener("model_turn_completed", emitted.append)
+
+    assert emitted == [{"run_id": "run-1", "turn": 1, "prompt_tokens": 10}]
@@ -4,6 +4,7 @@ import pytest
 from packages.framework.loaders import Playbook
 from packages.framework.schema import PluginProfile
 from packages.framework.prompt_constructor import PromptConstructor
+from packages.framework.context_primer import ContextPrimer
 
 @pytest.fixture
 def sample_playbook() -> Playbook:
@@ -67,3 +68,18 @@ def test_prompt_constructor_invalid_env_raises_error(sample_playbook, sample_pro
             profile=sample_profile,
             env="invalid_env"
         )
+
+def test_prompt_constructor_prepends_workspace_context(sample_playbook, sample_profile, tmp_path):
+    """Tests that a context primer's output comes before the playbook prompt."""
+    (tmp_path / "README.md").write_text("Hello")
+    constructor = PromptConstructor(context_primer=ContextPrimer())
+    prompt = constructor.construct(
+        playbook=sample_playbook,
+        profile=sample_profile,
+        env="real",
+        plugin_path=tmp_path,
+        bug_description="A bug"
+    )
+
+    assert prompt.startswith("## Workspace Context")
+    assert prompt.index("README.md 5 ") < prompt.index("Env: Real")
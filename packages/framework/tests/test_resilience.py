@@ -0,0 +1,172 @@
+# packages/framework/tests/test_resilience.py
+
+import random
+import asyncio
+import pytest
+import httpx
+from unittest.mock import MagicMock, AsyncMock
+from google.genai import errors, types
+from packages.framework.events import event_emitter
+from packages.framework.resilience import (
+    AIMDLimiter, CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy
+)
+
+def api_error(code: int) -> errors.APIError:
+    error_class = errors.ClientError if code < 500 else errors.ServerError
+    return error_class(code, {"error": {"code": code, "message": "failure", "status": "UNAVAILABLE"}})
+
+OK = types.GenerateContentResponse()
+
+@pytest.fixture
+def captured_events():
+    captured = []
+    listeners = {name: (lambda data, name=name: captured.append((name, data)))
+                 for name in ["circuit_opened", "circuit_half_opened", "circuit_closed", "model_call_retried"]}
+    for name, listener in listeners.items():
+        event_emitter.on(name, listener)
+    yield captured
+    for name, listener in listeners.items():
+        event_emitter.remove_listener(name, listener)
+
+def make_resilience(**kwargs) -> Resilience:
+    sleeps = []
+    resilience = Resilience(policy=RetryPolicy(rng=random.Random(0), **kwargs), sleep=sleeps.append)
+    resilience.sleeps = sleeps
+    return resilience
+
+def test_transient_errors_are_retried_with_backoff(captured_events):
+    """Tests that 5xx, 429 and transport errors are retried until a call succeeds."""
+    resilience = make_resilience(base_delay=1.0)
+    call = MagicMock(side_effect=[api_error(503), api_error(429), httpx.ConnectError("reset"), OK])
+
+    assert resilience.wrap(call)(model="m", contents=[], config=None) is OK
+
+    assert call.call_count == 4
+    assert len(resilience.sleeps) == 3
+    assert all(0 <= delay <= 2 ** attempt for attempt, delay in enumerate(resilience.sleeps))
+    assert [name for name, _ in captured_events] == ["model_call_retried"] * 3
+
+def test_non_retryable_errors_are_raised_immediately():
+    """Tests that client errors such as 400 are not retried."""
+    resilience = make_resilience()
+    call = MagicMock(side_effect=api_error(400))
+
+    with pytest.raises(errors.ClientError):
+        resilience.wrap(call)(model="m", contents=[], config=None)
+
+    assert call.call_count == 1 and resilience.sleeps == []
+    assert resilience.circuit_breaker.failures == 0
+
+def test_retries_give_up_after_max_attempts():
+    """Tests that the last error is raised once every attempt has failed."""
+    resilience = make_resilience(max_attempts=3)
+    call = MagicMock(side_effect=api_error(500))
+
+    with pytest.raises(errors.ServerError):
+        resilience.wrap(call)(model="m", contents=[], config=None)
+
+    assert call.call_count == 3 and len(resilience.sleeps) == 2
+    assert resilience.limiter.in_flight == 0
+
+def test_async_wrapper_retries():
+    """Tests that the async wrapper retries on the event loop."""
+    resilience = Resilience(policy=RetryPolicy(base_delay=0.001))
+    call = AsyncMock(side_effect=[api_error(503), OK])
+
+    assert asyncio.run(resilience.wrap_async(call)(model="m", contents=[], config=None)) is OK
+    assert call.await_count == 2
+
+def test_stream_is_retried_only_before_the_first_chunk():
+    """Tests that a stream failing mid-way is not replayed."""
+    resilience = make_resilience()
+
+    def stream(fail_after: int):
+        yield from [OK] * fail_after
+        raise api_error(503)
+
+    call = MagicMock(side_effect=[stream(fail_after=0), iter([OK, OK])])
+    assert list(resilience.wrap_stream(call)(model="m", contents=[], config=None)) == [OK, OK]
+
+    with pytest.raises(errors.ServerError):
+        list(resilience.wrap_stream(MagicMock(return_value=stream(fail_after=1)))(model="m", contents=[], config=None))
+
+def test_aimd_limiter_halves_on_throttle_and_grows_on_success():
+    """Tests the additive-increase / multiplicative-decrease of the concurrency limit."""
+    limiter = AIMDLimiter(initial=8, minimum=1, maximum=10)
+    limiter.acquire()
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(succeeded=True)
+    assert 4.9 < limiter.limit < 5.1
+
+def test_circuit_breaker_opens_half_opens_and_closes(captured_events):
+    """Tests the circuit breaker's state machine and its events."""
+    clock = MagicMock(return_value=0.0)
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure(RuntimeError("one"))
+    breaker.check()
+    breaker.record_failure(RuntimeError("two"))
+
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    clock.return_value = 11.0
+    breaker.check()  # The probe session is allowed.
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_success()
+    breaker.check()
+
+    assert [name for name, _ in captured_events] == ["circuit_opened", "circuit_half_opened", "circuit_closed"]
+    assert captured_events[0][1]["error"] == "two"
+
+def test_half_open_probe_always_settles():
+    """Tests that a probe ending in a non-retryable error, or never reporting at all, does not wedge the breaker."""
+    clock = MagicMock(return_value=0.0)
+    resilience = make_resilience()
+    resilience.circuit_breaker = breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure(RuntimeError("down"))
+
+    clock.return_value = 11.0
+    breaker.check()
+    with pytest.raises(errors.ClientError):
+        resilience.wrap(MagicMock(side_effect=api_error(400)))(model="m", contents=[], config=None)
+    assert breaker.state == "closed"
+
+    breaker.record_failure(RuntimeError("down again"))
+    clock.return_value = 22.0
+    breaker.check()  # This probe never reaches the model (e.g. a cassette replay).
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.return_value = 33.0
+    breaker.check()  # Another session may probe once the first has been silent for reset_timeout.
+
+def test_local_errors_do_not_settle_a_half_open_probe():
+    """Tests that a probe failing before it reaches the backend neither closes nor reopens the circuit."""
+    clock = MagicMock(return_value=0.0)
+    resilience = make_resilience()
+    resilience.circuit_breaker = breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure(RuntimeError("down"))
+
+    clock.return_value = 11.0
+    breaker.check()
+    with pytest.raises(ValueError):
+        resilience.wrap(MagicMock(side_effect=ValueError("bad request contents")))(model="m", contents=[], config=None)
+
+    assert breaker.state == "half_open" and breaker.failures == 1
+    breaker.check()  # The next session may probe right away.
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+def test_closing_a_stream_early_releases_its_slot():
+    """Tests that a consumer abandoning a stream gives its concurrency slot back."""
+    resilience = make_resilience()
+    stream = resilience.wrap_stream(MagicMock(return_value=iter([OK, OK])))(model="m", contents=[], config=None)
+
+    next(stream)
+    assert resilience.limiter.in_flight == 1
+    stream.close()
+    assert resilience.limiter.in_flight == 0
@@ -0,0 +1,115 @@
+# packages/framework/tests/test_scheduler.py
+
+import time
+import pytest
+import threading
+from unittest.mock import MagicMock
+from google.genai import errors, types
+from packages.framework.scheduler import ModelCallScheduler, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def contents(text: str = "hello") -> list:
+    return [types.Content(role="user", parts=[types.Part.from_text(text=text)])]
+
+def response(total_tokens: int) -> types.GenerateContentResponse:
+    return types.GenerateContentResponse(usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=total_tokens))
+
+def test_token_bucket_refills_over_time():
+    """Tests that the bucket refills at its per-minute rate up to its capacity."""
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock)
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+
+    clock.now = 30
+    assert bucket.wait_time(30) == 0
+    clock.now = 1000
+    bucket.refill()
+    assert bucket.level == 60
+
+def test_actual_usage_corrects_the_token_estimate():
+    """Tests that the token bucket is charged with the usage reported by the response."""
+    scheduler = ModelCallScheduler(requests_per_minute=100, tokens_per_minute=10_000, clock=FakeClock())
+    call = scheduler.session("job").wrap(MagicMock(return_value=response(2_500)))
+
+    call(model="m", contents=contents(), config=None)
+
+    assert scheduler.tokens.level == pytest.approx(7_500)
+    assert scheduler.requests.level == pytest.approx(99)
+
+def test_rate_limit_errors_drain_the_request_bucket():
+    """Tests that a 429 makes every queued call back off."""
+    scheduler = ModelCallScheduler(requests_per_minute=100, clock=FakeClock())
+    error = errors.ClientError(429, {"error": {"code": 429, "message": "exhausted", "status": "RESOURCE_EXHAUSTED"}})
+    call = scheduler.session("job").wrap(MagicMock(side_effect=error))
+
+    with pytest.raises(errors.ClientError):
+        call(model="m", contents=contents(), config=None)
+
+    assert scheduler.requests.level <= 0
+
+def test_requests_per_minute_are_enforced():
+    """Tests that calls beyond the request budget wait for the bucket to refill."""
+    scheduler = ModelCallScheduler(requests_per_minute=600)  # One request every 0.1 s once the burst is used.
+    scheduler.requests.take(600)
+    call = scheduler.session("job").wrap(MagicMock(return_value=response(1)))
+
+    started = time.monotonic()
+    for _ in range(3):
+        call(model="m", contents=contents(), config=None)
+
+    assert time.monotonic() - started >= 0.25
+
+def wait_for_waiters(scheduler: ModelCallScheduler, count: int):
+    deadline = time.monotonic() + 5
+    while len(scheduler._waiting) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+def test_interactive_calls_are_served_before_batch_calls():
+    """Tests that queued interactive calls overtake batch calls that arrived earlier."""
+    scheduler = ModelCallScheduler(requests_per_minute=600)
+    scheduler.requests.take(600)
+    order = []
+
+    def submit(job, priority):
+        scheduler.acquire(job, priority, 1)
+        order.append(job)
+
+    threads = [threading.Thread(target=submit, args=(f"batch-{i}", "batch")) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    wait_for_waiters(scheduler, 2)
+    threads.append(threading.Thread(target=submit, args=("cli", "interactive")))
+    threads[-1].start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order[0] == "cli"
+
+def test_jobs_with_fewer_granted_calls_go_first():
+    """Tests fair sharing: a new job is not starved by a job that has already made many calls."""
+    scheduler = ModelCallScheduler(requests_per_minute=600)
+    for _ in range(5):
+        scheduler.acquire("busy", "batch", 1)
+    scheduler.requests.take(600)
+    order = []
+
+    def submit(job):
+        scheduler.acquire(job, "batch", 1)
+        order.append(job)
+
+    busy = threading.Thread(target=submit, args=("busy",))
+    busy.start()
+    wait_for_waiters(scheduler, 1)
+    new = threading.Thread(target=submit, args=("new",))
+    new.start()
+    busy.join(timeout=5)
+    new.join(timeout=5)
+
+    assert order == ["new", "busy"]
@@ -0,0 +1,73 @@
+# packages/framework/tests/test_tool_registry.py
+
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+from google.genai import types
+from packages.framework.tool_registry import ToolRegistry
+from packages.framework.mock_gemini_server import MockGeminiServer, MockScript
+from packages.plugin_manager_agent import GeminiAgent
+
+def greet(name: str) -> str:
+    """Greets someone by name."""
+    return f"Hello, {name}!"
+
+def test_tool_sets_are_built_once_per_hitl_setting():
+    """Tests that the registry wraps the tools and derives their declarations only on first use."""
+    registry = ToolRegistry([greet])
+    with patch.object(types.FunctionDeclaration, "from_callable_with_api_option",
+                      wraps=types.FunctionDeclaration.from_callable_with_api_option) as from_callable:
+        first = registry.get()
+        assert registry.get() is first
+        assert registry.get(hitl=True) is not first
+    assert from_callable.call_count == 2
+    assert first.functions[0].__name__ == "greet"
+    assert first.functions[0](name="Ada") == "Hello, Ada!"
+
+def test_schema_and_version_describe_the_declarations():
+    """Tests that the schema is inspectable and the version changes only with the declarations."""
+    tool_set = ToolRegistry([greet]).get()
+    assert tool_set.schema() == [{
+        "description": "Greets someone by name.",
+        "name": "greet",
+        "parameters": {"properties": {"name": {"type": "STRING"}}, "required": ["name"], "type": "OBJECT"},
+    }]
+    assert tool_set.version == ToolRegistry([greet]).get().version
+    assert tool_set.version != ToolRegistry().get().version
+
+def test_subsets_keep_the_requested_tools_in_order():
+    """Tests that a named subset is cached and unknown names raise ValueError."""
+    registry = ToolRegistry()
+    subset = registry.get(names=["write_file", "read_file"])
+    assert [function.__name__ for function in subset.functions] == ["write_file", "read_file"]
+    assert [declaration.name for declaration in subset.declarations] == ["write_file", "read_file"]
+    assert registry.get(names=["write_file", "read_file"]) is subset
+    assert subset.version != registry.get().version
+    with pytest.raises(ValueError, match="delete_file"):
+        registry.get(names=["delete_file"])
+
+class ConfigRecorder:
+    """A model call wrapper that records the config of every call."""
+
+    def __init__(self):
+        self.configs = []
+
+    def wrap(self, call):
+        def wrapper(**kwargs):
+            self.configs.append(kwargs["config"])
+            return call(**kwargs)
+        return wrapper
+
+def test_agent_sends_prebuilt_declarations(tmp_path: Path):
+    """Tests that an agent given declarations sends them and still runs the matching functions."""
+    tool_set = ToolRegistry([greet]).get()
+    recorder = ConfigRecorder()
+    script = MockScript(turns=[{"function_calls": [{"name": "greet", "args": {"name": "Ada"}}]}, {"text": "Done."}])
+    with MockGeminiServer(script) as server:
+        agent = GeminiAgent(api_key="test_key", working_directory=str(tmp_path), base_url=server.base_url,
+                            tools=tool_set.functions, function_declarations=tool_set.declarations,
+                            model_call_wrappers=[recorder])
+        assert agent.execute("Greet Ada") == "Done."
+
+    assert [config.tools for config in recorder.configs] == [[types.Tool(function_declarations=tool_set.declarations)]] * 2
+    assert agent.history[2].parts[0].function_response.response == {"result": "Hello, Ada!"}
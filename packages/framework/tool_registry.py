@@ -0,0 +1,88 @@
+# packages/framework/tool_registry.py
+
+import json
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from google.genai import types
+from .tool_wrapper import tool_wrapper_factory
+from packages.plugin_manager_agent.tools import TOOL_LIST
+
+class ToolSet:
+    """
+    The wrapped tool functions of one configuration and the exact declarations sent to the model.
+
+    `version` is a short hash of the declarations, so runs (and their
+    checkpoints) can tell whether they were made with the same tool schema.
+    """
+
+    def __init__(self, functions: List[Callable], declarations: List[types.FunctionDeclaration]):
+        self.functions = functions
+        self.declarations = declarations
+        self.version = hashlib.sha256(json.dumps(self.schema(), sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+    def schema(self) -> List[Dict[str, Any]]:
+        """Returns the function declarations as JSON-serializable dicts."""
+        return [declaration.model_dump(mode="json", exclude_none=True) for declaration in self.declarations]
+
+    def subset(self, names: Sequence[str]) -> "ToolSet":
+        """
+        Returns a tool set with only the named tools, in the order given.
+
+        Raises:
+            ValueError: If a name does not match any tool in this set.
+        """
+        positions = {function.__name__: index for index, function in enumerate(self.functions)}
+        unknown = [name for name in names if name not in positions]
+        if unknown:
+            raise ValueError(f"Unknown tool(s): {', '.join(unknown)}. Expected any of: {', '.join(positions)}")
+        indexes = [positions[name] for name in dict.fromkeys(names)]
+        return ToolSet([self.functions[i] for i in indexes], [self.declarations[i] for i in indexes])
+
+class ToolRegistry:
+    """
+    Builds the agent's tools once per process and serves them from a cache.
+
+    For each HITL setting, the registry wraps every tool with
+    `tool_wrapper_factory` and derives its `FunctionDeclaration` from the
+    signature and docstring a single time. Agents then send these
+    declarations instead of Python callables, so the SDK no longer
+    re-introspects the tools on every `generate_content` call.
+    """
+
+    def __init__(self, tools: Optional[List[Callable]] = None):
+        self.tools = list(tools if tools is not None else TOOL_LIST)
+        self._tool_sets: Dict[Tuple[bool, Optional[Tuple[str, ...]]], ToolSet] = {}
+        self._lock = threading.Lock()
+
+    def get(self, hitl: bool = False, names: Optional[Sequence[str]] = None) -> ToolSet:
+        """
+        Returns the cached tool set for the HITL setting, building it on first use.
+        With `names`, only those tools are included (e.g. a playbook's declared tools).
+
+        Raises:
+            ValueError: If a name does not match any registered tool.
+        """
+        key = (hitl, tuple(names) if names is not None else None)
+        with self._lock:
+            tool_set = self._tool_sets.get(key)
+            if tool_set is None:
+                full_set = self._tool_sets.get((hitl, None))
+                if full_set is None:
+                    full_set = self._tool_sets[(hitl, None)] = self._build(hitl)
+                tool_set = full_set if names is None else full_set.subset(names)
+                self._tool_sets[key] = tool_set
+            return tool_set
+
+    def _build(self, hitl: bool) -> ToolSet:
+        tool_wrapper = tool_wrapper_factory(hitl=hitl)
+        functions = [tool_wrapper(tool) for tool in self.tools]
+        # Declarations come from the original functions; the wrappers only add events and confirmation.
+        declarations = [
+            types.FunctionDeclaration.from_callable_with_api_option(callable=tool, api_option="GEMINI_API")
+            for tool in self.tools
+        ]
+        return ToolSet(functions, declarations)
+
+# A process-wide registry shared by every orchestrator that does not bring its own.
+tool_registry = ToolRegistry()
@@ -1,9 +1,13 @@
 # packages/framework/tool_wrapper.py
 
+import threading
 from functools import wraps
 from typing import Callable
 from .events import event_emitter
 
+# Tools from the same turn can run in parallel; confirmations are asked one at a time.
+_hitl_lock = threading.Lock()
+
 def tool_wrapper_factory(hitl: bool = False):
     """
     A factory that returns a decorator to wrap a tool function for event emission
@@ -24,22 +28,23 @@ def tool_wrapper_factory(hitl: bool = False):
             
             # Check for HITL confirmation if the tool is destructive
             if hitl and tool_name in ["edit_file", "execute_shell_command"]:
-                print("\n--- HUMAN-IN-THE-LOOP ---")
-                print(f"Agent wants to execute tool: {tool_name}")
-                print("Arguments:")
-                for key, value in all_args.items():
-                    print(f"  {key}: {value}")
+                with _hitl_lock:
+                    print("\n--- HUMAN-IN-THE-LOOP ---")
+                    print(f"Agent wants to execute tool: {tool_name}")
+                    print("Arguments:")
+                    for key, value in all_args.items():
+                        print(f"  {key}: {value}")
                 
-                confirmation = input("Approve? (y/n): ")
-                if confirmation.lower() != 'y':
-                    print("Execution rejected by user.")
-                    # We'll treat this as a failure, as the agent's plan was interrupted
-                    error_message = "Tool execution rejected by user."
-                    event_emitter.emit("tool_failed", {**event_data, "error": error_message})
-                    raise RuntimeError(error_message)
+                    confirmation = input("Approve? (y/n): ")
+                    if confirmation.lower() != 'y':
+                        print("Execution rejected by user.")
+                        # We'll treat this as a failure, as the agent's plan was interrupted
+                        error_message = "Tool execution rejected by user."
+                        event_emitter.emit("tool_failed", {**event_data, "error": error_message})
+                        raise RuntimeError(error_message)
                 
-                print("Execution approved.")
-                print("-------------------------\n")
+                    print("Execution approved.")
+                    print("-------------------------\n")
 
             event_emitter.emit("tool_requested", event_data)
             
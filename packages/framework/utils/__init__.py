@@ -4,6 +4,7 @@
 Utility functions for the Plugin Manager Framework.
 """
 
-from .api_key import get_gemini_api_key
+from .api_key import get_gemini_api_key, resolve_api_keys
+from .key_pool import KeyPool
 
-__all__ = ['get_gemini_api_key']
+__all__ = ['get_gemini_api_key', 'resolve_api_keys', 'KeyPool']
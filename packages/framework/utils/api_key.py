@@ -1,8 +1,9 @@
 # packages/framework/utils/api_key.py
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Mapping, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,8 @@ def get_gemini_api_key(command_line_key: Optional[str] = None) -> str:
     3. GEMINI_API_KEY environment variable
     4. .env file in home directory
 
+    When a source holds a pool of keys (see `resolve_api_keys`), the first one is returned.
+
     Args:
         command_line_key: API key provided via command line argument
 
@@ -26,49 +29,44 @@ def get_gemini_api_key(command_line_key: Optional[str] = None) -> str:
     Raises:
         ValueError: If no API key is found in any source
     """
+    return resolve_api_keys(command_line_key)[0]
+
+@lru_cache(maxsize=None)
+def resolve_api_keys(command_line_key: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Resolves the pool of Gemini API keys from the first source that provides any.
 
+    Sources are checked in the same order as `get_gemini_api_key`. A source may list
+    several comma-separated keys, either in GEMINI_API_KEYS or in GEMINI_API_KEY. The
+    result is cached, so `.env` files are read once per process; call
+    `resolve_api_keys.cache_clear()` to pick up changes.
+
+    Raises:
+        ValueError: If no API key is found in any source
+    """
     # 1. Check command line argument first (highest priority)
     if command_line_key:
         logger.info("Using API key from command line argument")
-        return command_line_key
+        return _split_keys(command_line_key)
 
     # 2. Check for .env file in project root
     project_root = Path(__file__).parent.parent.parent.parent
-    env_file = project_root / ".env"
-
-    if env_file.exists():
-        try:
-            with open(env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and '=' in line and not line.startswith('#'):
-                        key, value = line.split('=', 1)
-                        if key.strip() == 'GEMINI_API_KEY':
-                            logger.info("Using API key from project .env file")
-                            return value.strip()
-        except Exception as e:
-            logger.warning(f"Could not read .env file: {e}")
-
-    # 3. Check environment variable
-    env_key = os.getenv('GEMINI_API_KEY')
-    if env_key:
-        logger.info("Using API key from environment variable")
-        return env_key
+    keys = _keys_from_mapping(_read_env_file(project_root / ".env"))
+    if keys:
+        logger.info(f"Using {len(keys)} API key(s) from project .env file")
+        return keys
+
+    # 3. Check environment variables
+    keys = _keys_from_mapping(os.environ)
+    if keys:
+        logger.info(f"Using {len(keys)} API key(s) from environment variable")
+        return keys
 
     # 4. Check for .env file in home directory
-    home_env_file = Path.home() / ".env"
-    if home_env_file.exists():
-        try:
-            with open(home_env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and '=' in line and not line.startswith('#'):
-                        key, value = line.split('=', 1)
-                        if key.strip() == 'GEMINI_API_KEY':
-                            logger.info("Using API key from home .env file")
-                            return value.strip()
-        except Exception as e:
-            logger.warning(f"Could not read home .env file: {e}")
+    keys = _keys_from_mapping(_read_env_file(Path.home() / ".env"))
+    if keys:
+        logger.info(f"Using {len(keys)} API key(s) from home .env file")
+        return keys
 
     # If no API key found, raise an error
     raise ValueError(
@@ -79,6 +77,27 @@ def get_gemini_api_key(command_line_key: Optional[str] = None) -> str:
         "4. Home .env file: Add GEMINI_API_KEY=your_key to ~/.env"
     )
 
+def _read_env_file(env_file: Path) -> Dict[str, str]:
+    values = {}
+    if not env_file.exists():
+        return values
+    try:
+        with open(env_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and '=' in line and not line.startswith('#'):
+                    key, value = line.split('=', 1)
+                    values[key.strip()] = value.strip()
+    except Exception as e:
+        logger.warning(f"Could not read {env_file}: {e}")
+    return values
+
+def _keys_from_mapping(values: Mapping[str, str]) -> Tuple[str, ...]:
+    return _split_keys(values.get('GEMINI_API_KEYS') or values.get('GEMINI_API_KEY') or "")
+
+def _split_keys(value: str) -> Tuple[str, ...]:
+    return tuple(key.strip() for key in value.split(',') if key.strip())
+
 def validate_api_key(api_key: str) -> bool:
     """
     Basic validation of the API key format.
@@ -0,0 +1,119 @@
+# packages/framework/utils/key_pool.py
+
+import time
+import logging
+import threading
+from functools import wraps
+from typing import Callable, Dict, List, Sequence
+from google.genai import errors
+
+logger = logging.getLogger(__name__)
+
+class KeyPool:
+    """
+    Hands out API keys to concurrent runs to spread quota across projects.
+
+    Strategies:
+        round_robin             - Cycle through the keys in order.
+        least_recently_throttled - Prefer keys that have never been throttled, then the
+                                   one whose last quota error is the oldest.
+
+    A key that returns a quota error (429) is taken out of rotation for
+    `cooldown` seconds. If every key is cooling down, the one that recovers
+    first is handed out rather than blocking the run.
+    """
+
+    STRATEGIES = ("round_robin", "least_recently_throttled")
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        strategy: str = "round_robin",
+        cooldown: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if not keys:
+            raise ValueError("A key pool needs at least one key.")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Expected one of: {', '.join(self.STRATEGIES)}")
+        self.keys: List[str] = list(dict.fromkeys(keys))
+        self.strategy = strategy
+        self.cooldown = cooldown
+        self.clock = clock
+        self._next = 0
+        self._last_throttled: Dict[str, float] = {}
+        self._cooling_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self) -> str:
+        """Returns the key the next run should use."""
+        with self._lock:
+            now = self.clock()
+            # Rotation order starting at the cursor, so ties are broken round-robin.
+            rotation = self.keys[self._next:] + self.keys[:self._next]
+            available = [key for key in rotation if self._cooling_until.get(key, 0) <= now]
+            if not available:
+                key = min(rotation, key=lambda k: self._cooling_until[k])
+                logger.warning("Every API key is cooling down after quota errors; using the first to recover.")
+            elif self.strategy == "least_recently_throttled":
+                key = min(available, key=lambda k: self._last_throttled.get(k, float("-inf")))
+            else:
+                key = available[0]
+            self._next = (self.keys.index(key) + 1) % len(self.keys)
+            return key
+
+    def report_throttled(self, key: str):
+        """Takes a key out of rotation after a quota error."""
+        with self._lock:
+            now = self.clock()
+            self._last_throttled[key] = now
+            self._cooling_until[key] = now + self.cooldown
+        logger.warning(f"API key ...{key[-4:]} hit its quota; out of rotation for {self.cooldown:.0f}s")
+
+    def reporter(self, key: str) -> "KeyThrottleReporter":
+        """Returns a model call wrapper that reports quota errors for `key` back to the pool."""
+        return KeyThrottleReporter(self, key)
+
+class KeyThrottleReporter:
+    """A `model_call_wrapper` that passes calls through and reports 429s for its key."""
+
+    def __init__(self, pool: KeyPool, key: str):
+        self.pool = pool
+        self.key = key
+
+    def wrap(self, call):
+        @wraps(call)
+        def wrapper(**kwargs):
+            try:
+                return call(**kwargs)
+            except errors.APIError as e:
+                self._failed(e)
+                raise
+        return wrapper
+
+    def wrap_async(self, call):
+        @wraps(call)
+        async def wrapper(**kwargs):
+            try:
+                return await call(**kwargs)
+            except errors.APIError as e:
+                self._failed(e)
+                raise
+        return wrapper
+
+    def wrap_stream(self, call):
+        @wraps(call)
+        def wrapper(**kwargs):
+            try:
+                yield from call(**kwargs)
+            except errors.APIError as e:
+                self._failed(e)
+                raise
+        return wrapper
+
+    def _failed(self, error: errors.APIError):
+        if error.code == 429:
+            self.pool.report_throttled(self.key)
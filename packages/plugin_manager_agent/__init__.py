@@ -1 +1,6 @@
-from .gemini_agent import GeminiAgent
\ No newline at end of file
+from .gemini_agent import GeminiAgent
+from .cassette import Cassette, CassetteMissError
+from .history import HistoryManager
+from .budget import BudgetExceeded, RunBudget, RunResult, RunStatus
+from .content_cache import ContentCache, content_cache
+from .workspace_index import WorkspaceIndex, workspace_index
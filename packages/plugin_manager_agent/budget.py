@@ -0,0 +1,195 @@
+import time
+import threading
+from typing import Callable, Dict, Literal, Optional, Union
+from pydantic import BaseModel
+
+class BudgetExceeded(Exception):
+    """Raised inside the agent loop when a run has used up one of its budgets."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+# How a run ended; see `RunResult`.
+RunStatus = Literal["completed", "budget_exceeded", "cancelled"]
+
+class RunResult(BaseModel):
+    """
+    The structured outcome of an agent run.
+
+    `status` is "completed" when the model gave its final answer,
+    "budget_exceeded" when a budget stopped the run early, or "cancelled" when
+    the caller's cancel event did. In the last two cases `final_response`
+    holds whatever text the model had produced by then.
+    """
+    status: RunStatus
+    final_response: Optional[str] = None
+    reason: Optional[str] = None
+    usage: Dict[str, Union[int, float]] = {}
+
+class RunBudget:
+    """
+    Limits for a single agent run. `None` means unlimited.
+
+    A budget only describes the limits and can be shared by any number of
+    runs; each run calls `start()` to get its own `BudgetTracker`.
+    """
+
+    def __init__(
+        self,
+        max_seconds: Optional[float] = None,
+        max_turns: Optional[int] = None,
+        max_tool_calls: Optional[int] = None,
+        max_input_tokens: Optional[int] = None,
+        max_output_tokens: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_seconds = max_seconds
+        self.max_turns = max_turns
+        self.max_tool_calls = max_tool_calls
+        self.max_input_tokens = max_input_tokens
+        self.max_output_tokens = max_output_tokens
+        self.clock = clock
+
+    def start(
+        self,
+        on_cancel: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> "BudgetTracker":
+        """Starts tracking a run against this budget; setting `cancel_event` also ends the run."""
+        return BudgetTracker(self, on_cancel, cancel_event)
+
+class BudgetTracker:
+    """
+    Tracks one run's consumption (time, turns, tool calls and tokens) against a `RunBudget`.
+
+    The agent checks the budget before every model call and tool call. Once a
+    limit is reached the tracker is cancelled: `on_cancel` is called with the
+    reason, which the agent uses to ask running tools to stop early. A watchdog
+    timer cancels the run at the deadline even while a tool is still running.
+    The caller can also end the run by setting `cancel_event` (e.g. a queue
+    worker that lost its lease on the job).
+    """
+
+    def __init__(
+        self,
+        budget: RunBudget,
+        on_cancel: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ):
+        self.budget = budget
+        self.on_cancel = on_cancel
+        self.cancel_event = cancel_event
+        # True if the run was ended through `cancel_event` rather than by a budget.
+        self.cancelled_by_caller = False
+        self.started_at = budget.clock()
+        self.turns = 0
+        self.tool_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.thinking_tokens = 0
+        self.model_seconds = 0.0
+        self.tool_seconds = 0.0
+        self.reason: Optional[str] = None
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        if budget.max_seconds is not None:
+            self._timer = threading.Timer(budget.max_seconds, self._deadline_reached)
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def check(self):
+        """
+        Ends the run if any budget is used up.
+
+        Raises:
+            BudgetExceeded: If the run was cancelled or a limit has been reached.
+        """
+        reason = self.reason or self._exhausted()
+        if reason is not None:
+            self.cancel(reason)
+            raise BudgetExceeded(reason)
+
+    def record_turn(self, usage_metadata=None, seconds: float = 0.0):
+        """Counts a model turn, its latency and the tokens it consumed (from the response's `usage_metadata`)."""
+        with self._lock:
+            self.turns += 1
+            self.model_seconds += seconds
+            if usage_metadata is not None:
+                self.input_tokens += usage_metadata.prompt_token_count or 0
+                self.output_tokens += (usage_metadata.candidates_token_count or 0) + (usage_metadata.thoughts_token_count or 0)
+                self.cached_tokens += usage_metadata.cached_content_token_count or 0
+                self.thinking_tokens += usage_metadata.thoughts_token_count or 0
+
+    def record_tool_time(self, seconds: float):
+        """Adds the wall time of a turn's tool calls."""
+        with self._lock:
+            self.tool_seconds += seconds
+
+    def admit_tool_call(self) -> Optional[str]:
+        """Counts a tool call that is about to run. Returns the reason it must not run, if any."""
+        with self._lock:
+            if self.reason is None and self.budget.max_tool_calls is not None and self.tool_calls >= self.budget.max_tool_calls:
+                reason = f"tool call limit of {self.budget.max_tool_calls} reached"
+            else:
+                reason = self.reason or self._exhausted()
+            if reason is None:
+                self.tool_calls += 1
+                return None
+        self.cancel(reason)
+        return reason
+
+    def cancel(self, reason: str):
+        """Cancels the run; only the first reason is kept."""
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+        if self.on_cancel is not None:
+            self.on_cancel(reason)
+
+    def stop(self):
+        """Stops the deadline watchdog once the run is over."""
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def elapsed(self) -> float:
+        return self.budget.clock() - self.started_at
+
+    def usage(self) -> Dict[str, Union[int, float]]:
+        """Returns what the run has consumed so far."""
+        return {
+            "seconds": round(self.elapsed(), 3),
+            "model_seconds": round(self.model_seconds, 3),
+            "tool_seconds": round(self.tool_seconds, 3),
+            "turns": self.turns,
+            "tool_calls": self.tool_calls,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+            "output_tokens": self.output_tokens,
+            "thinking_tokens": self.thinking_tokens,
+        }
+
+    def _exhausted(self) -> Optional[str]:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            self.cancelled_by_caller = True
+            return "cancelled by the caller"
+        budget = self.budget
+        limits = [
+            (budget.max_seconds, self.elapsed(), f"deadline of {budget.max_seconds}s reached"),
+            (budget.max_turns, self.turns, f"turn limit of {budget.max_turns} reached"),
+            (budget.max_input_tokens, self.input_tokens, f"input token limit of {budget.max_input_tokens} reached"),
+            (budget.max_output_tokens, self.output_tokens, f"output token limit of {budget.max_output_tokens} reached"),
+        ]
+        for limit, used, reason in limits:
+            if limit is not None and used >= limit:
+                return reason
+        return None
+
+    def _deadline_reached(self):
+        self.cancel(f"deadline of {self.budget.max_seconds}s reached")
@@ -0,0 +1,135 @@
+import json
+import hashlib
+import inspect
+import logging
+from functools import wraps
+from pathlib import Path
+from google.genai import types
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when no recording exists for a request."""
+
+class Cassette:
+    """
+    Records and replays model traffic so agent runs can be reproduced offline.
+
+    Each `generate_content` exchange is stored as `<directory>/<hash>.json`,
+    where the hash is computed from a canonical JSON form of the request
+    (model, contents and config). Because the agent sends the full history on
+    every call, function-call turns are captured as separate exchanges.
+
+    Modes:
+        replay - Only serve recorded responses; a missing recording raises CassetteMissError.
+        auto   - Serve recorded responses and record any request not seen before.
+        record - Always call the model and overwrite existing recordings.
+
+    A cassette is a model call wrapper: it is passed to `GeminiAgent` via
+    `model_call_wrappers` and wraps the SDK's sync and async `generate_content`
+    as well as `generate_content_stream`. Streamed exchanges are keyed separately
+    and store the list of chunks.
+    """
+
+    MODES = ("replay", "auto", "record")
+
+    def __init__(self, directory: str | Path, mode: str = "auto"):
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid cassette mode '{mode}'. Expected one of: {', '.join(self.MODES)}")
+        self.directory = Path(directory)
+        self.mode = mode
+
+    def has_recordings(self) -> bool:
+        """Returns True if the cassette holds at least one recorded exchange."""
+        return self.directory.is_dir() and any(self.directory.glob("*.json"))
+
+    def wrap(self, call):
+        """Wraps a synchronous `generate_content` call."""
+        @wraps(call)
+        def wrapper(*, model, contents, config=None):
+            request = self._canonical_request(model, contents, config)
+            key = self._key(request)
+            response = self._load(key)
+            if response is None:
+                response = call(model=model, contents=contents, config=config)
+                self._save(key, request, response)
+            return response
+        return wrapper
+
+    def wrap_async(self, call):
+        """Wraps an asynchronous `generate_content` call."""
+        @wraps(call)
+        async def wrapper(*, model, contents, config=None):
+            request = self._canonical_request(model, contents, config)
+            key = self._key(request)
+            response = self._load(key)
+            if response is None:
+                response = await call(model=model, contents=contents, config=config)
+                self._save(key, request, response)
+            return response
+        return wrapper
+
+    def wrap_stream(self, call):
+        """Wraps a synchronous `generate_content_stream` call."""
+        @wraps(call)
+        def wrapper(*, model, contents, config=None):
+            request = {**self._canonical_request(model, contents, config), "stream": True}
+            key = self._key(request)
+            chunks = self._load(key)
+            if chunks is None:
+                chunks = []
+                for chunk in call(model=model, contents=contents, config=config):
+                    chunks.append(chunk)
+                    yield chunk
+                self._save(key, request, chunks)
+            else:
+                yield from chunks
+        return wrapper
+
+    def _load(self, key: str) -> types.GenerateContentResponse | list[types.GenerateContentResponse] | None:
+        path = self.directory / f"{key}.json"
+        if self.mode != "record" and path.is_file():
+            logging.info(f"Replaying model response {key[:12]} from {self.directory}")
+            response = json.loads(path.read_text())["response"]
+            if isinstance(response, list):
+                return [types.GenerateContentResponse.model_validate(chunk) for chunk in response]
+            return types.GenerateContentResponse.model_validate(response)
+        if self.mode == "replay":
+            raise CassetteMissError(
+                f"No recorded response for request {key[:12]} in {self.directory}. "
+                "Re-record with GEMINI_CASSETTE_MODE=auto or GEMINI_CASSETTE_MODE=record."
+            )
+        return None
+
+    def _save(self, key: str, request: dict, response: types.GenerateContentResponse | list[types.GenerateContentResponse]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if isinstance(response, list):
+            dumped = [chunk.model_dump(mode="json", exclude_none=True) for chunk in response]
+        else:
+            dumped = response.model_dump(mode="json", exclude_none=True)
+        exchange = {"request": request, "response": dumped}
+        (self.directory / f"{key}.json").write_text(json.dumps(exchange, indent=2, sort_keys=True))
+
+    @staticmethod
+    def _key(request: dict) -> str:
+        canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _canonical_request(model: str, contents: list, config) -> dict:
+        """Builds a JSON-serializable form of a request that is stable across runs."""
+        config_data = {}
+        tools = []
+        if config is not None:
+            config_data = config.model_dump(mode="json", exclude_none=True, exclude={"tools", "http_options"})
+            for tool in config.tools or []:
+                if callable(tool):
+                    # Python callables are described by their name and signature, which is
+                    # what the SDK turns into a function declaration.
+                    tools.append({"callable": tool.__name__, "signature": str(inspect.signature(tool))})
+                else:
+                    tools.append(tool.model_dump(mode="json", exclude_none=True))
+        return {
+            "model": model,
+            "contents": [content.model_dump(mode="json", exclude_none=True) for content in contents],
+            "config": config_data,
+            "tools": tools,
+        }
@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, NamedTuple
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+class _Entry(NamedTuple):
+    # (inode, mtime_ns, size) of the file when `text` was read or written.
+    version: tuple
+    text: str
+
+class ContentCache:
+    """
+    An LRU cache of file contents shared by the file tools, bounded by the total size of the files it holds.
+
+    Entries are keyed by absolute path and are only served while the file's
+    inode, mtime and size are unchanged, so edits made outside the tools
+    (e.g. by a shell command) are picked up on the next read. Like `linecache`,
+    it cannot see a rewrite that keeps the same inode, size and mtime.
+
+    The cache is thread-safe. Agents working on the same plugins can share one
+    cache (the process-wide `content_cache` is the default), so a file read by
+    one run is a hit for the others.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def read_text(self, path: str | Path) -> str:
+        """Returns the file's text, as `Path.read_text()` would."""
+        key = os.path.abspath(path)
+        version = self._version(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.text
+            self._stats["misses"] += 1
+        text = Path(key).read_text()
+        # Store under the version seen before reading: if the file changed meanwhile, the next read misses.
+        self._store(key, version, text)
+        return text
+
+    def write_text(self, path: str | Path, content: str):
+        """Writes the file and keeps the new content cached for the next read."""
+        key = os.path.abspath(path)
+        Path(key).write_text(content)
+        if "\r" in content:
+            # Reading the file back translates line endings, so the written text is not what a read returns.
+            self.invalidate(key)
+            return
+        self._store(key, self._version(key), content)
+
+    def invalidate(self, path: str | Path):
+        with self._lock:
+            self._remove(os.path.abspath(path))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit, miss and eviction counters and the cache's current size."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+    @staticmethod
+    def _version(path: str) -> tuple:
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _store(self, key: str, version: tuple, text: str):
+        size = version[2]
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(version, text)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.version[2]
+                self._stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.version[2]
+
+# The process-wide cache, used by every workspace that is not given its own.
+content_cache = ContentCache()
@@ -1,49 +1,561 @@
 import os
+import time
+import queue
+import asyncio
 import logging
+import threading
+import contextvars
+from typing import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from google import genai
 from google.genai import types
 from .tools import TOOL_LIST as DEFAULT_TOOL_LIST
+from .workspace import Workspace, use_workspace
+from .content_cache import ContentCache
+from .read_ledger import ReadLedger
+from .workspace_index import WorkspaceIndex
+from .history import HistoryManager
+from .budget import BudgetExceeded, RunBudget, RunResult
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+DEFAULT_MODEL = "gemini-2.5-pro"
+
+# Tools that modify the file named by their path argument. Calls in the same turn that
+# touch a path one of these writes to are run one after another, in the order requested.
+WRITE_TOOLS = {"write_file", "edit_file"}
+# Tools that only read the path named by their argument. Any tool in neither set (e.g.
+# `execute_shell_command`) may touch anything, so it runs alone, in the order requested.
+READ_ONLY_TOOLS = {"read_file", "list_files"}
+PATH_ARGUMENTS = ("path", "file_path")
+
 class GeminiAgent:
-    def __init__(self, api_key: str, working_directory: str, model_name: str = "gemini-2.5-pro", tools: list = None):
+    def __init__(
+        self,
+        api_key: str,
+        working_directory: str,
+        model_name: str = DEFAULT_MODEL,
+        tools: list = None,
+        checkpoint=None,
+        max_turns: int = 20,
+        model_call_wrappers: list = None,
+        base_url: str = None,
+        max_parallel_tools: int = 8,
+        history_manager: HistoryManager = None,
+        client: genai.Client = None,
+        function_declarations: list = None,
+        generation_config: types.GenerateContentConfig = None,
+        budget: RunBudget = None,
+        on_turn_completed: Callable[[dict], None] = None,
+        content_cache: ContentCache = None,
+        workspace_index: WorkspaceIndex = None,
+        cancel_event: threading.Event = None
+    ):
         self.working_directory = working_directory
         if not os.path.exists(self.working_directory):
             os.makedirs(self.working_directory)
-        os.chdir(self.working_directory)
-        
-        self.client = genai.Client(api_key=api_key)
+        # Tools resolve paths against this workspace rather than the process cwd,
+        # so several agents can share one process. File contents are cached in
+        # `content_cache`, or in the process-wide cache shared by all agents.
+        # The read ledger lets `read_file` answer a re-read of unchanged content with a short marker,
+        # and `workspace_index`, if given, is kept current by the tools and answers `list_files`.
+        self.workspace = Workspace(
+            self.working_directory, content_cache=content_cache, read_ledger=ReadLedger(), index=workspace_index
+        )
+
+        if client is None:
+            # A base URL override (argument or GEMINI_BASE_URL) points the agent at a
+            # Gemini-compatible stand-in such as `MockGeminiServer`.
+            base_url = base_url or os.getenv("GEMINI_BASE_URL")
+            http_options = types.HttpOptions(base_url=base_url) if base_url else None
+            client = genai.Client(api_key=api_key, http_options=http_options)
+        # A shared client (e.g. from `ClientPool`) lets runs reuse warm connections.
+        self.client = client
         self.model_name = model_name
-        
+        # Sampling and thinking settings (e.g. from a playbook's front matter) sent with every call.
+        self.generation_config = generation_config
+
         if tools is None:
             tools = DEFAULT_TOOL_LIST
-        
+
         self.tools = tools
+        self.tool_map = {tool.__name__: tool for tool in tools}
+        # Prebuilt declarations for `tools` (e.g. from `ToolRegistry`). Without them the
+        # SDK derives the schema from the callables again on every model call.
+        self.tool_declarations = [types.Tool(function_declarations=function_declarations)] if function_declarations else None
         self.history = []
 
+        # An optional sink (e.g. `RunCheckpoint`) that persists the history and tool events as they happen.
+        self.checkpoint = checkpoint
+        self.max_turns = max_turns
+        # Objects with `wrap(call)` / `wrap_async(call)` / `wrap_stream(call)` methods (e.g. `Cassette`)
+        # that are layered around every `generate_content` call, innermost first.
+        self.model_call_wrappers = model_call_wrappers or []
+        # Tool responses recovered from the checkpoint on resume, keyed by turn and call index.
+        self._recorded_tool_results = {}
+
+        # Independent tool calls requested in the same turn run concurrently, up to this many at once.
+        self.max_parallel_tools = max_parallel_tools
+        # One record per model turn: model latency, token counts, tool wall time and per-tool durations.
+        self.turn_timings = []
+        # Called with a copy of each turn's record as soon as the model turn completes.
+        self.on_turn_completed = on_turn_completed
+        # Bounds what is sent to the model; `history` itself always keeps every turn.
+        self.history_manager = history_manager or HistoryManager()
+        # Per-run limits on time, turns, tool calls and tokens; unlimited by default.
+        self.budget = budget or RunBudget()
+        # Set by the caller to stop the run early, like an exhausted budget (e.g. when a queue worker loses its lease).
+        self.cancel_event = cancel_event
+        self._tracker = None
+        # The structured outcome of the last run (status, final response and usage).
+        self.result: RunResult = None
+
     def execute(self, prompt: str) -> str:
         """
-        Executes a prompt using the SDK's automatic function calling.
-        Tool calls are not yielded but are captured by the event wrappers.
+        Executes a prompt, running the function-calling loop until the model
+        returns a final text response. Every completed turn is handed to the
+        checkpoint (if any), so an interrupted run can be resumed.
         Returns the final text response from the model.
         """
         logging.info(f"Agent starting execution with prompt: {prompt[:200]}...")
-        
+
         # Add the new user prompt to the history
-        self.history.append(types.Content(role='user', parts=[types.Part.from_text(text=prompt)]))
-        
-        # With AFC enabled, the SDK handles the entire conversation loop.
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=self.history,
-            config=types.GenerateContentConfig(tools=self.tools)
-        )
-        
-        # Update the history with the model's response
-        self.history.append(response.candidates[0].content)
+        self._append_history(types.Content(role='user', parts=[types.Part.from_text(text=prompt)]))
 
-        final_text = response.text
-        logging.info(f"Agent finished with final response: {final_text[:200]}...")
+        final_text = self._run_loop()
+        logging.info(f"Agent finished with final response: {(final_text or '')[:200]}...")
         return final_text
+
+    def resume(self) -> str:
+        """
+        Continues a conversation from a previously restored `history`.
+
+        If the last model turn requested tool calls that never completed, they are
+        executed first; calls already recorded by the checkpoint are not run again.
+        """
+        logging.info(f"Agent resuming execution from turn {len(self.history)}...")
+        if not self.history:
+            raise ValueError("Cannot resume an agent with an empty history.")
+
+        last_turn = self.history[-1]
+        if last_turn.role == 'model' and not self._function_calls(last_turn):
+            # The run had already finished; there is nothing left to do.
+            self.result = RunResult(status="completed", final_response=self._text(last_turn))
+            return self.result.final_response
+
+        if self.checkpoint is not None:
+            for event in self.checkpoint.load_tool_events():
+                self._recorded_tool_results.setdefault(event["turn"], {})[event["index"]] = event["response"]
+
+        final_text = self._run_loop()
+        logging.info(f"Agent finished with final response: {(final_text or '')[:200]}...")
+        return final_text
+
+    async def aexecute(self, prompt: str) -> str:
+        """
+        Asynchronous counterpart of `execute`, built on the SDK's async client.
+        While waiting on the model the event loop is free to drive other sessions;
+        tool calls run in worker threads via `asyncio.to_thread`.
+        Returns the final text response from the model.
+        """
+        logging.info(f"Agent starting async execution with prompt: {prompt[:200]}...")
+
+        self._append_history(types.Content(role='user', parts=[types.Part.from_text(text=prompt)]))
+
+        final_text = await self._arun_loop()
+        logging.info(f"Agent finished with final response: {(final_text or '')[:200]}...")
+        return final_text
+
+    def stream(self, prompt: str) -> Iterator[dict]:
+        """
+        Executes a prompt like `execute`, but yields events as they happen:
+
+            {"type": "text", "text": ...}                            - A chunk of model text.
+            {"type": "tool_started", "name": ..., "args": ...}       - A tool call began.
+            {"type": "tool_finished", "name": ..., "args": ...,
+             "response": ..., "seconds": ...}                        - A tool call returned.
+            {"type": "final", "text": ...}                           - The final response; always last.
+
+        Model turns are requested with `generate_content_stream`, so text arrives
+        while the model is still generating.
+        """
+        logging.info(f"Agent starting streaming execution with prompt: {prompt[:200]}...")
+        self._append_history(types.Content(role='user', parts=[types.Part.from_text(text=prompt)]))
+
+        self._start_run()
+        reason = None
+        try:
+            for _ in range(self.max_turns):
+                pending_calls = self._pending_function_calls()
+                if pending_calls:
+                    self._tracker.check()
+                    yield from self._stream_tools(pending_calls)
+
+                self._tracker.check()
+                started = time.perf_counter()
+                parts = []
+                usage_metadata = None
+                for chunk in self._generate_content_stream():
+                    # Only the last chunk carries the usage of the whole turn.
+                    usage_metadata = chunk.usage_metadata or usage_metadata
+                    if not chunk.candidates or not chunk.candidates[0].content:
+                        continue
+                    for part in chunk.candidates[0].content.parts or []:
+                        parts.append(part)
+                        if part.text and not part.thought:
+                            yield {"type": "text", "text": part.text}
+                content = types.Content(role='model', parts=self._merge_text_parts(parts))
+                self._append_history(content)
+                self._record_model_turn(usage_metadata, len(self._function_calls(content)), time.perf_counter() - started)
+
+                if not self._function_calls(content):
+                    break
+            else:
+                logging.warning(f"Agent stopped after reaching the maximum of {self.max_turns} turns.")
+                reason = self._turn_limit_reason()
+        except BudgetExceeded as e:
+            reason = e.reason
+        finally:
+            # Any other error (or a consumer that stops iterating) must not leave the deadline watchdog running.
+            self._tracker.stop()
+
+        final_text = self._end_run(self._last_model_text(), reason)
+        logging.info(f"Agent finished with final response: {(final_text or '')[:200]}...")
+        yield {"type": "final", "text": final_text, "result": self.result.model_dump()}
+
+    def _stream_tools(self, function_calls: list) -> Iterator[dict]:
+        """Runs `_call_tools` on a worker thread and yields its tool events as they are emitted."""
+        events = queue.Queue()
+        outcome = {}
+
+        def run():
+            try:
+                # The workspace is bound on the worker so that it never leaks into the consumer's context.
+                with use_workspace(self.workspace):
+                    outcome["content"] = self._call_tools(function_calls, notify=events.put)
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                events.put(None)
+
+        threading.Thread(target=run, daemon=True).start()
+        while (event := events.get()) is not None:
+            yield event
+        if "error" in outcome:
+            raise outcome["error"]
+        self._append_history(outcome["content"])
+
+    def _run_loop(self) -> str:
+        self._start_run()
+        with use_workspace(self.workspace):
+            try:
+                for _ in range(self.max_turns):
+                    pending_calls = self._pending_function_calls()
+                    if pending_calls:
+                        self._tracker.check()
+                        self._append_history(self._call_tools(pending_calls))
+
+                    self._tracker.check()
+                    started = time.perf_counter()
+                    response = self._generate_content()
+                    self._append_history(response.candidates[0].content)
+                    self._record_model_turn(response.usage_metadata, len(response.function_calls or []), time.perf_counter() - started)
+
+                    if not response.function_calls:
+                        return self._end_run(response.text)
+            except BudgetExceeded as e:
+                return self._end_run(self._last_model_text(), e.reason)
+            finally:
+                # Any other error must not leave the deadline watchdog running.
+                self._tracker.stop()
+
+        logging.warning(f"Agent stopped after reaching the maximum of {self.max_turns} turns.")
+        # As in `stream`: the last turn may hold only function calls (or there may be none, with max_turns=0).
+        return self._end_run(self._last_model_text(), self._turn_limit_reason())
+
+    async def _arun_loop(self) -> str:
+        self._start_run()
+        # The workspace is bound to this task's context, which `asyncio.to_thread` copies into tool threads.
+        with use_workspace(self.workspace):
+            try:
+                for _ in range(self.max_turns):
+                    pending_calls = self._pending_function_calls()
+                    if pending_calls:
+                        self._tracker.check()
+                        self._append_history(await asyncio.to_thread(self._call_tools, pending_calls))
+
+                    self._tracker.check()
+                    started = time.perf_counter()
+                    response = await self._agenerate_content()
+                    self._append_history(response.candidates[0].content)
+                    self._record_model_turn(response.usage_metadata, len(response.function_calls or []), time.perf_counter() - started)
+
+                    if not response.function_calls:
+                        return self._end_run(response.text)
+            except BudgetExceeded as e:
+                return self._end_run(self._last_model_text(), e.reason)
+            finally:
+                # Any other error (or cancellation of the task) must not leave the deadline watchdog running.
+                self._tracker.stop()
+
+        logging.warning(f"Agent stopped after reaching the maximum of {self.max_turns} turns.")
+        # As in `stream`: the last turn may hold only function calls (or there may be none, with max_turns=0).
+        return self._end_run(self._last_model_text(), self._turn_limit_reason())
+
+    def _start_run(self):
+        self.workspace.cancelled.clear()
+        self._tracker = self.budget.start(on_cancel=self._cancel, cancel_event=self.cancel_event)
+
+    def _cancel(self, reason: str):
+        logging.warning(f"Agent run cancelled: {reason}")
+        # Asks running tools (e.g. a long shell command) to stop early.
+        self.workspace.cancelled.set()
+
+    def _turn_limit_reason(self) -> str:
+        # A run cut off by `max_turns` is partial like one stopped by its budget, and can be resumed the same way.
+        return f"turn limit of {self.max_turns} reached"
+
+    def _end_run(self, final_text: str, reason: str = None) -> str:
+        """Stops tracking the run and records its structured result."""
+        self._tracker.stop()
+        if reason is None:
+            status = "completed"
+        else:
+            status = "cancelled" if self._tracker.cancelled_by_caller else "budget_exceeded"
+        self.result = RunResult(
+            status=status,
+            final_response=final_text,
+            reason=reason,
+            usage=self._tracker.usage()
+        )
+        return final_text
+
+    def _generate_content(self) -> types.GenerateContentResponse:
+        call = self.client.models.generate_content
+        for wrapper in self.model_call_wrappers:
+            call = wrapper.wrap(call)
+        return call(model=self.model_name, contents=self.history_manager.compact(self.history), config=self._generation_config())
+
+    async def _agenerate_content(self) -> types.GenerateContentResponse:
+        call = self.client.aio.models.generate_content
+        for wrapper in self.model_call_wrappers:
+            call = wrapper.wrap_async(call)
+        return await call(model=self.model_name, contents=self.history_manager.compact(self.history), config=self._generation_config())
+
+    def _generate_content_stream(self) -> Iterator[types.GenerateContentResponse]:
+        call = self.client.models.generate_content_stream
+        for wrapper in self.model_call_wrappers:
+            call = wrapper.wrap_stream(call)
+        return call(model=self.model_name, contents=self.history_manager.compact(self.history), config=self._generation_config())
+
+    def _generation_config(self) -> types.GenerateContentConfig:
+        # We run the function-calling loop ourselves so that every turn is observable.
+        fields = dict(
+            tools=self.tool_declarations or self.tools,
+            automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
+        )
+        if self.generation_config is not None:
+            return self.generation_config.model_copy(update=fields)
+        return types.GenerateContentConfig(**fields)
+
+    def _pending_function_calls(self) -> list:
+        """Returns the function calls of the last model turn if they have not been answered yet."""
+        if self.history and self.history[-1].role == 'model':
+            return self._function_calls(self.history[-1])
+        return []
+
+    def _call_tools(self, function_calls: list, notify=None) -> types.Content:
+        """
+        Executes the requested tool calls and returns their responses as a single user turn.
+
+        Independent calls run concurrently in a thread pool; each worker receives a copy
+        of the current context so the workspace binding follows it into the thread.
+        `notify`, if given, is called with a tool_started and a tool_finished event per call.
+
+        Raises:
+            BudgetExceeded: If the budget refused some of the calls. The turn is then left
+                unanswered, so a resume runs the refused calls (and only those).
+        """
+        turn = len(self.history) - 1
+        self.workspace.read_ledger.begin_turn(turn, self.history_manager.compacted_results)
+        responses = dict(self._recorded_tool_results.pop(turn, {}))
+        outstanding = [(index, call) for index, call in enumerate(function_calls) if index not in responses]
+
+        started = time.perf_counter()
+        tool_timings = []
+        for batch in self._independent_batches(outstanding):
+            for index, response, seconds in self._run_batch(batch, notify):
+                if response is None:
+                    continue  # Refused by the budget.
+                responses[index] = response
+                tool_timings.append({"index": index, "name": function_calls[index].name, "seconds": seconds})
+                if self.checkpoint is not None:
+                    self.checkpoint.record_tool_event({
+                        "turn": turn,
+                        "index": index,
+                        "name": function_calls[index].name,
+                        "args": dict(function_calls[index].args or {}),
+                        "response": response,
+                    })
+        self._record_tool_timing(turn, sorted(tool_timings, key=lambda t: t["index"]), time.perf_counter() - started)
+        if len(responses) < len(function_calls):
+            # The calls that did run are recorded by the checkpoint; raises BudgetExceeded, as the budget has been cancelled.
+            self._tracker.check()
+
+        parts = [
+            types.Part.from_function_response(name=function_call.name, response=responses[index])
+            for index, function_call in enumerate(function_calls)
+        ]
+        return types.Content(role='user', parts=parts)
+
+    def _run_batch(self, batch: list, notify=None):
+        """Runs a batch of independent calls, yielding (index, response, seconds) as each one finishes."""
+        if len(batch) == 1:
+            index, function_call = batch[0]
+            yield (index, *self._timed_call(function_call, notify))
+            return
+
+        with ThreadPoolExecutor(max_workers=min(len(batch), self.max_parallel_tools)) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, self._timed_call, function_call, notify): index
+                for index, function_call in batch
+            }
+            for future in as_completed(futures):
+                yield (futures[future], *future.result())
+
+    def _timed_call(self, function_call: types.FunctionCall, notify=None) -> tuple:
+        """Runs one call and returns (response, seconds); the response is None if the budget refused the call."""
+        if function_call.name in self.tool_map and self._tracker is not None and self._tracker.admit_tool_call() is not None:
+            return None, 0.0
+        event = {"name": function_call.name, "args": dict(function_call.args or {})}
+        if notify is not None:
+            notify({"type": "tool_started", **event})
+        started = time.perf_counter()
+        response = self._call_tool(function_call)
+        seconds = time.perf_counter() - started
+        if notify is not None:
+            notify({"type": "tool_finished", **event, "response": response, "seconds": seconds})
+        return response, seconds
+
+    def _independent_batches(self, indexed_calls: list) -> list:
+        """
+        Splits a turn's calls into consecutive batches that are safe to run concurrently.
+        A new batch starts whenever a call touches a path that the current batch writes to,
+        or writes to a path the current batch already touches. A call to a tool that is
+        neither a known reader nor a known writer is a batch of its own.
+        """
+        batches, current, touched = [], [], {}
+        for index, function_call in indexed_calls:
+            if function_call.name not in READ_ONLY_TOOLS | WRITE_TOOLS:
+                if current:
+                    batches.append(current)
+                batches.append([(index, function_call)])
+                current, touched = [], {}
+                continue
+            args = function_call.args or {}
+            path = next((self._call_path(args[key]) for key in PATH_ARGUMENTS if key in args), None)
+            writes = function_call.name in WRITE_TOOLS
+            if path is not None and path in touched and (writes or touched[path]):
+                batches.append(current)
+                current, touched = [], {}
+            current.append((index, function_call))
+            if path is not None:
+                touched[path] = touched.get(path, False) or writes
+        if current:
+            batches.append(current)
+        return batches
+
+    def _call_path(self, path) -> str:
+        """Returns the file a path argument refers to, so that relative and absolute spellings compare equal."""
+        try:
+            return str(self.workspace.resolve(str(path)))
+        except (PermissionError, OSError, ValueError):
+            # The tool will refuse the path itself; it only needs a stable key here.
+            return os.path.normpath(str(path))
+
+    def _record_model_turn(self, usage_metadata, function_calls: int, seconds: float):
+        record = {
+            "turn": len(self.history) - 1,
+            "model": self.model_name,
+            "model_seconds": seconds,
+            "function_calls": function_calls,
+            **self._token_counts(usage_metadata),
+        }
+        self.turn_timings.append(record)
+        self._tracker.record_turn(usage_metadata, seconds)
+        if self.on_turn_completed is not None:
+            self.on_turn_completed(dict(record))
+
+    def _record_tool_timing(self, turn: int, tool_timings: list, seconds: float):
+        if not self.turn_timings or self.turn_timings[-1]["turn"] != turn:
+            # A resumed run executes the pending calls of a turn it did not time itself.
+            self.turn_timings.append({"turn": turn})
+        record = self.turn_timings[-1]
+        record.update(tool_seconds=seconds, tools=tool_timings)
+        if self._tracker is not None:
+            self._tracker.record_tool_time(seconds)
+        logging.info(
+            f"Turn {turn}: model {record.get('model_seconds', 0.0):.2f}s "
+            f"({record.get('prompt_tokens', 0)} prompt / {record.get('candidates_tokens', 0)} output tokens), "
+            f"{len(tool_timings)} tool call(s) in {seconds:.2f}s"
+        )
+
+    def _call_tool(self, function_call: types.FunctionCall) -> dict:
+        tool = self.tool_map.get(function_call.name)
+        if tool is None:
+            return {"error": f"Unknown tool: {function_call.name}"}
+        try:
+            return {"result": tool(**(function_call.args or {}))}
+        except Exception as e:
+            # Report the failure to the model so it can adjust, as the SDK's automatic loop does.
+            return {"error": str(e)}
+
+    def _append_history(self, content: types.Content):
+        self.history.append(content)
+        if self.checkpoint is not None:
+            self.checkpoint.save_history(self.history)
+
+    @staticmethod
+    def _merge_text_parts(parts: list) -> list:
+        """Joins the consecutive text chunks of a streamed turn back into single parts."""
+        merged = []
+        for part in parts:
+            previous = merged[-1] if merged else None
+            if (
+                previous is not None and previous.text is not None and part.text is not None
+                and bool(previous.thought) == bool(part.thought)
+            ):
+                merged[-1] = previous.model_copy(update={
+                    "text": previous.text + part.text,
+                    "thought_signature": previous.thought_signature or part.thought_signature,
+                })
+            else:
+                merged.append(part)
+        return merged
+
+    def _last_model_text(self) -> str:
+        """Returns the text of the latest model turn, i.e. the partial answer of a run that was stopped early."""
+        for content in reversed(self.history):
+            if content.role == 'model':
+                return self._text(content)
+        return None
+
+    @staticmethod
+    def _token_counts(usage_metadata) -> dict:
+        """Extracts the token counts of a turn from the response's `usage_metadata` (zeros if absent)."""
+        return {
+            "prompt_tokens": getattr(usage_metadata, "prompt_token_count", None) or 0,
+            "cached_tokens": getattr(usage_metadata, "cached_content_token_count", None) or 0,
+            "candidates_tokens": getattr(usage_metadata, "candidates_token_count", None) or 0,
+            "thinking_tokens": getattr(usage_metadata, "thoughts_token_count", None) or 0,
+            "total_tokens": getattr(usage_metadata, "total_token_count", None) or 0,
+        }
+
+    @staticmethod
+    def _function_calls(content: types.Content) -> list:
+        return [part.function_call for part in content.parts or [] if part.function_call]
+
+    @staticmethod
+    def _text(content: types.Content) -> str:
+        return "".join(part.text for part in content.parts or [] if part.text and not part.thought)
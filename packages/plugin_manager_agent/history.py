@@ -0,0 +1,110 @@
+import json
+import hashlib
+import logging
+from google.genai import types
+
+# A rough, model-independent estimate; good enough to keep requests within budget.
+CHARS_PER_TOKEN = 4
+
+class HistoryManager:
+    """
+    Keeps the contents sent to the model within a token budget.
+
+    The agent's own `history` is never modified, so checkpoints and resumes
+    always see the full conversation. `compact` instead returns the view that is
+    actually sent: the first prompt and the most recent turns are kept verbatim,
+    while older tool results larger than `max_result_chars` are replaced by an
+    excerpt of their head and tail plus the SHA-256 of the full output. Older
+    results are compacted first, and only as many as needed to fit the budget.
+    """
+
+    def __init__(self, max_tokens: int = 200_000, keep_recent_turns: int = 6, max_result_chars: int = 2_000):
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.max_result_chars = max_result_chars
+        # The tool outputs compacted out of the sent history, as (history index, sha256) pairs,
+        # so callers can tell which copy of an output was compacted.
+        self.compacted_results = set()
+        self._compacted = {}
+
+    def compact(self, history: list[types.Content]) -> list[types.Content]:
+        """Returns the history to send to the model, compacting old tool results if it is over budget."""
+        sizes = [self.estimate_tokens(content) for content in history]
+        total = sum(sizes)
+        if total <= self.max_tokens:
+            return history
+
+        contents = list(history)
+        last_compactable = len(contents) - self.keep_recent_turns
+        for index in range(1, last_compactable):
+            if total <= self.max_tokens:
+                break
+            compacted = self._compact_content(contents[index])
+            if compacted is not contents[index]:
+                contents[index] = compacted
+                self.compacted_results.update(
+                    (index, part.function_response.response["compacted"]["sha256"])
+                    for part in compacted.parts
+                    if part.function_response and "compacted" in (part.function_response.response or {})
+                )
+                new_size = self.estimate_tokens(compacted)
+                total -= sizes[index] - new_size
+                sizes[index] = new_size
+
+        if total > self.max_tokens:
+            logging.warning(
+                f"History is ~{total} tokens after compaction, over the budget of {self.max_tokens}; "
+                f"the {self.keep_recent_turns} most recent turns are always sent in full."
+            )
+        else:
+            logging.info(f"Compacted history to ~{total} tokens (budget {self.max_tokens}).")
+        return contents
+
+    @staticmethod
+    def estimate_tokens(content: types.Content) -> int:
+        chars = 0
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            if part.function_call:
+                chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+            if part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+        return chars // CHARS_PER_TOKEN + 1
+
+    def _compact_content(self, content: types.Content) -> types.Content:
+        if not any(part.function_response for part in content.parts or []):
+            return content
+        key = id(content)
+        cached = self._compacted.get(key)
+        if cached is not None and cached[0] is content:
+            return cached[1]
+
+        parts = [self._compact_part(part) for part in content.parts]
+        compacted = content if all(new is old for new, old in zip(parts, content.parts)) else types.Content(role=content.role, parts=parts)
+        # Keep a reference to the original so that a recycled id() can never match.
+        self._compacted[key] = (content, compacted)
+        return compacted
+
+    def _compact_part(self, part: types.Part) -> types.Part:
+        if not part.function_response:
+            return part
+        response = part.function_response.response or {}
+        field = "result" if "result" in response else "error" if "error" in response else None
+        if field is None:
+            return part
+        output = response[field] if isinstance(response[field], str) else json.dumps(response[field], default=str)
+        if len(output) <= self.max_result_chars:
+            return part
+
+        digest = hashlib.sha256(output.encode("utf-8")).hexdigest()
+        half = self.max_result_chars // 2
+        excerpt = (
+            f"{output[:half]}\n"
+            f"... [{len(output) - 2 * half} characters omitted from an earlier turn; sha256 {digest[:16]}] ...\n"
+            f"{output[-half:]}"
+        )
+        return types.Part.from_function_response(
+            name=part.function_response.name,
+            response={field: excerpt, "compacted": {"sha256": digest, "chars": len(output)}},
+        )
@@ -0,0 +1,45 @@
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+class ReadLedger:
+    """
+    Remembers which file contents `read_file` has already returned in full during a run.
+
+    Entries are keyed by path and the SHA-256 of the content, and hold the turn
+    the content was returned in. When the model asks for content it already
+    has, `read_file` answers with a short marker instead of a second copy.
+    Content that has since been compacted out of the history sent to the model
+    is forgotten at the start of the next turn (see `begin_turn`), since the
+    model no longer sees it.
+    """
+
+    def __init__(self):
+        # The turn whose tool calls are running; set by the agent.
+        self.turn = 0
+        self._delivered: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def begin_turn(self, turn: int, compacted: Iterable[Tuple[int, str]] = ()):
+        """
+        Starts the tool calls of the model turn at history index `turn`.
+
+        `compacted` holds the (history index, sha256) of every tool output that was
+        compacted (see `HistoryManager.compacted_results`). Content returned in
+        turn N is answered at index N + 1, so an entry is dropped once that
+        output has been compacted.
+        """
+        compacted = set(compacted)
+        with self._lock:
+            self.turn = turn
+            self._delivered = {
+                key: seen for key, seen in self._delivered.items() if (seen + 1, key[1]) not in compacted
+            }
+
+    def delivered_turn(self, path: str, digest: str) -> Optional[int]:
+        """Returns the turn in which this exact content of `path` was returned, if it was."""
+        with self._lock:
+            return self._delivered.get((path, digest))
+
+    def record(self, path: str, digest: str):
+        with self._lock:
+            self._delivered[(path, digest)] = self.turn
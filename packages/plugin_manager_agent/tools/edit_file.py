@@ -1,5 +1,5 @@
 import difflib
-from pathlib import Path
+from ..workspace import current_content_cache, journal_change, resolve_path
 
 # This tool's design pattern is inspired by the FileEditTool from the motleycoder library:
 # https://github.com/MotleyAI/motleycoder/blob/main/motleycoder/tools/file_edit_tool.py
@@ -19,12 +19,13 @@ def edit_file(file_path: str, search_block: str, replace_block: str) -> str:
     print(f"Editing file: {file_path}")
     try:
         # Ensure the path exists
-        file = Path(file_path)
+        file = resolve_path(file_path)
         if not file.exists():
             return f"Error: File not found at {file_path}"
 
         # Read the original content
-        original_content = file.read_text()
+        cache = current_content_cache()
+        original_content = cache.read_text(file)
 
         # Check if the search block exists
         if search_block not in original_content:
@@ -50,7 +51,8 @@ def edit_file(file_path: str, search_block: str, replace_block: str) -> str:
         new_content = original_content.replace(search_block, replace_block, 1)
 
         # Write the modified content back to the file
-        file.write_text(new_content)
+        cache.write_text(file, new_content)
+        journal_change(file, "edit_file")
 
         return f"Successfully edited {file_path}."
 
@@ -1,5 +1,10 @@
 import os
+import time
 import subprocess
+from ..workspace import get_current_workspace, journal_change
+
+# How often a running command checks whether its run has been cancelled, in seconds.
+CANCEL_POLL_INTERVAL = 0.1
 
 def execute_shell_command(command: str, timeout: int | None = None) -> str:
     """
@@ -16,16 +21,34 @@ def execute_shell_command(command: str, timeout: int | None = None) -> str:
     if timeout is None:
         timeout = int(os.getenv("SHELL_COMMAND_TIMEOUT", "30"))
 
+    workspace = get_current_workspace()
+    cwd = str(workspace.root) if workspace else None
+
     try:
-        process = subprocess.run(
+        with subprocess.Popen(
             command,
             shell=True,
-            capture_output=True,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=timeout,
-        )
-        return f"Exit Code: {process.returncode}\nSTDOUT:\n{process.stdout}\nSTDERR:\n{process.stderr}"
-    except subprocess.TimeoutExpired:
-        return f"Error executing command: Command '{command}' timed out after {timeout} seconds"
+        ) as process:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=max(min(CANCEL_POLL_INTERVAL, deadline - time.monotonic()), 0))
+                    break
+                except subprocess.TimeoutExpired:
+                    if time.monotonic() >= deadline:
+                        process.kill()
+                        return f"Error executing command: Command '{command}' timed out after {timeout} seconds"
+                    # A cancelled run (e.g. one over its budget) stops the command early.
+                    if workspace is not None and workspace.cancelled.is_set():
+                        process.kill()
+                        return f"Error executing command: Command '{command}' was cancelled"
+        return f"Exit Code: {process.returncode}\nSTDOUT:\n{stdout}\nSTDERR:\n{stderr}"
     except Exception as e:
         return f"Error executing command: {e}"
+    finally:
+        # A command can change any file, so the workspace index re-checks them all on its next refresh.
+        journal_change(None, "execute_shell_command")
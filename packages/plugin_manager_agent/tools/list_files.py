@@ -1,16 +1,205 @@
+import os
+from datetime import datetime
+from fnmatch import fnmatchcase
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+from ..workspace import current_content_cache, current_index, resolve_path
+from ..workspace_index import WorkspaceIndex
 
-def list_files(path: str = ".") -> str:
+# Directories that are only noise when exploring a plugin, in .gitignore syntax.
+DEFAULT_EXCLUDE = (".git/", ".history/", "__pycache__/", ".venv/", "venv/", "node_modules/", ".pytest_cache/")
+DEFAULT_MAX_ENTRIES = 1000
+
+class _Rule(NamedTuple):
+    base: str  # The directory of the .gitignore the rule came from, relative to the listed path.
+    pattern: str
+    negate: bool
+    dir_only: bool
+    anchored: bool
+
+def _parse_rules(lines: List[str], base: str = "") -> List[_Rule]:
+    """Parses .gitignore-style lines: `#` comments, `!` negation, a trailing `/` for directories and `/` anchoring."""
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if line.startswith("**/"):
+            line = line[3:]
+        # As in git, a pattern with a slash matches from its directory; one without matches names at any depth.
+        anchored = "/" in line
+        line = line.lstrip("/")
+        if line:
+            rules.append(_Rule(base, line, negate, dir_only, anchored))
+    return rules
+
+def _ignored(rules: List[_Rule], relative: str, is_dir: bool) -> bool:
+    """Returns whether `relative` is excluded: as in git, the last matching rule wins."""
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        path = relative
+        if rule.base:
+            if not relative.startswith(rule.base + "/"):
+                continue
+            path = relative[len(rule.base) + 1:]
+        if fnmatchcase(path if rule.anchored else path.rsplit("/", 1)[-1], rule.pattern):
+            ignored = not rule.negate
+    return ignored
+
+def _read_gitignore(directory: str, base: str) -> List[_Rule]:
+    try:
+        with open(os.path.join(directory, ".gitignore"), encoding="utf-8", errors="replace") as f:
+            return _parse_rules(f.readlines(), base)
+    except OSError:
+        return []
+
+def _walk(directory: str, base: str, depth: int, rules: List[_Rule], use_gitignore: bool) -> Iterator[Tuple[str, Callable[[], str]]]:
+    """
+    Yields (relative path, details) for everything under `directory`, depth-first in name
+    order, down to `depth` levels; `details` returns the entry's detail columns. Each
+    directory is scanned once, and only when the listing reaches it, so a capped listing
+    stops scanning once the cap is hit.
+    """
+    if use_gitignore:
+        rules = rules + _read_gitignore(directory, base)
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        if not base:
+            raise
+        return  # An unreadable subdirectory is skipped rather than failing the whole listing.
+    for entry in entries:
+        relative = f"{base}/{entry.name}" if base else entry.name
+        # Symlinked directories are listed but not followed, so a link cycle cannot loop.
+        is_dir = entry.is_dir(follow_symlinks=False)
+        if _ignored(rules, relative, is_dir):
+            continue
+        yield relative, partial(_details, entry)
+        if is_dir and depth > 1:
+            yield from _walk(entry.path, relative, depth - 1, rules, use_gitignore)
+
+def _indexed(index: WorkspaceIndex, top: str, depth: int, rules: List[_Rule], use_gitignore: bool) -> Iterator[Tuple[str, Callable[[], str]]]:
     """
-    Lists all files and directories in a specified path.
+    Yields what `_walk` would for the directory `top` (relative to the index root),
+    but from the workspace index, so the listing does not touch the directory tree.
+    """
+    prefix = f"{top}/" if top else ""
+    entries = sorted(
+        (relative[len(prefix):].split("/"), entry)
+        for relative, entry in index.entries().items()
+        if relative.startswith(prefix) and relative.count("/") - prefix.count("/") < depth
+    )
+    if use_gitignore:
+        # As in `_walk`, a directory's .gitignore applies below it, after the rules of the directories above.
+        gitignores = sorted((len(parts), parts) for parts, entry in entries if parts[-1] == ".gitignore" and entry.kind == "file")
+        for _, parts in gitignores:
+            try:
+                lines = current_content_cache().read_text(index.root / top / "/".join(parts)).splitlines()
+            except (OSError, UnicodeDecodeError):
+                continue
+            rules = rules + _parse_rules(lines, "/".join(parts[:-1]))
+    pruned = None
+    for parts, entry in entries:
+        relative = "/".join(parts)
+        if pruned is not None and relative.startswith(pruned):
+            continue  # Inside an excluded directory, which `_walk` would not have entered.
+        if _ignored(rules, relative, entry.kind == "dir"):
+            pruned = f"{relative}/" if entry.kind == "dir" else pruned
+            continue
+        yield relative, partial(_format_details, entry.kind, entry.size, entry.mtime_ns)
+
+def _index_for(root: Path) -> Tuple[Optional[WorkspaceIndex], str]:
+    """Returns the current workspace's index and `root` relative to it, if the index covers `root`."""
+    index = current_index()
+    if index is None:
+        return None, ""
+    try:
+        top = root.resolve().relative_to(index.root).as_posix()
+    except ValueError:
+        return None, ""
+    top = "" if top == "." else top
+    if any(part in index.ignored_dirs for part in top.split("/")):
+        return None, ""  # Listing an ignored directory (e.g. .git) itself, which the index does not hold.
+    return index, top
+
+def _details(entry: os.DirEntry) -> str:
+    """Returns the type, size and mtime columns of an entry."""
+    try:
+        stat = entry.stat(follow_symlinks=False)
+    except OSError:
+        return f"{'?':<4} {'?':>10} {'?':<19}"
+    if entry.is_symlink():
+        kind = "link"
+    elif entry.is_dir(follow_symlinks=False):
+        kind = "dir"
+    else:
+        kind = "file"
+    return _format_details(kind, stat.st_size, stat.st_mtime_ns)
+
+def _format_details(kind: str, size: Optional[int], mtime_ns: int) -> str:
+    size = "-" if kind == "dir" else str(size)
+    modified = datetime.fromtimestamp(mtime_ns / 1e9).isoformat(sep=" ", timespec="seconds")
+    return f"{kind:<4} {size:>10} {modified}"
+
+def list_files(
+    path: str = ".",
+    max_depth: int = 1,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    details: bool = False,
+    exclude: list[str] | None = None,
+    use_gitignore: bool = True
+) -> str:
+    """
+    Lists the files and directories in a specified path, optionally recursing into subdirectories.
+
+    Entries are listed one per line in name order, with each directory's contents
+    right after it. Version control, cache and virtualenv directories (.git,
+    __pycache__, .venv, node_modules, ...) are skipped, as is anything matched by
+    a .gitignore inside the listed tree or by `exclude`. Inside a workspace with a
+    file index, the listing is read from the index instead of the disk.
 
     Args:
         path (str): The directory path to list. Defaults to the current directory.
+        max_depth (int, optional): How many levels to list: 1 lists only `path` itself, 2 also
+                                   its subdirectories, and so on. Defaults to 1.
+        max_entries (int, optional): The most entries to return; a longer listing ends with a
+                                     truncation marker. Defaults to 1000.
+        details (bool, optional): Prefix each entry with its type (file, dir or link), size in
+                                  bytes and modification time. Defaults to False.
+        exclude (list[str] | None, optional): Extra .gitignore-style patterns to skip, e.g. ["*.log", "build/"].
+        use_gitignore (bool, optional): Skip what the tree's .gitignore files exclude. Defaults to True.
     """
     print(f"Listing files in: {path}")
     try:
-        files = [str(p) for p in Path(path).glob("*")]
-        return "\n".join(files)
+        root = resolve_path(path)
+        if not root.is_dir():
+            return ""
+        rules = _parse_rules(list(DEFAULT_EXCLUDE) + list(exclude or []))
+        index, top = _index_for(root)
+        if index is not None:
+            listing = _indexed(index, top, max_depth, rules, use_gitignore)
+        else:
+            listing = _walk(str(root), "", max_depth, rules, use_gitignore)
+        lines = []
+        for relative, entry_details in listing:
+            if len(lines) >= max_entries:
+                lines.append(
+                    f"... [truncated after {max_entries} entries; list a subdirectory, "
+                    f"lower max_depth or raise max_entries to see more]"
+                )
+                break
+            # Report entries relative to the path the caller gave, not the resolved location.
+            shown = str(Path(path) / relative)
+            lines.append(f"{entry_details()} {shown}" if details else shown)
+        return "\n".join(lines)
     except Exception as e:
         return f"Error listing files: {e}"
-
@@ -1,14 +1,143 @@
+import mmap
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
 from pathlib import Path
+from ..workspace import current_content_cache, current_read_ledger, resolve_path
 
-def read_file(path: str) -> str:
+# Without a range, files up to this size are returned whole; larger ones start paging.
+MAX_FULL_READ_BYTES = 4 * 1024 * 1024
+DEFAULT_MAX_LINES = 200
+DEFAULT_MAX_BYTES = 64 * 1024
+# A page of lines never returns more than this, even if its lines are very long.
+MAX_PAGE_BYTES = 256 * 1024
+# Line-offset indexes of recently paged files, keyed by path and invalidated by mtime and size.
+MAX_CACHED_INDEXES = 64
+
+_line_indexes: "OrderedDict[Path, LineIndex]" = OrderedDict()
+_line_indexes_lock = threading.Lock()
+
+class LineIndex:
+    """The byte offset at which every line of a file starts, built with one scan over a memory map."""
+
+    def __init__(self, path: Path):
+        stat = path.stat()
+        self.version = (stat.st_mtime_ns, stat.st_size)
+        self.size = stat.st_size
+        self.starts = array("Q")
+        if self.size == 0:
+            return
+        self.starts.append(0)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = data.find(b"\n")
+            while position != -1 and position + 1 < self.size:
+                self.starts.append(position + 1)
+                position = data.find(b"\n", position + 1)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.starts)
+
+    def span(self, first: int, last: int) -> tuple:
+        """Returns the byte span from the start of 0-based line `first` up to (not including) line `last`."""
+        end = self.starts[last] if last < self.line_count else self.size
+        return self.starts[first], end
+
+def line_index(path: Path) -> LineIndex:
+    """Returns the cached line index of a file, rebuilding it if the file has changed."""
+    stat = path.stat()
+    with _line_indexes_lock:
+        index = _line_indexes.get(path)
+        if index is not None and index.version == (stat.st_mtime_ns, stat.st_size):
+            _line_indexes.move_to_end(path)
+            return index
+    index = LineIndex(path)
+    with _line_indexes_lock:
+        _line_indexes[path] = index
+        _line_indexes.move_to_end(path)
+        while len(_line_indexes) > MAX_CACHED_INDEXES:
+            _line_indexes.popitem(last=False)
+    return index
+
+def _read_span(path: Path, start: int, end: int) -> str:
+    if end <= start:
+        return ""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # A byte range may cut a multi-byte character in two; show the pieces as replacement characters.
+        return data[start:end].decode("utf-8", errors="replace")
+
+def _read_lines(path: str, resolved: Path, start_line: int, max_lines: int) -> str:
+    index = line_index(resolved)
+    first = max(start_line, 1) - 1
+    if first >= index.line_count:
+        return f"[{path}: no lines from line {first + 1}; the file has {index.line_count} lines, {index.size} bytes]"
+    last = min(first + max(max_lines, 1), index.line_count)
+    start, end = index.span(first, last)
+    header = f"[{path}: lines {first + 1}-{last} of {index.line_count}, {index.size} bytes]"
+    if end - start > MAX_PAGE_BYTES:
+        end = start + MAX_PAGE_BYTES
+        header += f" (cut off at {MAX_PAGE_BYTES} bytes; continue with byte_offset={end})"
+    return f"{header}\n{_read_span(resolved, start, end)}"
+
+def _read_bytes(path: str, resolved: Path, byte_offset: int, max_bytes: int) -> str:
+    index = line_index(resolved)
+    start = min(max(byte_offset, 0), index.size)
+    end = min(start + max(max_bytes, 0), index.size)
+    header = f"[{path}: bytes {start}-{end} of {index.size}, {index.line_count} lines]"
+    return f"{header}\n{_read_span(resolved, start, end)}"
+
+def _unchanged_or_text(path: str, resolved: Path, text: str, force: bool) -> str:
+    """Returns a short marker if the model already has this exact content from an earlier turn, else the text."""
+    ledger = current_read_ledger()
+    if ledger is None:
+        return text
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    key = str(resolved)
+    turn = ledger.delivered_turn(key, digest)
+    if turn is not None and not force:
+        marker = f"[{path}: unchanged since turn {turn} (sha256 {digest[:16]}); pass force=True to read it again]"
+        if len(marker) < len(text):
+            return marker
+    ledger.record(key, digest)
+    return text
+
+def read_file(
+    path: str,
+    start_line: int | None = None,
+    max_lines: int | None = None,
+    byte_offset: int | None = None,
+    max_bytes: int | None = None,
+    force: bool = False
+) -> str:
     """
-    Reads the entire content of a specified file.
+    Reads the content of a specified file, either whole or one page at a time.
+
+    Without a range, the entire file is returned (files over 4 MB return their first
+    page instead). A ranged read returns a header with the range, the file's total
+    line count and its size, followed by the content of that range.
+
+    If a whole-file read returns exactly what an earlier turn of this run already
+    returned, a short "unchanged since turn N" marker is returned instead.
 
     Args:
         path (str): The absolute or relative path to the file.
+        start_line (int | None, optional): The 1-based line to start reading at.
+        max_lines (int | None, optional): The number of lines to read. Defaults to 200 for line reads.
+        byte_offset (int | None, optional): The 0-based byte to start reading at (reads by byte instead of by line).
+        max_bytes (int | None, optional): The number of bytes to read. Defaults to 65536 for byte reads.
+        force (bool, optional): Return the full content even if it is unchanged since an earlier read.
     """
     print(f"Reading file: {path}")
     try:
-        return Path(path).read_text()
+        resolved = resolve_path(path)
+        if byte_offset is not None or max_bytes is not None:
+            return _read_bytes(path, resolved, byte_offset or 0, max_bytes if max_bytes is not None else DEFAULT_MAX_BYTES)
+        if start_line is not None or max_lines is not None:
+            return _read_lines(path, resolved, start_line or 1, max_lines if max_lines is not None else DEFAULT_MAX_LINES)
+        if resolved.stat().st_size > MAX_FULL_READ_BYTES:
+            notice = f"[{path} is larger than 4 MB, so only its first page is shown. Pass start_line/max_lines or byte_offset/max_bytes to read more.]"
+            return f"{notice}\n{_read_lines(path, resolved, 1, DEFAULT_MAX_LINES)}"
+        return _unchanged_or_text(path, resolved, current_content_cache().read_text(resolved), force)
     except Exception as e:
         return f"Error reading file: {e}"
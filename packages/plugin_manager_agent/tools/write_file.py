@@ -1,4 +1,4 @@
-from pathlib import Path
+from ..workspace import current_content_cache, journal_change, resolve_path
 
 def write_file(path: str, content: str) -> str:
     """
@@ -14,11 +14,12 @@ def write_file(path: str, content: str) -> str:
     print(f"Writing file: {path}")
     try:
         # Ensure the parent directory exists
-        file_path = Path(path)
+        file_path = resolve_path(path)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Write the content
-        file_path.write_text(content)
+        current_content_cache().write_text(file_path, content)
+        journal_change(file_path, "write_file")
 
         return f"Successfully wrote {len(content)} characters to {path}"
     except Exception as e:
@@ -0,0 +1,99 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Optional
+from .content_cache import ContentCache, content_cache as default_content_cache
+from .read_ledger import ReadLedger
+from .workspace_index import WorkspaceIndex
+
+class Workspace:
+    """
+    The root directory a single agent run operates on.
+
+    Tools resolve relative paths against the workspace root instead of the
+    process working directory, and refuse paths that escape it. This lets
+    several agents run in threads of the same process, each on its own plugin.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        content_cache: Optional[ContentCache] = None,
+        read_ledger: Optional[ReadLedger] = None,
+        index: Optional[WorkspaceIndex] = None
+    ):
+        self.root = Path(root).resolve()
+        # File contents read and written by the tools; shared with other workspaces by default.
+        self.content_cache = content_cache or default_content_cache
+        # File contents already returned to the model in this run; without one, every read is returned in full.
+        self.read_ledger = read_ledger
+        # The plugin's persistent file index; the tools journal the changes they make to it, and `list_files` reads it.
+        self.index = index
+        # Set when the run is cancelled (e.g. its budget ran out); long-running tools poll it and stop early.
+        self.cancelled = threading.Event()
+
+    def resolve(self, path: str | Path) -> Path:
+        """
+        Resolves a path against the workspace root.
+
+        Raises:
+            PermissionError: If the path points outside the workspace root.
+        """
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            candidate = self.root / candidate
+        resolved = candidate.resolve()
+        if resolved != self.root and not resolved.is_relative_to(self.root):
+            raise PermissionError(f"Path '{path}' is outside the workspace root {self.root}")
+        return resolved
+
+_current_workspace: ContextVar[Optional[Workspace]] = ContextVar("current_workspace", default=None)
+
+def get_current_workspace() -> Optional[Workspace]:
+    """Returns the workspace bound to the current context, if any."""
+    return _current_workspace.get()
+
+@contextmanager
+def use_workspace(workspace: Workspace):
+    """Binds a workspace to the current context (thread or asyncio task) for the duration of the block."""
+    token = _current_workspace.set(workspace)
+    try:
+        yield workspace
+    finally:
+        _current_workspace.reset(token)
+
+def current_content_cache() -> ContentCache:
+    """Returns the content cache of the current workspace, or the process-wide cache outside of one."""
+    workspace = get_current_workspace()
+    if workspace is None:
+        return default_content_cache
+    return workspace.content_cache
+
+def current_read_ledger() -> Optional[ReadLedger]:
+    """Returns the read ledger of the current workspace, if any."""
+    workspace = get_current_workspace()
+    return workspace.read_ledger if workspace is not None else None
+
+def current_index() -> Optional[WorkspaceIndex]:
+    """Returns the file index of the current workspace, if it has one."""
+    workspace = get_current_workspace()
+    return workspace.index if workspace is not None else None
+
+def journal_change(path: Optional[Path], tool: str):
+    """Journals a change to the current workspace's index, if it has one (`path=None`: anything may have changed)."""
+    workspace = get_current_workspace()
+    if workspace is not None and workspace.index is not None:
+        workspace.index.record_change(path, tool)
+
+def resolve_path(path: str | Path) -> Path:
+    """
+    Resolves a tool path against the current workspace.
+
+    Outside of a workspace (e.g. when a tool is called directly), the path is
+    returned unchanged and resolved by the OS against the process cwd.
+    """
+    workspace = get_current_workspace()
+    if workspace is None:
+        return Path(path)
+    return workspace.resolve(path)
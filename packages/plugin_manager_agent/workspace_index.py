@@ -0,0 +1,278 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from .content_cache import ContentCache, content_cache as default_content_cache
+
+# Directories that are never indexed: version control, caches, virtualenvs and the run history itself.
+DEFAULT_IGNORED_DIRS = frozenset({".git", ".history", "__pycache__", ".venv", "venv", "node_modules", ".pytest_cache"})
+INDEX_DIR = Path(".history") / "workspace-index"
+# Once the journal has grown past this size, it is emptied and the index rebuilt with one full refresh.
+DEFAULT_MAX_JOURNAL_BYTES = 1024 * 1024
+
+class FileRecord(NamedTuple):
+    size: int
+    mtime_ns: int
+    sha256: str
+
+class Entry(NamedTuple):
+    """An entry of the indexed tree as `list_files` shows it."""
+    kind: str  # file, dir or link
+    size: Optional[int]
+    mtime_ns: int
+
+class WorkspaceIndex:
+    """
+    A persistent index of a plugin's tree, stored under `<plugin>/.history/workspace-index/`.
+
+    The directory holds two files:
+        index.json     - File records (size, mtime, SHA-256), directories and symlinks, and
+                         how much of the journal they already include.
+        journal.jsonl  - One line per change made through the tools, appended as it happens.
+
+    `write_file` and `edit_file` journal the file they wrote, and
+    `execute_shell_command` journals that anything may have changed. `refresh()`
+    applies the journal: it re-checks only the journaled paths, so keeping the
+    index current costs time proportional to the number of changes. Only the first
+    refresh in a process, the first after a shell command and `refresh(full=True)`
+    stat the whole tree, re-hashing files whose size or mtime changed. A full
+    refresh is also the only way edits made outside the tools are seen: the
+    standard library has no file-watching API, so the index does not watch the tree.
+
+    `list_files` answers from the index of the current workspace. Files that a full
+    refresh finds changed are dropped from `content_cache`, which still checks every
+    read against the file itself.
+
+    Once the journal grows past `max_journal_bytes` it is replaced by an empty one.
+    Every index reading it (in this process or another) notices the new file and
+    makes its next refresh a full one.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        ignored_dirs: frozenset = DEFAULT_IGNORED_DIRS,
+        content_cache: Optional[ContentCache] = None,
+        max_journal_bytes: int = DEFAULT_MAX_JOURNAL_BYTES
+    ):
+        self.root = Path(root).resolve()
+        self.ignored_dirs = ignored_dirs
+        self.content_cache = content_cache or default_content_cache
+        self.max_journal_bytes = max_journal_bytes
+        self.directory = self.root / INDEX_DIR
+        self.files: Dict[str, FileRecord] = {}
+        # Directories (with their mtimes) and symlinks (with their size and mtime), so that `list_files` can show them too.
+        self.dirs: Dict[str, int] = {}
+        self.links: Dict[str, Tuple[int, int]] = {}
+        # How far the journal has been applied, and which journal file (by inode) that offset is in.
+        self._journal_offset = 0
+        self._journal_inode: Optional[int] = None
+        self._loaded = False
+        self._verified = False
+        self._lock = threading.RLock()
+
+    def refresh(self, full: bool = False) -> Dict[str, FileRecord]:
+        """Brings the index up to date and returns its file records, keyed by POSIX path relative to the root."""
+        with self._lock:
+            self._apply(full)
+            return dict(self.files)
+
+    def entries(self) -> Dict[str, Entry]:
+        """Brings the index up to date and returns every file, directory and symlink in it."""
+        with self._lock:
+            self._apply(full=False)
+            entries = {path: Entry("dir", None, mtime_ns) for path, mtime_ns in self.dirs.items()}
+            entries.update((path, Entry("link", size, mtime_ns)) for path, (size, mtime_ns) in self.links.items())
+            entries.update((path, Entry("file", record.size, record.mtime_ns)) for path, record in self.files.items())
+            return entries
+
+    def record_change(self, path: Optional[str | Path], tool: str):
+        """
+        Journals a change made by a tool. `path` is the file it wrote; `None` means
+        the tool may have changed anything (e.g. a shell command).
+        """
+        relative = None
+        if path is not None:
+            try:
+                relative = Path(path).resolve().relative_to(self.root).as_posix()
+            except ValueError:
+                return  # Outside this workspace; nothing to index.
+            if any(part in self.ignored_dirs for part in relative.split("/")[:-1]):
+                return
+        entry = {"time": time.time(), "tool": tool, "path": relative}
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / "journal.jsonl", "a") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def changes(self, since: int = 0) -> List[dict]:
+        """Returns the journal entries from byte offset `since`; the journal only reaches back to its last compaction."""
+        return self._read_journal_from(since, None)[0]
+
+    def _apply(self, full: bool):
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+        changes, replaced = self._read_journal()
+        if self._journal_offset > self.max_journal_bytes:
+            self._compact_journal()
+            replaced = True
+        changed = False
+        if full or replaced or not self._verified or any(change.get("path") is None for change in changes):
+            changed = self._scan()
+            self._verified = True
+        else:
+            for path in {change["path"] for change in changes}:
+                changed = self._update(path) or changed
+        if changed or changes or replaced:
+            self._save()
+
+    def _read_journal(self) -> tuple:
+        """Returns the entries appended since the last call, and whether the journal was replaced meanwhile."""
+        entries, offset, inode = self._read_journal_from(self._journal_offset, self._journal_inode)
+        if inode is None:
+            # Create the journal, so that a later compaction (which gives it a new inode) is noticed.
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / "journal.jsonl", "a") as f:
+                inode = os.fstat(f.fileno()).st_ino
+        replaced = self._journal_inode is not None and inode != self._journal_inode
+        self._journal_offset, self._journal_inode = offset, inode
+        return entries, replaced
+
+    def _read_journal_from(self, offset: int, inode: Optional[int]) -> tuple:
+        journal = self.directory / "journal.jsonl"
+        try:
+            with open(journal, "rb") as f:
+                stat = os.fstat(f.fileno())
+                if (inode is not None and stat.st_ino != inode) or offset > stat.st_size:
+                    offset = 0  # A different journal than the offset refers to; read it from its beginning.
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0, None
+        # A line still being written is read on the next refresh.
+        complete = data[:data.rfind(b"\n") + 1]
+        entries = [json.loads(line) for line in complete.splitlines() if line.strip()]
+        return entries, offset + len(complete), stat.st_ino
+
+    def _compact_journal(self):
+        """
+        Replaces the journal with an empty file. An entry appended to the old file
+        after it was read is lost, but its change is already on disk, where the full
+        refresh that follows a replaced journal finds it.
+        """
+        temporary = self.directory / "journal.jsonl.tmp"
+        temporary.write_bytes(b"")
+        os.replace(temporary, self.directory / "journal.jsonl")
+        self._journal_offset, self._journal_inode = 0, (self.directory / "journal.jsonl").stat().st_ino
+
+    def _load(self):
+        try:
+            data = json.loads((self.directory / "index.json").read_text())
+        except (OSError, ValueError):
+            return
+        self.files = {path: FileRecord(*record) for path, record in data.get("files", {}).items()}
+        self.dirs = data.get("dirs", {})
+        self.links = {path: tuple(link) for path, link in data.get("links", {}).items()}
+        self._journal_offset = data.get("journal_offset", 0)
+        self._journal_inode = data.get("journal_inode")
+
+    def _save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = {
+            "journal_offset": self._journal_offset,
+            "journal_inode": self._journal_inode,
+            "files": {path: list(record) for path, record in self.files.items()},
+            "dirs": self.dirs,
+            "links": self.links,
+        }
+        temporary = self.directory / "index.json.tmp"
+        temporary.write_text(json.dumps(data, sort_keys=True))
+        os.replace(temporary, self.directory / "index.json")
+
+    def _scan(self) -> bool:
+        """Stats every entry, re-hashing files whose size or mtime changed. Returns whether anything changed."""
+        files, dirs, links = set(), {}, {}
+        changed = False
+        stack = [self.root]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        relative = Path(entry.path).relative_to(self.root).as_posix()
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in self.ignored_dirs:
+                                dirs[relative] = entry.stat(follow_symlinks=False).st_mtime_ns
+                                stack.append(entry.path)
+                        elif entry.is_symlink():
+                            stat = entry.stat(follow_symlinks=False)
+                            links[relative] = (stat.st_size, stat.st_mtime_ns)
+                        elif entry.is_file(follow_symlinks=False):
+                            files.add(relative)
+                            if self._update_file(relative, entry.stat(follow_symlinks=False)):
+                                self.content_cache.invalidate(entry.path)
+                                changed = True
+            except OSError as e:
+                logging.debug(f"Skipping unreadable directory while indexing: {e}")
+        for relative in set(self.files) - files:
+            del self.files[relative]
+            self.content_cache.invalidate(self.root / relative)
+            changed = True
+        if (dirs, links) != (self.dirs, self.links):
+            self.dirs, self.links = dirs, links
+            changed = True
+        return changed
+
+    def _update(self, relative: str) -> bool:
+        """Updates a journaled file's record and its parent directories. Returns whether anything changed."""
+        changed = self._update_file(relative)
+        parent = relative.rpartition("/")[0]
+        while parent:
+            try:
+                mtime_ns = (self.root / parent).stat().st_mtime_ns
+            except OSError:
+                break
+            changed = changed or self.dirs.get(parent) != mtime_ns
+            self.dirs[parent] = mtime_ns
+            parent = parent.rpartition("/")[0]
+        return changed
+
+    def _update_file(self, relative: str, stat: Optional[os.stat_result] = None) -> bool:
+        """Updates one file's record. Returns whether it changed."""
+        try:
+            stat = stat or (self.root / relative).stat()
+        except OSError:
+            return self.files.pop(relative, None) is not None
+        record = self.files.get(relative)
+        if record is not None and (record.size, record.mtime_ns) == (stat.st_size, stat.st_mtime_ns):
+            return False
+        try:
+            digest = self._hash(self.root / relative)
+        except OSError:
+            return self.files.pop(relative, None) is not None
+        self.files[relative] = FileRecord(stat.st_size, stat.st_mtime_ns, digest)
+        return True
+
+    @staticmethod
+    def _hash(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+_indexes: Dict[Path, WorkspaceIndex] = {}
+_indexes_lock = threading.Lock()
+
+def workspace_index(root: str | Path) -> WorkspaceIndex:
+    """Returns the process-wide index of a plugin, so that runs (and the context primer) share one."""
+    root = Path(root).resolve()
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None:
+            index = _indexes[root] = WorkspaceIndex(root)
+        return index